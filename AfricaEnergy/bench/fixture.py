@@ -0,0 +1,243 @@
+import json
+import time
+import argparse
+import random
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+"""
+local stand-in for the Africa Energy Portal database page, so the scrapers can be run and timed offline. the page has the parts scrape.py drives: a select2 style sector dropdown, a cookie banner, .select-all-themes checkboxes over each sector's .indicator-select inputs, the year filter with its "All" checkbox and the apply-btn. APPLY posts the filter form to /apply over XHR (like the portal) and a small Highcharts stub fills Highcharts.charts with the returned charts one at a time, so the readiness waits behave like they do against the real site. the http engine (http_scrape.py) can replay the same /apply request. the /apply form fields and the json it returns follow http_scrape.py's guess at the portal's request, not a recording of it, so the http stage only measures the engine, it doesn't show that the engine works against the portal.
+
+FixtureSite(indicators, countries, missing, seed, latency) generates deterministic synthetic charts for every sector
+FixtureSite.start() serves the page on a free localhost port in a background thread and returns its url, stop() shuts it down
+python fixture.py --indicators 40 --port 8000 serves the fixture until interrupted, handy for poking at it in a browser
+"""
+
+SECTORS = ["Electricity", "Energy", "Social and Economic"]
+YEARS = [str(year) for year in range(2000, 2025)]
+UNITS = ["GWh", "MW", "%", "ktoe", "millions of people", "Current US$", "kWh per capita"]
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Database | Africa Energy Portal (fixture)</title>
+<style>.hidden {{ display: none; }} .select2 {{ display: inline-block; min-width: 200px; cursor: pointer; }}</style>
+<script>window.Highcharts = {{ charts: [] }};</script>
+</head>
+<body>
+<div id="cookie-banner"><button type="button" onclick="this.parentNode.style.display = 'none'">Accept cookies</button></div>
+<form action="/apply" method="post" onsubmit="return false;">
+  <select class="maingrouping-select hidden" name="maingrouping">{sector_options}</select><span class="select2"><span class="select2-selection"><span class="select2-selection__rendered">{first_sector}</span></span></span>
+  <ul class="select2-results hidden"></ul>
+  {sector_blocks}
+  <div class="year-filter-field">
+    <a href="#" class="filter-field-label" onclick="return false;">Year</a>
+    <div class="year-options hidden">
+      <label><input type="checkbox" class="year-all"><span class="checkbox-label">All</span></label>
+      {year_inputs}
+    </div>
+  </div>
+  <button type="button" class="apply-btn">Apply</button>
+</form>
+<div id="charts"></div>
+<script>
+(function() {{
+  var sectors = {sectors_json};
+  var rendered = document.querySelector('.select2-selection__rendered');
+  var results = document.querySelector('.select2-results');
+
+  // select2: the options arrive after a short "ajax" delay, with a loading row first
+  document.querySelector('.select2').addEventListener('click', function() {{
+    results.innerHTML = '<li class="select2-results__option loading-results">Searching...</li>';
+    results.classList.remove('hidden');
+    setTimeout(function() {{
+      results.innerHTML = '';
+      sectors.forEach(function(sector) {{
+        var option = document.createElement('li');
+        option.className = 'select2-results__option';
+        option.textContent = sector;
+        option.addEventListener('click', function() {{
+          rendered.textContent = sector;
+          document.querySelector('.maingrouping-select').value = sector;
+          results.classList.add('hidden');
+          document.querySelectorAll('.sector-themes').forEach(function(block) {{
+            block.classList.toggle('hidden', block.getAttribute('data-sector') !== sector);
+          }});
+        }});
+        results.appendChild(option);
+      }});
+    }}, 80);
+  }});
+
+  document.querySelectorAll('.select-all-themes').forEach(function(box) {{
+    box.addEventListener('click', function() {{
+      var block = box.closest('.sector-themes');
+      block.querySelectorAll('.indicator-select').forEach(function(ind) {{ ind.checked = box.checked; }});
+    }});
+  }});
+
+  var yearOptions = document.querySelector('.year-options');
+  document.querySelector('.year-filter-field .filter-field-label').addEventListener('click', function() {{
+    yearOptions.classList.toggle('hidden');
+  }});
+  document.querySelector('.year-all').addEventListener('click', function() {{
+    var all = this.checked;
+    yearOptions.querySelectorAll('.year-select').forEach(function(year) {{ year.checked = all; }});
+  }});
+
+  // APPLY posts the filters and renders the returned charts one by one, like Highcharts drawing them
+  document.querySelector('.apply-btn').addEventListener('click', function() {{
+    var sector = rendered.textContent;
+    var params = [['maingrouping', sector]];
+    document.querySelectorAll('.sector-themes[data-sector="' + sector + '"] .indicator-select:checked').forEach(function(ind) {{
+      params.push([ind.name, ind.value]);
+    }});
+    document.querySelectorAll('.year-select:checked').forEach(function(year) {{ params.push(['year[]', year.value]); }});
+    var body = params.map(function(p) {{ return encodeURIComponent(p[0]) + '=' + encodeURIComponent(p[1]); }}).join('&');
+
+    Highcharts.charts = [];
+    document.getElementById('charts').innerHTML = '';
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', '/apply');
+    xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+    xhr.onload = function() {{
+      var configs = JSON.parse(xhr.responseText).charts;
+      var i = 0;
+      (function renderNext() {{
+        var batch = configs.slice(i, i + 10);
+        batch.forEach(function(config) {{
+          Highcharts.charts.push({{
+            title: {{ textStr: config.title.text }},
+            yAxis: [{{ axisTitle: {{ textStr: config.yAxis.title.text }} }}],
+            xAxis: [{{ categories: config.xAxis.categories }}],
+            series: config.series.map(function(s) {{
+              return {{ name: s.name, data: s.data.map(function(y) {{ return {{ y: y }}; }}) }};
+            }})
+          }});
+          var div = document.createElement('div');
+          div.className = 'chart';
+          div.textContent = config.title.text;
+          document.getElementById('charts').appendChild(div);
+        }});
+        i += batch.length;
+        if (i < configs.length) setTimeout(renderNext, 10);
+      }})();
+    }};
+    xhr.send(body);
+  }});
+}})();
+</script>
+</body>
+</html>
+"""
+
+
+class FixtureSite:
+    def __init__(self, indicators=20, countries=54, missing=0.2, seed=42, latency=0.0):
+        self.latency = latency
+        self.indicators = {}
+        self.charts = {}
+        rng = random.Random(seed)
+        country_names = [f"Country {i:02d}" for i in range(countries)]
+        for sector in SECTORS:
+            self.indicators[sector] = []
+            for i in range(indicators):
+                unit = UNITS[i % len(UNITS)]
+                label = f"{sector} indicator {i} ({unit})"
+                self.indicators[sector].append((label, unit, f"{sector} theme {i % 5}"))
+                series = [
+                    {"name": year, "data": [None if rng.random() < missing else round(rng.random() * 1000, 3) for _ in country_names]}
+                    for year in YEARS
+                ]
+                self.charts[label] = {
+                    "title": {"text": label},
+                    "yAxis": {"title": {"text": unit}},
+                    "xAxis": {"categories": country_names},
+                    "series": series,
+                }
+        self.server = None
+
+    def page(self):
+        sector_blocks = []
+        for index, sector in enumerate(SECTORS):
+            inputs = "".join(
+                f'<label><input type="checkbox" class="indicator-select" name="indicator[]" value="{escape(label)}" '
+                f'data-unit="{escape(unit)}" data-theme="{escape(theme)}">{escape(label)}</label>'
+                for label, unit, theme in self.indicators[sector]
+            )
+            hidden = "" if index == 0 else " hidden"
+            sector_blocks.append(
+                f'<div class="sector-themes{hidden}" data-sector="{escape(sector)}">'
+                f'<label><input type="checkbox" class="select-all-themes" name="{escape(sector)}">SELECT ALL THEMES</label>'
+                f"{inputs}</div>"
+            )
+        return PAGE.format(
+            sector_options="".join(f'<option value="{escape(s)}">{escape(s)}</option>' for s in SECTORS),
+            first_sector=escape(SECTORS[0]),
+            sector_blocks="\n  ".join(sector_blocks),
+            year_inputs="".join(f'<input type="checkbox" class="year-select hidden" value="{year}">' for year in YEARS),
+            sectors_json=json.dumps(SECTORS),
+        )
+
+    def apply(self, form):
+        """Charts for the indicators ticked in a posted filter form, limited to the posted years"""
+        years = set(form.get("year[]", YEARS))
+        charts = []
+        for label in form.get("indicator[]", []):
+            chart = self.charts.get(label)
+            if chart:
+                charts.append(dict(chart, series=[s for s in chart["series"] if s["name"] in years]))
+        return {"charts": charts}
+
+    def start(self, port=0):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.respond(200, "text/html; charset=utf-8", site.page().encode())
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode(), keep_blank_values=True)
+                if site.latency:
+                    time.sleep(site.latency)
+                self.respond(200, "application/json", json.dumps(site.apply(form)).encode())
+
+            def respond(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_address[1]}/database"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the offline fixture of the database page")
+    parser.add_argument("--indicators", type=int, default=20, help="indicators (charts) per sector")
+    parser.add_argument("--countries", type=int, default=54)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the apply request takes")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    site = FixtureSite(args.indicators, args.countries, latency=args.latency)
+    print(f"✓ Fixture portal at {site.start(args.port)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import subprocess
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from io import StringIO
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, "..", "extract"), os.path.join(HERE, "..", "load"), HERE]
+
+import pandas as pd
+import metrics
+from fixture import SECTORS, FixtureSite
+
+"""
+offline benchmark suite. every case runs in a fresh process (so peak RSS belongs to that case alone) and appends one json line per case to results.jsonl, tagged with the git version, so scrape time, rows/sec and memory can be compared between versions.
+
+stages:
+scrape     scrape_sector_data() under headless chrome against the local fixture portal (fixture.py), every sector
+http       the browserless HttpScraper against the same fixture
+transform  payload_to_frame() on a synthetic payload
+load       loader.load_file() of a parquet staging file into mongomock, or a real mongod with --uri
+
+scale multiplies the indicators (charts) per sector, so --scales 1,4,16 times the same work at three dataset sizes.
+
+python run.py --stages http,transform,load --scales 1,4,16
+python run.py --stages scrape --scales 1 --indicators 20
+python run.py --stages scrape --scales 1 --lean           same with lean chrome, compare page load and browser RSS
+python run.py --stages scrape --scales 4 --shard-size 20  renders 20 charts per tab, compare browser RSS with an unsharded run
+python run.py --report                                   compares the latest version's results with the previous version
+"""
+
+RESULTS = os.path.join(HERE, "results.jsonl")
+STAGES = ["scrape", "http", "transform", "load"]
+
+
+def version():
+    """Short git commit of the tree being measured, marked dirty when it has local changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE, capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on linux and bytes on macos
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_scrape(indicators, countries, options):
+    from driver import Driver
+    import scrape
+
+    site = FixtureSite(indicators, countries, latency=options["latency"])
+    url = site.start()
+    # open_database() and the sector loop navigate to BASE_URL, point them at the fixture
+    scrape.BASE_URL = url
+    driver = Driver()
+    try:
+        driver.setup_driver(headless=True, lean=options["lean"])
+        start = time.perf_counter()
+        rows = 0
+        scrape.open_database(driver)
+        for sector in SECTORS:
+            rows += len(scrape.scrape_sector_data(driver, sector, shard_size=options["shard_size"]))
+            if sector != SECTORS[-1]:
+                driver.driver.get(url)
+                driver.wait_for_document_ready()
+        return rows, time.perf_counter() - start
+    finally:
+        driver.close_driver()
+        site.stop()
+
+
+def bench_http(indicators, countries, options):
+    from http_scrape import HttpScraper
+
+    site = FixtureSite(indicators, countries, latency=options["latency"])
+    scraper = HttpScraper(site.start())
+    try:
+        start = time.perf_counter()
+        rows = sum(len(scraper.scrape_sector(sector)) for sector in SECTORS)
+        return rows, time.perf_counter() - start
+    finally:
+        scraper.close()
+        site.stop()
+
+
+def synthetic_frame(indicators, countries):
+    from bench_transform import synthetic_payload
+    from charts import parse_indicator, payload_to_frame
+
+    payload = synthetic_payload(indicators * len(SECTORS), countries)
+    metadata = [parse_indicator(*ind) for ind in payload["indicators"]]
+    return payload, metadata, payload_to_frame
+
+
+def bench_transform(indicators, countries, options):
+    payload, metadata, payload_to_frame = synthetic_frame(indicators, countries)
+    start = time.perf_counter()
+    frame = payload_to_frame(payload, metadata, "Energy")
+    return len(frame), time.perf_counter() - start
+
+
+def bench_load(indicators, countries, options):
+    from staging import write_staging
+    from loader import load_file
+
+    payload, metadata, payload_to_frame = synthetic_frame(indicators, countries)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_staging(payload_to_frame(payload, metadata, "Energy"), os.path.join(tmp, "bench.parquet"))
+        if options["uri"]:
+            from pymongo import MongoClient
+            client = MongoClient(options["uri"])
+        else:
+            import mongomock
+            client = mongomock.MongoClient()
+        try:
+            client.drop_database("africa_energy_bench")
+            collection = client.get_database("africa_energy_bench").get_collection("bench")
+            stats = load_file(collection, path, batch_size=options["batch_size"])
+            return stats["rows"], stats["seconds"]
+        finally:
+            client.drop_database("africa_energy_bench")
+            client.close()
+
+
+BENCHES = {"scrape": bench_scrape, "http": bench_http, "transform": bench_transform, "load": bench_load}
+
+
+def run_case(stage, scale, options):
+    """Run one stage at one scale, meant to be called in a fresh process"""
+    indicators = options["indicators"] * scale
+    metrics.reset()
+    # the stages log every chart and sector, keep that out of the timings
+    with redirect_stdout(StringIO()):
+        rows, seconds = BENCHES[stage](indicators, options["countries"], options)
+    snapshot = metrics.snapshot()
+    counters, peaks = snapshot["counters"], snapshot["peaks"]
+    return {
+        "stage": stage,
+        "scale": scale,
+        "indicators": indicators,
+        "countries": options["countries"],
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else 0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "webdriver_calls": counters.get("webdriver_calls", 0),
+        "browser_rss_mb": round(peaks.get("browser_rss_mb_charts", 0), 1),
+        "lean": options["lean"],
+        "shard_size": options["shard_size"],
+    }
+
+
+def run_benchmarks(stages, scales, options, results_path=RESULTS):
+    tag = {
+        "version": version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+    context = multiprocessing.get_context("spawn")
+    print(f"Benchmarking version {tag['version']}")
+    print(f"  {'stage':<11}{'scale':>6}{'rows':>9}{'seconds':>10}{'rows/sec':>11}{'peak MB':>9}")
+    for stage in stages:
+        for scale in scales:
+            # a fresh spawned process per case keeps ru_maxrss from carrying over between cases
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                try:
+                    result = pool.submit(run_case, stage, scale, options).result()
+                except Exception as e:
+                    print(f"  ✗ {stage} x{scale} failed: {e}")
+                    continue
+            result.update(tag)
+            with open(results_path, "a") as f:
+                f.write(json.dumps(result) + "\n")
+            print(f"  {stage:<11}{scale:>6}{result['rows']:>9}{result['seconds']:>9.3f}s{result['rows_per_sec']:>11.0f}{result['peak_rss_mb']:>9.1f}")
+    print(f"✓ Results appended to {results_path}")
+
+
+def report(results_path=RESULTS, threshold=0.10):
+    """Compare the latest version's results with the version benchmarked before it"""
+    if not os.path.exists(results_path):
+        print(f"✗ No results in {results_path} yet")
+        return
+    with open(results_path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+
+    versions = list(dict.fromkeys(r["version"] for r in results))
+    current = versions[-1]
+    previous = versions[-2] if len(versions) > 1 else None
+    # the latest result per (version, stage, scale) wins
+    latest = {(r["version"], r["stage"], r["scale"]): r for r in results}
+
+    print(f"{current} vs {previous or '(no earlier version)'}")
+    print(f"  {'stage':<11}{'scale':>6}{'seconds':>10}{'change':>9}{'rows/sec':>11}{'peak MB':>9}{'change':>9}")
+    for (version_tag, stage, scale), r in latest.items():
+        if version_tag != current:
+            continue
+        before = latest.get((previous, stage, scale))
+        time_change = r["seconds"] / before["seconds"] - 1 if before and before["seconds"] else None
+        rss_change = r["peak_rss_mb"] / before["peak_rss_mb"] - 1 if before and before["peak_rss_mb"] else None
+        flag = " ⚠" if any(c is not None and c > threshold for c in (time_change, rss_change)) else ""
+        fmt = lambda c: f"{c:+.0%}" if c is not None else "-"
+        print(f"  {stage:<11}{scale:>6}{r['seconds']:>9.3f}s{fmt(time_change):>9}{r['rows_per_sec']:>11.0f}"
+              f"{r['peak_rss_mb']:>9.1f}{fmt(rss_change):>9}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scrape, transform and load stages")
+    parser.add_argument("--stages", default="http,transform,load", help=f"comma separated, any of {','.join(STAGES)}")
+    parser.add_argument("--scales", default="1,4,16", help="comma separated multipliers of --indicators")
+    parser.add_argument("--indicators", type=int, default=20, help="indicators (charts) per sector at scale 1")
+    parser.add_argument("--countries", type=int, default=54)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fixture's apply request takes")
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per insert in the load stage")
+    parser.add_argument("--uri", help="load into this MongoDB instead of mongomock")
+    parser.add_argument("--lean", action="store_true", help="scrape stage: run chrome in lean mode (compare with a run without it)")
+    parser.add_argument("--shard-size", type=int, help="scrape stage: render this many indicators per tab")
+    parser.add_argument("--results", default=RESULTS)
+    parser.add_argument("--report", action="store_true", help="only print the comparison with the previous version")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.results)
+    else:
+        options = {
+            "indicators": args.indicators, "countries": args.countries, "latency": args.latency,
+            "batch_size": args.batch_size, "uri": args.uri, "lean": args.lean,
+            "shard_size": args.shard_size,
+        }
+        stages = [stage for stage in args.stages.split(",") if stage in STAGES]
+        run_benchmarks(stages, [int(scale) for scale in args.scales.split(",")], options, args.results)
+        report(args.results)
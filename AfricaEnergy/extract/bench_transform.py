@@ -0,0 +1,106 @@
+import re
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from contextlib import redirect_stdout
+from io import StringIO
+from charts import BASE_URL, COLUMNS, SOURCE, YEARS, parse_indicator, payload_to_frame
+
+"""
+micro-benchmark for the chart payload transform. builds a synthetic columnar payload (indicators x countries x years, with some points missing) and times the vectorized payload_to_frame() against the old per country dict building it replaced.
+
+python bench_transform.py --indicators 2000 --countries 55 --missing 0.2
+"""
+
+
+def synthetic_payload(indicators, countries, missing=0.2, seed=42):
+    """Build a columnar payload shaped like the in-browser extract script output"""
+    rng = np.random.default_rng(seed)
+    n_years = len(YEARS)
+    chart = np.repeat(np.arange(indicators), countries * n_years)
+    country = np.tile(np.repeat(np.arange(countries), n_years), indicators)
+    year = np.tile(np.arange(n_years), indicators * countries)
+    keep = rng.random(len(chart)) >= missing
+    return {
+        "indicators": [[f"Indicator {i} (unit {i % 7})", f"unit {i % 7}", f"Theme {i % 5}"] for i in range(indicators)],
+        "charts": [[i, f"Indicator {i}", f"unit {i % 7}"] for i in range(indicators)],
+        "countries": [f"Country {c}" for c in range(countries)],
+        "names": [f"Year {y}" for y in YEARS],
+        "chart": chart[keep].tolist(),
+        "country": country[keep].tolist(),
+        "year": year[keep].tolist(),
+        "value": rng.random(int(keep.sum())).round(3).tolist(),
+    }
+
+
+def legacy_transform(payload, indicators_metadata, sector_name):
+    """The per country dict building extract_chart_data used before payload_to_frame"""
+    # expand columnar points into one yearData dict per chart and country
+    chart_data_list, current = [], None
+    for chart_idx, country_id, name_id, value in zip(payload["chart"], payload["country"], payload["year"], payload["value"]):
+        if current is None or current[0] != chart_idx or current[1] != country_id:
+            current = (chart_idx, country_id, {})
+            chart_data_list.append(current)
+        current[2][payload["names"][name_id]] = value
+
+    rows, serials, counters = [], {}, {}
+    for chart_idx, country_id, year_data in chart_data_list:
+        indicator = indicators_metadata[chart_idx]
+        key = f"{indicator['theme']}_{indicator['metric']}_{indicator['unit']}"
+        country = payload["countries"][country_id]
+        serial_map = serials.setdefault(key, {})
+        # the counter restarts with every chart, countries an earlier chart of the same key numbered keep their serial
+        counter = counters.setdefault(chart_idx, [1])
+        if country not in serial_map:
+            serial_map[country] = counter[0]
+            counter[0] = counter[0] % 55 + 1
+        row = {
+            "country": country, "country_serial": serial_map[country], "metric": indicator["metric"],
+            "unit": indicator["unit"], "sector": sector_name, "sub_sector": indicator["theme"],
+            "sub_sub_sector": indicator["label"], "source_link": BASE_URL, "source": SOURCE
+        }
+        for year in YEARS:
+            row[year] = ""
+        for year_str, value in year_data.items():
+            year_clean = re.search(r'(20\d{2})', str(year_str))
+            if year_clean and year_clean.group(1) in row:
+                row[year_clean.group(1)] = value
+        rows.append(row)
+    return pd.DataFrame(rows)[COLUMNS]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    # the transforms log every chart, keep that out of the timings
+    with redirect_stdout(StringIO()):
+        result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chart payload transform")
+    parser.add_argument("--indicators", type=int, default=2000)
+    parser.add_argument("--countries", type=int, default=55)
+    parser.add_argument("--missing", type=float, default=0.2, help="share of points left empty")
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.indicators, args.countries, args.missing)
+    metadata = [parse_indicator(*ind) for ind in payload["indicators"]]
+    print(f"Payload: {args.indicators} indicators x {args.countries} countries x {len(YEARS)} years, {len(payload['value'])} points")
+
+    legacy, legacy_secs = timed(legacy_transform, payload, metadata, "Energy")
+    vectorized, vectorized_secs = timed(payload_to_frame, payload, metadata, "Energy")
+
+    # same rows and values, only the empty cells changed from "" to NaN
+    legacy_years = legacy[YEARS].replace("", np.nan).astype(float)
+    pd.testing.assert_frame_equal(legacy[COLUMNS[:-len(YEARS)]], vectorized[COLUMNS[:-len(YEARS)]], check_dtype=False)
+    pd.testing.assert_frame_equal(legacy_years, vectorized[YEARS])
+
+    print(f"  legacy dict rows:  {legacy_secs:8.3f}s")
+    print(f"  payload_to_frame:  {vectorized_secs:8.3f}s")
+    print(f"  speedup:           {legacy_secs / vectorized_secs:8.1f}x ({len(vectorized)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+"""
+shared helpers for turning Highcharts payloads into staging rows. both the selenium scraper (scrape.py) and the http engine (http_scrape.py) produce the same columnar chart payload, so the row schema only lives here.
+
+SECTORS are the portal's sectors in scrape order, shared by the selenium scraper, the http engine and the pipeline
+parse_indicator() splits an indicator label into its metric, unit and theme metadata
+payload_to_frame() turns the columnar chart payload (parallel chart/country/year/value arrays) straight into a wide or long DataFrame with float year columns
+frame_to_long() melts a wide staging frame into one row per country, indicator and year
+merge_payloads() joins the payloads of indicator shards scraped on separate pages into one, as if every chart had been on a single page
+"""
+
+BASE_URL = "https://africa-energy-portal.org/database"
+SECTORS = ["Electricity", "Energy", "Social and Economic"]
+SOURCE = "Africa Energy Portal"
+YEARS = [str(year) for year in range(2000, 2025)]
+COLUMNS = [
+    "country", "country_serial", "metric", "unit", "sector",
+    "sub_sector", "sub_sub_sector", "source_link", "source"
+] + YEARS
+LONG_COLUMNS = COLUMNS[:len(COLUMNS) - len(YEARS)] + ["year", "value"]
+
+
+def parse_indicator(indicator_label, unit="", theme=""):
+    """Build indicator metadata from its label, unit and theme"""
+    indicator_label = indicator_label or ""
+
+    # Extract metric from label (text before parenthesis)
+    if "(" in indicator_label:
+        metric = indicator_label.split("(")[0].strip()
+        # Remove trailing dashes
+        metric = metric.rstrip(" -")
+    else:
+        metric = indicator_label
+
+    return {
+        "label": indicator_label,
+        "metric": metric,
+        "unit": unit or "",
+        "theme": theme or ""
+    }
+
+
+def payload_to_frame(payload, indicators_metadata, sector_name, long=False, chart_index=False):
+    """Turn a columnar chart payload into a wide (or long) staging DataFrame, chart_index=True keeps each row's chart"""
+    chart_idx = np.asarray(payload.get("chart", []), dtype=np.int64)
+    country_id = np.asarray(payload.get("country", []), dtype=np.int64)
+    name_id = np.asarray(payload.get("year", []), dtype=np.int64)
+    try:
+        values = np.asarray(payload.get("value", []), dtype=float)
+    except (TypeError, ValueError):
+        values = pd.to_numeric(pd.Series(payload.get("value", []), dtype=object), errors="coerce").to_numpy(dtype=float)
+    countries = np.asarray(payload.get("countries", []), dtype=object)
+    if not len(chart_idx):
+        return pd.DataFrame(columns=LONG_COLUMNS if long else COLUMNS)
+
+    # parse each series name once, points then look their year up by index
+    names = pd.Series(payload.get("names", []), dtype=object).astype(str)
+    name_year = names.str.extract(r'(20\d{2})', expand=False)
+    name_col = pd.Index(YEARS).get_indexer(name_year.fillna(""))
+    year_col = name_col[name_id]
+    keep = year_col >= 0
+
+    chart_meta = chart_metadata(payload, indicators_metadata)
+
+    # one row per (chart, country) pair, in the order the points arrived
+    n_countries = max(len(countries), 1)
+    row_codes, row_pairs = pd.factorize(chart_idx * n_countries + country_id)
+    row_chart, row_country = np.divmod(row_pairs, n_countries)
+
+    meta = chart_meta.reindex(row_chart)
+    df = pd.DataFrame({
+        "country": countries[row_country],
+        "metric": meta["metric"].to_numpy(),
+        "unit": meta["unit"].to_numpy(),
+        "sector": sector_name,
+        "sub_sector": meta["sub_sector"].to_numpy(),
+        "sub_sub_sector": meta["sub_sub_sector"].to_numpy(),
+        "source_link": BASE_URL,
+        "source": SOURCE
+    })
+    df.insert(1, "country_serial", country_serials(df, row_chart))
+
+    # scatter the point values straight into the year matrix, later points win like the dict update did
+    grid = np.full((len(df), len(YEARS)), np.nan)
+    grid[row_codes[keep], year_col[keep]] = values[keep]
+    # a country with points only in non-year series still gets its (empty) row, as before
+    df = pd.concat([df, pd.DataFrame(grid, columns=YEARS)], axis=1)
+
+    columns = LONG_COLUMNS if long else COLUMNS
+    if chart_index:
+        df["chart_index"] = row_chart
+        columns = columns + ["chart_index"]
+    if long:
+        df = frame_to_long(df)
+    return df[columns]
+
+
+def chart_metadata(payload, indicators_metadata):
+    """Map each chart index to its indicator metadata, falling back to the chart title"""
+    records = {}
+    for chart_idx, chart_title, y_axis_title in payload.get("charts", []):
+        if chart_idx < len(indicators_metadata):
+            indicator = indicators_metadata[chart_idx]
+            records[chart_idx] = (indicator["theme"], indicator["label"], indicator["metric"], indicator["unit"])
+        else:
+            # Handle None chart_title
+            if chart_title and "(" in chart_title:
+                metric = chart_title.split("(")[0].strip().rstrip(" -")
+                sub_sub_sector = chart_title
+            elif chart_title:
+                metric = chart_title
+                sub_sub_sector = chart_title
+            else:
+                metric = "Unknown"
+                sub_sub_sector = "Unknown"
+            records[chart_idx] = ("Unknown", sub_sub_sector, metric, y_axis_title or "")
+        print(f"    Processing Chart {chart_idx + 1}: {records[chart_idx][1]}")
+
+    return pd.DataFrame.from_dict(
+        records, orient="index", columns=["sub_sector", "sub_sub_sector", "metric", "unit"]
+    )
+
+
+def country_serials(df, row_chart):
+    """Number countries per indicator in order of appearance, cycling after 55 countries"""
+    key = df["sub_sector"] + "_" + df["metric"] + "_" + df["unit"]
+    # a country keeps the serial it got the first time its indicator was seen
+    first = ~pd.DataFrame({"key": key, "country": df["country"]}).duplicated()
+    counter = pd.Series(row_chart[first.to_numpy()]).groupby(
+        [key[first].to_numpy(), row_chart[first.to_numpy()]]
+    ).cumcount().to_numpy()
+    assigned = pd.Series(counter % 55 + 1, index=pd.MultiIndex.from_arrays([key[first], df["country"][first]]))
+    return assigned.reindex(pd.MultiIndex.from_arrays([key, df["country"]])).to_numpy()
+
+
+def frame_to_long(df):
+    """Melt a wide staging frame into one row per country, indicator and year with a value"""
+    id_columns = [column for column in df.columns if column not in YEARS]
+    long_df = df.melt(id_vars=id_columns, value_vars=YEARS, var_name="year")
+    long_df = long_df.dropna(subset=["value"])
+    long_df["year"] = long_df["year"].astype(int)
+    return long_df.reset_index(drop=True)
+
+
+def merge_payloads(payloads):
+    """Join shard payloads into one payload with the charts, countries and series names of all of them"""
+    merged = {key: [] for key in ("indicators", "charts", "countries", "names", "chart", "country", "year", "value")}
+    country_ids, name_ids = {}, {}
+    # charts map to indicators by position, so indicator charts keep their shard's offset and any chart
+    # without an indicator checkbox goes after all the indicators, where chart_metadata falls back to its title
+    offset = 0
+    extra = sum(len(payload["indicators"]) for payload in payloads)
+    indicators_total = extra
+    # points of fallback charts are held back so their rows come after every indicator's, as on one page
+    fallback = {key: [] for key in ("chart", "country", "year", "value")}
+    for payload in payloads:
+        indicators = len(payload["indicators"])
+        merged["indicators"].extend(payload["indicators"])
+        chart_ids = {}
+        for chart_idx, chart_title, y_axis_title in payload["charts"]:
+            if chart_idx < indicators:
+                chart_ids[chart_idx] = offset + chart_idx
+            else:
+                chart_ids[chart_idx] = extra
+                extra += 1
+            merged["charts"].append([chart_ids[chart_idx], chart_title, y_axis_title])
+        offset += indicators
+
+        # countries and names are interned again so ids stay unique across shards
+        countries = np.array([_intern(country_ids, merged["countries"], country) for country in payload["countries"]], dtype=np.int64)
+        names = np.array([_intern(name_ids, merged["names"], name) for name in payload["names"]], dtype=np.int64)
+        charts = np.zeros(max(chart_ids, default=-1) + 1, dtype=np.int64)
+        charts[list(chart_ids)] = list(chart_ids.values())
+        points = {"value": np.asarray(payload["value"], dtype=object)}
+        for key, lookup in (("chart", charts), ("country", countries), ("year", names)):
+            points[key] = lookup[np.asarray(payload[key], dtype=np.int64)] if len(payload[key]) else np.zeros(0, dtype=np.int64)
+        is_fallback = points["chart"] >= indicators_total
+        for key, values in points.items():
+            merged[key].extend(values[~is_fallback].tolist())
+            fallback[key].extend(values[is_fallback].tolist())
+    for key, values in fallback.items():
+        merged[key].extend(values)
+    return merged
+
+
+def _intern(ids, values, key):
+    if key not in ids:
+        ids[key] = len(values)
+        values.append(key)
+    return ids[key]
@@ -0,0 +1,149 @@
+import io
+import time
+import sqlite3
+import hashlib
+import numpy as np
+import pandas as pd
+
+"""
+checkpoint store for resumable scraping. every completed chart is recorded in a local sqlite file together with a hash of its series data and the rows it produced, and every completed sector is recorded against the current run.
+
+Checkpoint(path, resume=True) opens the store, resume=True carries on with the last run if it never finished, otherwise a new run starts
+sector_done(sector) tells whether a sector already completed in the current run so a rerun can skip it
+changed_charts(sector, hashes) compares fresh chart hashes with the stored ones and returns the charts that need processing
+save_chart(sector, indicator, position, chart_hash, frame) stores a processed chart's rows and hash
+load_sector(sector) rebuilds a sector's full staging frame from the stored charts
+finish_sector(sector) / finish_run() mark progress so an interrupted run can resume where it stopped
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS sectors (
+    run_id INTEGER NOT NULL,
+    sector TEXT NOT NULL,
+    changed INTEGER NOT NULL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (run_id, sector)
+);
+CREATE TABLE IF NOT EXISTS charts (
+    sector TEXT NOT NULL,
+    indicator TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    rows TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (sector, indicator)
+);
+"""
+
+
+class Checkpoint:
+    def __init__(self, path="scrape_checkpoint.sqlite", resume=True):
+        self.path = path
+        # pool workers share the file, so wait on each other's write locks instead of failing
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.executescript(SCHEMA)
+
+        last = self.conn.execute("SELECT run_id, finished_at FROM runs ORDER BY run_id DESC LIMIT 1").fetchone()
+        if resume and last and last[1] is None:
+            self.run_id = last[0]
+            print(f"Resuming scrape run {self.run_id} from {path}")
+        else:
+            with self.conn:
+                self.run_id = self.conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),)).lastrowid
+            print(f"Starting scrape run {self.run_id}, checkpoints in {path}")
+
+    def close(self):
+        self.conn.close()
+
+    def sector_done(self, sector):
+        row = self.conn.execute(
+            "SELECT 1 FROM sectors WHERE run_id = ? AND sector = ?", (self.run_id, sector)
+        ).fetchone()
+        return row is not None
+
+    def changed_charts(self, sector, hashes):
+        """Return the indicators whose hash differs from the stored one"""
+        stored = dict(self.conn.execute("SELECT indicator, hash FROM charts WHERE sector = ?", (sector,)))
+        return [indicator for indicator, chart_hash in hashes.items() if stored.get(indicator) != chart_hash]
+
+    def save_chart(self, sector, indicator, position, chart_hash, frame):
+        buffer = io.StringIO()
+        frame.to_json(buffer, orient="split", index=False, double_precision=15)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO charts (sector, indicator, position, hash, rows, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (sector, indicator, position, chart_hash, buffer.getvalue(), time.time())
+            )
+
+    def update_positions(self, sector, positions):
+        """Keep chart order in step with the portal and drop charts that disappeared"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE charts SET position = ? WHERE sector = ? AND indicator = ?",
+                [(position, sector, indicator) for indicator, position in positions.items()]
+            )
+            stored = [row[0] for row in self.conn.execute("SELECT indicator FROM charts WHERE sector = ?", (sector,))]
+            removed = [(sector, indicator) for indicator in stored if indicator not in positions]
+            self.conn.executemany("DELETE FROM charts WHERE sector = ? AND indicator = ?", removed)
+        return len(removed)
+
+    def load_sector(self, sector):
+        rows = self.conn.execute("SELECT rows FROM charts WHERE sector = ? ORDER BY position", (sector,)).fetchall()
+        if not rows:
+            return pd.DataFrame()
+        frames = [pd.read_json(io.StringIO(row[0]), orient="split", dtype=False, precise_float=True) for row in rows]
+        return pd.concat(frames, ignore_index=True)
+
+    def finish_sector(self, sector, changed):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sectors (run_id, sector, changed, finished_at) VALUES (?, ?, ?, ?)",
+                (self.run_id, sector, int(changed), time.time())
+            )
+
+    def finish_run(self):
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), self.run_id))
+
+
+def chart_hashes(payload, indicators_metadata):
+    """Hash every chart's series data, keyed by indicator_key()"""
+    chart_idx = np.asarray(payload.get("chart", []), dtype=np.int64)
+    countries = payload.get("countries", [])
+    names = payload.get("names", [])
+    columns = {
+        "country": np.asarray(payload.get("country", []), dtype=np.int64),
+        "year": np.asarray(payload.get("year", []), dtype=np.int64),
+        "value": pd.to_numeric(pd.Series(payload.get("value", []), dtype=object), errors="coerce").to_numpy(dtype=float),
+    }
+
+    # group point positions by chart, each chart becomes one contiguous slice
+    order = np.argsort(chart_idx, kind="stable")
+    bounds = np.flatnonzero(np.diff(chart_idx[order])) + 1
+    hashes, positions = {}, {}
+    for chart_slice in np.split(order, bounds) if len(order) else []:
+        chart = int(chart_idx[chart_slice[0]])
+        digest = hashlib.sha1()
+        # hash names rather than ids, ids depend on what else was on the page
+        digest.update("\x1f".join(countries[i] for i in columns["country"][chart_slice]).encode())
+        digest.update("\x1f".join(str(names[i]) for i in columns["year"][chart_slice]).encode())
+        digest.update(columns["value"][chart_slice].tobytes())
+        indicator = indicator_key(chart, indicators_metadata)
+        hashes[indicator] = digest.hexdigest()
+        positions[indicator] = chart
+    return hashes, positions
+
+
+def indicator_key(chart_idx, indicators_metadata):
+    """Checkpoint key of a chart, its label plus an occurrence number when an earlier chart has the same label"""
+    if chart_idx < len(indicators_metadata):
+        label = indicators_metadata[chart_idx]["label"]
+        # the first chart keeps the bare label so existing checkpoints stay valid
+        repeat = sum(indicator["label"] == label for indicator in indicators_metadata[:chart_idx])
+        return f"{label} #{repeat + 1}" if repeat else label
+    return f"chart-{chart_idx}"
@@ -1,5 +1,8 @@
+import os
 import re
+import json
 import time
+from contextlib import contextmanager
 import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -8,7 +11,17 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select, WebDriverWait
+from selenium.common.exceptions import (
+    JavascriptException, NoSuchElementException, SessionNotCreatedException, StaleElementReferenceException,
+    TimeoutException, WebDriverException
+)
 from webdriver_manager.chrome import ChromeDriverManager
+import metrics
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 """
 initialize Driver class to setup, close driver and set up soup efficiently. this is very efficient as i can use the Driver methods wherever i want to use them instead of setting up and closing driver each time I use it. I can also import it to other modules if need be.
@@ -17,13 +30,132 @@ setup_driver(headless=False) sets up the chrome driver for scraping, the headles
 close_driver() closes driver when scraping is complete
 get_soup() sets up soup for scraping html content from page content extracted from selenium's driver
 wait() allows the driver to wait before sending any more requests to the browser, this allows for respectful scraping
+
+readiness primitives replace fixed sleeps, they poll adaptively (starting fast and backing off) and raise TimeoutException once their timeout runs out:
+wait_for(condition) waits until condition(driver) returns something truthy and returns it
+wait_for_document_ready() waits until the page has finished loading
+wait_for_select2_results() waits until the select2 dropdown has rendered its options and returns them
+wait_for_network_idle() waits until no XHR/fetch requests have been in flight for a short idle window
+wait_for_charts_stable() waits until the Highcharts chart and series counts stop changing
+each wait is recorded in timings together with the fixed sleep it replaced, print_timings() shows how much latency was saved
+warm starts: the chromedriver path resolved by ChromeDriverManager is cached in DRIVER_CACHE and reused (also offline) until it is DRIVER_CACHE_DAYS old or chrome rejects it, profile_dir keeps a persistent chrome profile so the portal's scripts and styles come from the disk cache
+is_healthy() checks that a running browser session still answers, ensure_session() reuses a healthy session and only starts chrome when there is none, so one Driver can serve several scrape jobs in a row
+lean=True blocks images, media, fonts and third-party trackers (chrome prefs plus CDP Network.setBlockedURLs with the LEAN_BLOCKED patterns). the mode is block-only, setBlockedURLs has no allow rules, so the list names no scripts besides the trackers' and the page's own jquery, select2 and highcharts files load as usual. if the filter controls don't render on a lean page, blocking is switched off and the page reloaded
+new_tab(url) opens url in a tab of its own for a with block and closes it afterwards, so the memory of what it rendered is given back
+page_stats() reads the navigation timing, resource count and transfer size of the current page plus the browser's memory (js heap from CDP, RSS of the chrome process tree when psutil is installed)
+setup is timed into the metrics registry (driver_setup, driver_install) and every webdriver command is counted as webdriver_calls
+"""
+
+# counts in-flight XHR and fetch requests so wait_for_network_idle can tell when the page is quiet
+NETWORK_TRACKER_JS = """
+if (!window.__pendingRequests && window.__pendingRequests !== 0) {
+    window.__pendingRequests = 0;
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', function() { window.__pendingRequests--; });
+        return origSend.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function() {
+            window.__pendingRequests++;
+            return origFetch.apply(this, arguments).finally(function() { window.__pendingRequests--; });
+        };
+    }
+}
+"""
+
+PENDING_REQUESTS_JS = """
+var pending = window.__pendingRequests || 0;
+if (window.jQuery && window.jQuery.active) pending += window.jQuery.active;
+return pending;
 """
 
+CHARTS_SIGNATURE_JS = """
+if (!window.Highcharts || !Highcharts.charts) return '';
+return Highcharts.charts.filter(Boolean).map(function(chart) {
+    var points = 0;
+    (chart.series || []).forEach(function(series) { points += series.data ? series.data.length : 0; });
+    return chart.series.length + ':' + points;
+}).join(',');
+"""
+
+DRIVER_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "africa_energy", "chromedriver.json")
+DRIVER_CACHE_DAYS = 7
+
+
+def cached_driver_path(refresh=False, cache_path=DRIVER_CACHE, max_age_days=DRIVER_CACHE_DAYS):
+    """Resolve chromedriver once and reuse the cached path, falling back to the cache when offline"""
+    cached = None
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        pass
+    usable = cached is not None and os.path.exists(cached.get("path", ""))
+    if usable and not refresh and time.time() - cached.get("resolved", 0) < max_age_days * 86400:
+        return cached["path"]
+
+    try:
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        if usable:
+            print(f"⚠ Could not resolve chromedriver ({e}), using cached {cached['path']}")
+            return cached["path"]
+        raise
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump({"path": path, "resolved": time.time()}, f)
+    return path
+
+
+# resources the scraper never looks at: images, media, fonts and third-party trackers, on any domain
+# including the portal's own. apart from the trackers no pattern may match a script, the filters and charts need them
+LEAN_BLOCKED = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*hotjar.com*", "*addthis.com*", "*sharethis.com*", "*twitter.com*", "*youtube.com*", "*fonts.googleapis.com*",
+]
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+LEAN_ARGS = [
+    "--blink-settings=imagesEnabled=false", "--mute-audio", "--disable-extensions", "--disable-background-networking",
+    "--disable-component-update", "--disable-default-apps", "--disable-sync", "--no-first-run",
+]
+
+PAGE_STATS_JS = """
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var transfer = (nav.transferSize || 0);
+resources.forEach(function(entry) { transfer += entry.transferSize || 0; });
+return {
+    load_ms: nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+    dom_ms: nav.domContentLoadedEventEnd ? nav.domContentLoadedEventEnd - nav.startTime : null,
+    resources: resources.length,
+    transfer_bytes: transfer
+};
+"""
+
+
 class Driver:
     def __init__(self):
         self.driver = None
+        self.timings = []
+        self.banner_closed = False
+        self.lean = False
+
+    def setup_driver(self, headless=False, profile_dir=None, lean=False):
+        with metrics.phase("driver_setup"):
+            self._setup_driver(headless, profile_dir, lean)
 
-    def setup_driver(self, headless=False):
+    def _setup_driver(self, headless=False, profile_dir=None, lean=False):
         options = Options()
         if headless:
             options.add_argument("--headless")
@@ -36,13 +168,135 @@ class Driver:
         options.add_argument("--start-maximized")
         options.add_argument("--ignore-certificate-errors")
         options.add_argument("--log-level=3")
+        if profile_dir:
+            # a profile can only be open in one chrome at a time
+            os.makedirs(profile_dir, exist_ok=True)
+            options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+        if lean:
+            options.add_experimental_option("prefs", LEAN_PREFS)
+            for argument in LEAN_ARGS:
+                options.add_argument(argument)
+
+        with metrics.phase("driver_install"):
+            driver_path = cached_driver_path()
+        try:
+            self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        except SessionNotCreatedException:
+            # chrome updated past the cached driver, resolve a matching one
+            print("⚠ Cached chromedriver does not match chrome, resolving it again")
+            with metrics.phase("driver_install"):
+                driver_path = cached_driver_path(refresh=True)
+            self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        self._count_commands()
+        self.banner_closed = False
+        self.lean = lean
+        self._prepare_tab()
+        print(f"Driver is set up successfully!{' (lean)' if lean else ''}")
+
+    def _prepare_tab(self):
+        # cdp settings belong to the tab they were sent to, every new tab needs them again
+        # install the request tracker on every page before the page's own scripts run
+        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_JS})
+        self.driver.execute_cdp_cmd("Performance.enable", {})
+        if self.lean:
+            self.block_urls(LEAN_BLOCKED)
+
+    @contextmanager
+    def new_tab(self, url):
+        """Load url in a new tab for the with block, then close the tab (and everything it rendered) and switch back"""
+        original = self.driver.current_window_handle
+        self.driver.switch_to.new_window("tab")
+        try:
+            self._prepare_tab()
+            self.driver.get(url)
+            self.wait_for_document_ready()
+            yield
+        finally:
+            self.driver.close()
+            self.driver.switch_to.window(original)
 
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        print("Driver is set up successfully!")
+    def block_urls(self, patterns):
+        """Block requests matching the url patterns for every page from now on, an empty list unblocks"""
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+    def check_lean_page(self, ready_css, url, timeout=10):
+        """Fall back to a full page load when lean blocking kept the page's controls from rendering"""
+        if not self.lean:
+            return True
+        try:
+            self.wait_for(lambda d: d.find_element(By.CSS_SELECTOR, ready_css), timeout=timeout, label="lean page controls")
+            return True
+        except TimeoutException:
+            print("⚠ Page controls did not render with lean blocking, reloading without it")
+            self.block_urls([])
+            self.lean = False
+            self.driver.get(url)
+            self.wait_for_document_ready()
+            return False
+
+    def page_stats(self):
+        """Load timing and size of the current page plus the browser's memory use"""
+        stats = self.driver.execute_script(PAGE_STATS_JS) or {}
+        try:
+            heap = {m["name"]: m["value"] for m in self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+            stats["js_heap_mb"] = heap.get("JSHeapUsedSize", 0) / 1e6
+        except WebDriverException:
+            stats["js_heap_mb"] = None
+        stats["browser_rss_mb"] = self.browser_rss_mb()
+        return stats
+
+    def browser_rss_mb(self):
+        """RSS of chromedriver and every chrome process it started, None without psutil"""
+        if psutil is None or not self.driver:
+            return None
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            return sum(p.memory_info().rss for p in [root] + root.children(recursive=True)) / 1e6
+        except (psutil.Error, AttributeError):
+            return None
+
+    def _count_commands(self):
+        # every selenium call (clicks, finds, scripts, cdp) goes through execute
+        execute = self.driver.execute
+
+        def counted(driver_command, params=None):
+            metrics.count("webdriver_calls")
+            return execute(driver_command, params)
+        self.driver.execute = counted
+
+    def is_healthy(self):
+        """Whether the browser session still answers commands"""
+        if not self.driver:
+            return False
+        try:
+            return bool(self.driver.window_handles) and self.driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def ensure_session(self, headless=False, profile_dir=None, lean=False):
+        """Reuse the running browser session when it is healthy, otherwise start a new one, returns whether it was reused"""
+        with metrics.phase("driver_health_check"):
+            healthy = self.is_healthy()
+        if healthy:
+            metrics.count("driver_reused")
+            print("✓ Reusing the running driver session")
+            return True
+
+        if self.driver:
+            print("⚠ Driver session is not responding, starting a new one")
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+        self.setup_driver(headless=headless, profile_dir=profile_dir, lean=lean)
+        return False
 
     def close_driver(self):
         if self.driver:
             self.driver.quit()
+            self.driver = None
             print("Driver has been closed successfully!")
         else:
             print("Driver is not set up or not available")
@@ -55,3 +309,76 @@ class Driver:
     def wait(self, secs=3):
         time.sleep(secs)
 
+    def wait_for(self, condition, timeout=10, label="condition", baseline=0, poll=0.05, max_poll=0.5):
+        start = time.perf_counter()
+        deadline = start + timeout
+        while True:
+            try:
+                result = condition(self.driver)
+            except (NoSuchElementException, StaleElementReferenceException, JavascriptException):
+                result = None
+
+            now = time.perf_counter()
+            if result:
+                self._record(label, now - start, baseline)
+                return result
+            if now >= deadline:
+                self._record(label, now - start, baseline, timed_out=True)
+                raise TimeoutException(f"Timed out after {timeout}s waiting for {label}")
+
+            time.sleep(min(poll, deadline - now))
+            poll = min(poll * 1.5, max_poll)
+
+    def wait_for_document_ready(self, timeout=30, baseline=0):
+        return self.wait_for(
+            lambda d: d.execute_script("return document.readyState") == "complete",
+            timeout=timeout, label="document ready", baseline=baseline
+        )
+
+    def wait_for_select2_results(self, timeout=10, baseline=0):
+        def results_rendered(d):
+            if d.find_elements(By.CSS_SELECTOR, ".select2-results__option.loading-results"):
+                return None
+            return d.find_elements(By.CSS_SELECTOR, ".select2-results__option")
+        return self.wait_for(results_rendered, timeout=timeout, label="select2 results", baseline=baseline)
+
+    def wait_for_network_idle(self, timeout=30, idle=0.5, baseline=0):
+        self.driver.execute_script(NETWORK_TRACKER_JS)
+        quiet_since = [None]
+
+        def network_idle(d):
+            if d.execute_script(PENDING_REQUESTS_JS) > 0:
+                quiet_since[0] = None
+                return False
+            if quiet_since[0] is None:
+                quiet_since[0] = time.perf_counter()
+            return time.perf_counter() - quiet_since[0] >= idle
+        return self.wait_for(network_idle, timeout=timeout, label="network idle", baseline=baseline)
+
+    def wait_for_charts_stable(self, timeout=30, settle=0.5, baseline=0):
+        last = {"signature": None, "since": None}
+
+        def charts_stable(d):
+            signature = d.execute_script(CHARTS_SIGNATURE_JS)
+            now = time.perf_counter()
+            if not signature or signature != last["signature"]:
+                last["signature"], last["since"] = signature, now
+                return False
+            return now - last["since"] >= settle
+        return self.wait_for(charts_stable, timeout=timeout, label="charts stable", baseline=baseline)
+
+    def _record(self, label, elapsed, baseline, timed_out=False):
+        self.timings.append({"step": label, "elapsed": elapsed, "baseline": baseline, "timed_out": timed_out})
+
+    def print_timings(self):
+        if not self.timings:
+            return
+        print(f"\n  {'step':<28}{'waited':>10}{'fixed sleep':>14}{'saved':>10}")
+        for t in self.timings:
+            saved = t["baseline"] - t["elapsed"] if t["baseline"] else 0
+            flag = " (timed out)" if t["timed_out"] else ""
+            print(f"  {t['step']:<28}{t['elapsed']:>9.2f}s{t['baseline']:>13.2f}s{saved:>9.2f}s{flag}")
+        waited = sum(t["elapsed"] for t in self.timings)
+        baseline = sum(t["baseline"] for t in self.timings)
+        print(f"  {'total':<28}{waited:>9.2f}s{baseline:>13.2f}s{baseline - waited:>9.2f}s")
+        self.timings = []
@@ -0,0 +1,256 @@
+import json
+import time
+import argparse
+import requests
+import pandas as pd
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urljoin
+from charts import BASE_URL, COLUMNS, SECTORS, YEARS, parse_indicator, payload_to_frame
+from staging import save_sector_data
+import metrics
+
+"""
+browserless extraction engine for the Africa Energy Portal database. instead of launching chrome, clicking the filters and reading Highcharts.charts back out, HttpScraper replays the filter/apply request over a pooled requests session and parses the chart payload the portal returns.
+
+HttpScraper(base_url, apply_url) sets up the pooled session, apply_url defaults to the action of the filter form on the database page. pointing base_url at a local stub server that serves recorded responses lets the engine run offline.
+get_indicators(sector_name) reads the indicator checkboxes that "SELECT ALL THEMES" would tick for a sector
+apply_filters(sector_name, indicators) sends the filter/apply request and returns the decoded chart payload
+parse_charts(payload) turns a chart payload into the same columnar payload the in-browser extract script returns
+scrape_sector(sector_name) runs the three steps above and returns rows in the extract_chart_data schema
+
+not verified against the live portal: the apply request (maingrouping, the indicator checkbox names, year[]) is read off the filter form's field names and the response decoding (highcharts options as json, data-chart attributes or drupal ajax commands) covers the shapes the portal might return, neither has been checked against a recorded portal request. the offline fixture in bench/fixture.py answers exactly this request, so the benchmark can't catch a mismatch. tests/test_http_scrape.py only checks that each of those shapes decodes to the selenium extract's payload. until a real request/response is recorded as stub data, compare a sector's rows with scrape.py before relying on this engine, and treat "no chart data" from it as a likely format mismatch.
+"""
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "X-Requested-With": "XMLHttpRequest",
+    "Accept": "application/json, text/javascript, */*; q=0.01",
+}
+
+
+class HttpScraper:
+    def __init__(self, base_url=BASE_URL, apply_url=None, pool_size=10, retries=3, timeout=30):
+        self.base_url = base_url
+        self.apply_url = apply_url
+        self.timeout = timeout
+        self.soup = None
+
+        retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET", "POST"])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.hooks["response"].append(count_response)
+
+    def close(self):
+        self.session.close()
+
+    def get_page(self):
+        """Fetch the database page once and keep its soup for the filter form"""
+        if self.soup is None:
+            response = self.session.get(self.base_url, timeout=self.timeout)
+            response.raise_for_status()
+            self.soup = BeautifulSoup(response.text, "html.parser")
+            if self.apply_url is None:
+                form = self.soup.select_one("form:has(.apply-btn)")
+                action = form.get("action") if form else None
+                self.apply_url = urljoin(self.base_url, action or self.base_url)
+        return self.soup
+
+    def get_indicators(self, sector_name):
+        """Get the indicator inputs grouped under a sector's select-all-themes checkbox"""
+        soup = self.get_page()
+        select_all = soup.select_one(f"input.select-all-themes[name='{sector_name}']")
+        if select_all is None:
+            print(f"✗ Sector '{sector_name}' not found")
+            return []
+
+        # walk up to the closest container holding the sector's indicator checkboxes
+        inputs = []
+        for parent in select_all.parents:
+            inputs = parent.select(".indicator-select")
+            if inputs:
+                break
+
+        indicators = []
+        for ind in inputs:
+            indicator = parse_indicator(ind.get("value"), ind.get("data-unit"), ind.get("data-theme"))
+            indicator["name"] = ind.get("name") or "indicator[]"
+            indicators.append(indicator)
+        print(f"  Found {len(indicators)} indicators for {sector_name}")
+        return indicators
+
+    def apply_filters(self, sector_name, indicators, years=YEARS):
+        """Send the filter/apply request for a sector and return the decoded payload"""
+        self.get_page()
+        params = [("maingrouping", sector_name)]
+        params += [(ind["name"], ind["label"]) for ind in indicators]
+        params += [("year[]", year) for year in years]
+
+        response = self.session.post(self.apply_url, data=params, timeout=self.timeout)
+        response.raise_for_status()
+        try:
+            return response.json()
+        except ValueError:
+            return response.text
+
+    def scrape_sector(self, sector_name):
+        """Scrape all data for a specific sector over http"""
+        print(f"\n{'='*60}")
+        print(f"Starting to scrape sector over http: {sector_name.upper()}")
+        print(f"{'='*60}\n")
+
+        all_data = pd.DataFrame(columns=COLUMNS)
+        try:
+            start = time.perf_counter()
+            with metrics.phase("sector_select"):
+                indicators = self.get_indicators(sector_name)
+            if not indicators:
+                return all_data
+
+            with metrics.phase("http_fetch"):
+                payload = self.apply_filters(sector_name, indicators)
+            with metrics.phase("transform"):
+                columns = parse_charts(payload)
+            metrics.count("charts", len(columns["charts"]))
+            metrics.count("points", len(columns["value"]))
+            if not columns["value"]:
+                print("  ✗ No chart data found, the apply request may not match what the portal expects (see the module notes)")
+                return all_data
+
+            with metrics.phase("transform"):
+                all_data = payload_to_frame(columns, indicators, sector_name)
+            metrics.count("rows", len(all_data))
+            print(f"  Found {len(all_data)} country-indicator combinations ({len(columns['value'])} points)")
+            print(f"\n✓ Completed scraping {sector_name}: {len(all_data)} rows extracted in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            print(f"✗ Error scraping sector {sector_name}: {e}")
+            import traceback
+            traceback.print_exc()
+
+        return all_data
+
+
+def count_response(response, *args, **kwargs):
+    metrics.count("http_requests")
+    metrics.count("bytes_transferred", len(response.content))
+
+
+def parse_charts(payload):
+    """Turn a chart payload into the columnar payload returned by the in-browser extract script"""
+    columns = {"charts": [], "countries": [], "names": [], "chart": [], "country": [], "year": [], "value": []}
+    country_ids, name_ids = {}, {}
+
+    def intern(ids, values, key):
+        if key not in ids:
+            ids[key] = len(values)
+            values.append(key)
+        return ids[key]
+
+    for chart_index, chart in enumerate(find_chart_configs(payload)):
+        series = chart.get("series") or []
+        if not series:
+            continue
+
+        title = chart.get("title") or {}
+        chart_title = title.get("text", "") if isinstance(title, dict) else str(title)
+        y_axis = chart.get("yAxis") or {}
+        if isinstance(y_axis, list):
+            y_axis = y_axis[0] if y_axis else {}
+        y_title = y_axis.get("title") or {}
+        y_axis_title = y_title.get("text", "") if isinstance(y_title, dict) else str(y_title)
+
+        x_axis = chart.get("xAxis") or {}
+        if isinstance(x_axis, list):
+            x_axis = x_axis[0] if x_axis else {}
+        categories = x_axis.get("categories") or []
+        if not categories:
+            continue
+        columns["charts"].append([chart_index, chart_title, y_axis_title])
+        name_index = [intern(name_ids, columns["names"], str(s.get("name"))) for s in series]
+
+        # Countries on X-axis (categories), Years as series
+        for country_index, country in enumerate(categories):
+            for series_index, s in enumerate(series):
+                data = s.get("data") or []
+                if country_index >= len(data):
+                    continue
+                point = data[country_index]
+                if isinstance(point, dict):
+                    point = point.get("y")
+                elif isinstance(point, list):
+                    point = point[-1] if point else None
+                if point is None:
+                    continue
+                columns["chart"].append(chart_index)
+                columns["country"].append(intern(country_ids, columns["countries"], country))
+                columns["year"].append(name_index[series_index])
+                columns["value"].append(point)
+    return columns
+
+
+def find_chart_configs(payload):
+    """Collect Highcharts option objects from a json or html chart payload"""
+    if isinstance(payload, str):
+        # html responses carry each chart's options as json in a data attribute
+        soup = BeautifulSoup(payload, "html.parser")
+        configs = []
+        for node in soup.select("[data-chart]"):
+            try:
+                configs.append(json.loads(node["data-chart"]))
+            except ValueError:
+                continue
+        return configs
+
+    if isinstance(payload, dict):
+        if "series" in payload:
+            return [payload]
+        for key in ("charts", "data", "settings"):
+            if key in payload:
+                return find_chart_configs(payload[key])
+        return []
+
+    if isinstance(payload, list):
+        configs = []
+        for item in payload:
+            # drupal ajax responses wrap markup and settings in a list of commands
+            if isinstance(item, dict) and "command" in item:
+                configs.extend(find_chart_configs(item.get("settings") or item.get("data") or []))
+            else:
+                configs.extend(find_chart_configs(item))
+        return configs
+
+    return []
+
+
+def scrape_all_sectors_http(base_url=BASE_URL, csv=False):
+    """Main function to scrape all sectors without a browser"""
+    scraper = HttpScraper(base_url)
+    try:
+        for sector in SECTORS:
+            sector_data = scraper.scrape_sector(sector)
+            if not sector_data.empty:
+                save_sector_data(sector, sector_data, csv)
+            else:
+                print(f"\n✗ No data collected for {sector}\n")
+    finally:
+        scraper.close()
+        print("\n" + "="*60)
+        print("Scraping completed!")
+        print("="*60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape the Africa Energy Portal database without a browser")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--csv", action="store_true", help="also export each sector as csv next to its parquet staging file")
+    parser.add_argument("--metrics-dir", default=metrics.METRICS_DIR, help="where the json and prometheus run reports are written")
+    parser.add_argument("--profile", action="store_true", help="run under cProfile and save the stats next to the reports")
+    args = parser.parse_args()
+    metrics.run(
+        scrape_all_sectors_http, args.base_url, args.csv, name="http_scrape", directory=args.metrics_dir, profile=args.profile
+    )
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+"""
+run metrics for the ETL. every phase of a run (driver setup and install, sector selection, theme/year selection, the APPLY to charts-ready wait, js extraction, the python transform, file writes and mongo inserts) is timed into one process wide registry together with counters for charts, rows, webdriver calls and bytes transferred. at the end of a run the registry is written as a json report and a prometheus text-format file.
+
+phase(name) is a context manager timing one phase, Stopwatch().lap(name) times back to back phases without re-indenting the code they cover
+count(name, value) adds to a counter, peak(name, value) keeps the highest value seen for a gauge (memory, page size)
+snapshot() / merge(snapshot) / reset() move metrics out of pool worker processes into the parent's registry
+run(fn, name, directory, profile) resets the registry, runs fn (under cProfile when profile=True) and writes <name>-<timestamp>.json, <name>.prom and <name>-<timestamp>.prof into directory
+"""
+
+PREFIX = "africa_energy_etl"
+METRICS_DIR = "metrics"
+
+_lock = threading.Lock()
+_phases = {}
+_counters = {}
+_peaks = {}
+
+
+def record_phase(name, seconds):
+    with _lock:
+        entry = _phases.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+
+@contextmanager
+def phase(name):
+    """Time the code inside the with block as one call of a phase"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+class Stopwatch:
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def lap(self, name):
+        """Record the time since the previous lap as one call of a phase"""
+        now = time.perf_counter()
+        record_phase(name, now - self.last)
+        self.last = now
+
+
+def count(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def peak(name, value):
+    if value is None:
+        return
+    with _lock:
+        _peaks[name] = max(_peaks.get(name, value), value)
+
+
+def reset():
+    with _lock:
+        _phases.clear()
+        _counters.clear()
+        _peaks.clear()
+
+
+def snapshot():
+    with _lock:
+        return {
+            "phases": {name: dict(entry) for name, entry in _phases.items()},
+            "counters": dict(_counters),
+            "peaks": dict(_peaks),
+        }
+
+
+def merge(other):
+    """Add a snapshot taken in another process to this registry"""
+    with _lock:
+        for name, entry in other.get("phases", {}).items():
+            current = _phases.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            current["calls"] += entry["calls"]
+            current["seconds"] += entry["seconds"]
+            current["max_seconds"] = max(current["max_seconds"], entry["max_seconds"])
+        for name, value in other.get("counters", {}).items():
+            _counters[name] = _counters.get(name, 0) + value
+        for name, value in other.get("peaks", {}).items():
+            _peaks[name] = max(_peaks.get(name, value), value)
+
+
+def prometheus_text(report):
+    """Render a run report in the prometheus text exposition format"""
+    label = f'run="{report["run"]}"'
+    lines = [
+        f"# HELP {PREFIX}_run_seconds Wall clock duration of the last run",
+        f"# TYPE {PREFIX}_run_seconds gauge",
+        f"{PREFIX}_run_seconds{{{label}}} {report['seconds']:.6f}",
+        f"# HELP {PREFIX}_run_timestamp_seconds Unix time the last run finished",
+        f"# TYPE {PREFIX}_run_timestamp_seconds gauge",
+        f"{PREFIX}_run_timestamp_seconds{{{label}}} {report['finished_unix']:.0f}",
+    ]
+    for metric, field, kind, help_text in [
+        ("phase_seconds_total", "seconds", "counter", "Seconds spent in each ETL phase"),
+        ("phase_calls_total", "calls", "counter", "Times each ETL phase ran"),
+        ("phase_max_seconds", "max_seconds", "gauge", "Longest single call of each ETL phase"),
+    ]:
+        lines.append(f"# HELP {PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{metric} {kind}")
+        for name, entry in report["phases"].items():
+            lines.append(f'{PREFIX}_{metric}{{{label},phase="{name}"}} {round(entry[field], 6)}')
+    for name, value in report["counters"].items():
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total{{{label}}} {value}")
+    for name, value in report.get("peaks", {}).items():
+        lines.append(f"# TYPE {PREFIX}_{name}_peak gauge")
+        lines.append(f"{PREFIX}_{name}_peak{{{label}}} {round(value, 6)}")
+    return "\n".join(lines) + "\n"
+
+
+def print_report(report):
+    print(f"\n  {'phase':<24}{'calls':>7}{'seconds':>10}{'share':>8}")
+    for name, entry in sorted(report["phases"].items(), key=lambda item: -item[1]["seconds"]):
+        share = entry["seconds"] / report["seconds"] * 100 if report["seconds"] else 0
+        print(f"  {name:<24}{entry['calls']:>7}{entry['seconds']:>9.2f}s{share:>7.1f}%")
+    for name, value in report["counters"].items():
+        print(f"  {name:<24}{value:>17}")
+    for name, value in report.get("peaks", {}).items():
+        print(f"  {name + ' (peak)':<24}{value:>17.1f}")
+
+
+def write_report(report, directory=METRICS_DIR):
+    """Write the json report and the prometheus file, returns their paths"""
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, f"{report['run']}-{report['started']}.json")
+    with open(json_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    # one stable .prom file per run name, written atomically so a textfile collector never reads half of it
+    prom_path = os.path.join(directory, f"{report['run']}.prom")
+    with open(prom_path + ".tmp", "w") as f:
+        f.write(prometheus_text(report))
+    os.replace(prom_path + ".tmp", prom_path)
+    return json_path, prom_path
+
+
+def run(fn, *args, name="scrape", directory=METRICS_DIR, profile=False, **kwargs):
+    """Run fn with a fresh registry, then print and write its metrics report"""
+    reset()
+    started = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+    try:
+        if profiler:
+            return profiler.runcall(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+    finally:
+        report = dict(
+            run=name, started=started, seconds=time.perf_counter() - start, finished_unix=time.time(), **snapshot()
+        )
+        print_report(report)
+        json_path, prom_path = write_report(report, directory)
+        print(f"✓ Metrics written to {json_path} and {prom_path}")
+        if profiler:
+            prof_path = os.path.join(directory, f"{name}-{started}.prof")
+            profiler.dump_stats(prof_path)
+            print(f"✓ Profile written to {prof_path}, top functions by cumulative time:")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
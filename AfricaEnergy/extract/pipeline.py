@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+import pandas as pd
+from dotenv import load_dotenv
+from driver import Driver
+from charts import BASE_URL
+from scrape import SECTORS, iter_chart_data, open_database, prepare_sector, scrape_sector_shards
+from staging import save_sector_data
+import metrics
+from steps import print_summary, reset_budget
+
+# the client, the sector collections and the batch writes are shared with the loaders in load/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "load"))
+from bulk import documents_written, number_repeats
+from client import DATABASE, add_client_arguments, client_settings, close_clients, get_client
+from loader import SECTOR_COLLECTIONS, ensure_indexes, insert_batch, notify_load_complete, upsert_batch
+
+"""
+streaming scrape-to-load pipeline. instead of writing staging files and loading them in a separate run, a sector's rows are handed chart by chart to a background writer thread through a bounded queue as soon as the sector is extracted, so the first documents land in MongoDB seconds after the first sector's charts render rather than after the whole run. a sector is the smallest unit that can be streamed: one APPLY renders all of its charts, one extract script call reads them back, and country serials are numbered across every chart sharing an indicator, so no chart's rows are final before the sector's payload is complete. when the database falls behind, the queue fills up and the scraper blocks on it (backpressure), so memory stays bounded by queue_size charts plus one batch per collection.
+
+BatchWriter(db, queue_size, batch_size, mode) drains the chart queue into MongoDB with the loader's insert_batch/upsert_batch, flushing whenever a batch fills or the queue runs dry
+    finish(collection) flushes a collection once its sector is done and runs the loader's load-complete hooks, so query.py drops its cache
+    a writer that dies makes put/finish raise instead of leaving the scraper blocked on a full queue
+stream_all_sectors(db, headless, queue_size, batch_size, mode, staging, lean, shard_size) scrapes every sector on one Driver and feeds the writer, staging=True still writes the parquet staging files
+python pipeline.py --headless --mode upsert --uri mongodb://localhost:27017
+python pipeline.py --pool-size 50 --write-concern majority --bypass-validation   tunes the shared client like the loaders, see load/client.py
+"""
+
+QUEUE_SIZE = 32
+BATCH_SIZE = 1000
+PUT_TIMEOUT = 1.0
+
+
+def chart_documents(chart_rows):
+    """Turn one chart's rows into documents, dropping its empty year columns"""
+    return chart_rows.dropna(axis=1, how="all").to_dict("records")
+
+
+class BatchWriter(threading.Thread):
+    """Background thread draining the chart queue into MongoDB in batches"""
+
+    def __init__(self, db, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, mode="insert"):
+        super().__init__(name="mongo-writer", daemon=True)
+        self.db = db
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.mode = mode
+        self.pending = {}
+        self.written = {}
+        self.indexed = set()
+        self.first_write = None
+        self.blocked = 0.0
+        self.completed = set()
+        self.repeats = {}
+        self.error = None
+
+    def put(self, collection_name, chart_rows):
+        """Queue one chart's rows, blocking while the queue is full"""
+        start = time.perf_counter()
+        try:
+            self._put((collection_name, chart_rows))
+        finally:
+            self.blocked += time.perf_counter() - start
+
+    def finish(self, collection_name):
+        """Flush a collection whose rows have all been queued and tell the load-complete hooks"""
+        self._put((collection_name, None))
+
+    def close(self):
+        """Flush what is left and wait for the writer to finish"""
+        try:
+            self._put(None)
+        except RuntimeError:
+            pass
+        self.join()
+        if self.error is not None:
+            print(f"✗ MongoDB writer stopped early: {self.error}")
+        return self.written
+
+    def _put(self, item):
+        # a timed put notices a writer that died with the queue full instead of blocking forever
+        while True:
+            if self.error is not None or not self.is_alive():
+                raise RuntimeError(f"MongoDB writer thread has stopped: {self.error}")
+            try:
+                self.queue.put(item, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def run(self):
+        try:
+            self.drain()
+        except Exception as e:
+            self.error = e
+
+    def drain(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            collection_name, chart_rows = item
+            if chart_rows is None:
+                self.flush(collection_name)
+                self.complete(collection_name)
+                continue
+            # repeated charts of an indicator are numbered across the run, like the loader numbers a staging file
+            chart_rows = number_repeats(chart_rows, self.repeats.setdefault(collection_name, {}))
+            self.pending.setdefault(collection_name, []).extend(chart_documents(chart_rows))
+            if len(self.pending[collection_name]) >= self.batch_size:
+                self.flush(collection_name, full_only=True)
+            if self.queue.empty():
+                # nothing else is waiting, write now instead of holding documents back
+                for name in list(self.pending):
+                    self.flush(name)
+        for name in list(self.pending):
+            self.flush(name)
+        for name in list(self.written):
+            if name not in self.completed:
+                self.complete(name)
+
+    def complete(self, collection_name):
+        self.completed.add(collection_name)
+        notify_load_complete({"collection": collection_name, "rows": self.written.get(collection_name, 0)})
+
+    def flush(self, collection_name, full_only=False):
+        documents = self.pending.get(collection_name, [])
+        while documents and (len(documents) >= self.batch_size or not full_only):
+            batch, documents = documents[:self.batch_size], documents[self.batch_size:]
+            self.write(collection_name, batch)
+        self.pending[collection_name] = documents
+
+    def write(self, collection_name, batch):
+        """Write one batch, a failed batch is reported and skipped so the writer keeps draining"""
+        collection = self.db.get_collection(collection_name)
+        try:
+            # the loader's batch writes time mongo_insert, count documents_written and pass bulk_options
+            if self.mode == "upsert":
+                self.ensure_index(collection)
+                written = documents_written(upsert_batch(collection, batch))
+            else:
+                written = insert_batch(collection, batch)
+        except Exception as e:
+            print(f"  ✗ Could not write a batch to {collection_name}: {e}")
+            return
+
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        self.written[collection_name] = self.written.get(collection_name, 0) + written
+
+    def ensure_index(self, collection):
+        if collection.name in self.indexed:
+            return
+        ensure_indexes(collection)
+        self.indexed.add(collection.name)
+
+
+def stream_all_sectors(db, headless=False, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, mode="insert", staging=False, lean=False,
+                       shard_size=None):
+    """Scrape every sector straight into MongoDB, returns the documents written per collection"""
+    start = time.perf_counter()
+    first_chart = None
+    writer = BatchWriter(db, queue_size, batch_size, mode)
+    writer.start()
+    reset_budget()
+
+    driver = Driver()
+    driver.setup_driver(headless=headless, lean=lean)
+    try:
+        open_database(driver)
+        for sector in SECTORS:
+            frames = []
+            try:
+                if shard_size:
+                    payload = scrape_sector_shards(driver, sector, shard_size)
+                    ready = payload is not None
+                else:
+                    payload, ready = None, prepare_sector(driver, sector)
+                if ready:
+                    print("\nStreaming charts to MongoDB...")
+                    for chart_rows in iter_chart_data(driver, sector, payload):
+                        if first_chart is None:
+                            first_chart = time.perf_counter()
+                        writer.put(SECTOR_COLLECTIONS[sector], chart_rows)
+                        if staging:
+                            frames.append(chart_rows)
+            except Exception as e:
+                print(f"✗ Error streaming sector {sector}: {e}")
+            writer.finish(SECTOR_COLLECTIONS[sector])
+
+            if staging and frames:
+                save_sector_data(sector, pd.concat(frames, ignore_index=True))
+
+            if sector != SECTORS[-1]:
+                print(f"\nNavigating back to base page for next sector...")
+                driver.driver.get(BASE_URL)
+                driver.wait_for_document_ready(baseline=5)
+    finally:
+        driver.close_driver()
+        written = writer.close()
+
+    print("\n" + "="*60)
+    for name, count in written.items():
+        print(f"✓ Wrote {count} documents to {name}")
+    if first_chart is not None and writer.first_write is not None:
+        print(f"  First chart after {first_chart - start:.1f}s, first documents written {writer.first_write - first_chart:.2f}s later")
+    print(f"  Scraper waited {writer.blocked:.1f}s on a full queue")
+    print(f"Pipeline completed in {time.perf_counter() - start:.1f}s!")
+    print("="*60)
+    print_summary()
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape the Africa Energy Portal straight into MongoDB")
+    parser.add_argument("--headless", action="store_true", help="run chrome without a visible window")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="charts buffered between the scraper and the writer")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="documents per write")
+    parser.add_argument("--mode", choices=["insert", "upsert"], default="insert", help="upsert keys documents on NATURAL_KEY so reruns don't duplicate")
+    parser.add_argument("--staging", action="store_true", help="also write the parquet staging files")
+    parser.add_argument("--lean", action="store_true", help="block images, media, fonts and trackers while scraping")
+    parser.add_argument("--shard-size", type=int, help="render a sector's indicators this many at a time, each chunk in its own tab")
+    parser.add_argument("--uri", help="MongoDB uri, defaults to MONGO_URI from the environment")
+    parser.add_argument("--metrics-dir", default=metrics.METRICS_DIR, help="where the json and prometheus run reports are written")
+    parser.add_argument("--profile", action="store_true", help="run under cProfile and save the stats next to the reports")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = get_client(args.uri, **client_settings(args))
+    try:
+        metrics.run(
+            stream_all_sectors, client.get_database(DATABASE), args.headless, args.queue_size, args.batch_size, args.mode,
+            args.staging, args.lean, args.shard_size, name="pipeline", directory=args.metrics_dir, profile=args.profile
+        )
+    finally:
+        close_clients()
@@ -1,145 +1,111 @@
-import re
+import os
 import time
+import argparse
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
 from driver import Driver
+from charts import BASE_URL, COLUMNS, SECTORS, merge_payloads, parse_indicator, payload_to_frame
+from staging import save_sector_data, staging_filename
+from checkpoint import Checkpoint, chart_hashes
+import metrics
+from steps import RETRY_BUDGET, StepFailed, print_summary, reset_budget, run_step
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-BASE_URL = "https://africa-energy-portal.org/database"
 
+# One script collects the indicator metadata and every series in a single round trip.
+# Points come back columnar: parallel chart/country/year/value arrays, with countries
+# and series names sent once and referenced by index so the payload stays compact.
+EXTRACT_SCRIPT = """
+var payload = {
+    indicators: [], charts: [], countries: [], names: [],
+    chart: [], country: [], year: [], value: []
+};
 
-def scrape_sector_data(driver, sector_name):
-    """Scrape all data for a specific sector"""
-    all_data = []
+document.querySelectorAll('.indicator-select:checked').forEach(function(ind) {
+    payload.indicators.push([
+        ind.value || '', ind.getAttribute('data-unit') || '', ind.getAttribute('data-theme') || ''
+    ]);
+});
 
-    print(f"\n{'='*60}")
-    print(f"Starting to scrape sector: {sector_name.upper()}")
-    print(f"{'='*60}\n")
+var countryIds = {}, nameIds = {};
+function intern(ids, list, key) {
+    if (!(key in ids)) { ids[key] = list.length; list.push(key); }
+    return ids[key];
+}
 
-    try:
-        # Select the sector from dropdown
-        print(f"Selecting sector: {sector_name}")
-        
-        select2_selection = WebDriverWait(driver.driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".maingrouping-select + .select2 .select2-selection__rendered"))
-        )
+if (window.Highcharts && Highcharts.charts) {
+    Highcharts.charts.forEach(function(chart, chartIndex) {
+        if (!chart || !chart.series || chart.series.length === 0) return;
 
-        # <h2>Electricity</h2>
-        
-        current_sector = select2_selection.text.strip()
-        print(f"  Current sector: {current_sector}")
-        
-        if current_sector != sector_name:
-            select2_parent = driver.driver.find_element(By.CSS_SELECTOR, ".maingrouping-select + .select2")
-            driver.driver.execute_script("arguments[0].scrollIntoView(true);", select2_parent)
-            driver.wait(1)
-            
-            driver.driver.execute_script("arguments[0].click();", select2_parent)
-            driver.wait(2)
-            
-            try:
-                options = WebDriverWait(driver.driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".select2-results__option"))
-                )
-            except:
-                print("  Retrying dropdown open...")
-                driver.driver.execute_script("arguments[0].click();", select2_parent)
-                driver.wait(2)
-                options = WebDriverWait(driver.driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".select2-results__option"))
-                )
-            
-            sector_found = False
-            for opt in options:
-                if opt.text.strip() == sector_name:
-                    driver.driver.execute_script("arguments[0].click();", opt)
-                    driver.wait(3)
-                    print(f"✓ Sector '{sector_name}' selected")
-                    sector_found = True
-                    break
-            
-            if not sector_found:
-                print(f"✗ Sector '{sector_name}' not found")
-                return all_data
-        else:
-            print(f"✓ Sector '{sector_name}' already selected")
+        var chartTitle = chart.title ? chart.title.textStr : '';
+        var yAxisTitle = chart.yAxis && chart.yAxis[0] && chart.yAxis[0].axisTitle 
+            ? chart.yAxis[0].axisTitle.textStr 
+            : '';
 
-        # Click "SELECT ALL THEMES" checkbox
-        print("Selecting all themes...")
-        select_all_checkbox = WebDriverWait(driver.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, f"//input[@class='select-all-themes' and @name='{sector_name}']"))
-        )
-        driver.driver.execute_script("arguments[0].scrollIntoView(true);", select_all_checkbox)
-        
-        if select_all_checkbox.is_selected():
-            driver.driver.execute_script("arguments[0].click();", select_all_checkbox)
-            driver.wait(1)
-        
-        driver.driver.execute_script("arguments[0].click();", select_all_checkbox)
-        driver.wait(2)
-        print("✓ All themes selected")
+        var categories = chart.xAxis && chart.xAxis[0] && chart.xAxis[0].categories || [];
+        if (categories.length === 0) return;
+        payload.charts.push([chartIndex, chartTitle, yAxisTitle]);
 
-        # Select ALL years before clicking APPLY
-        print("Selecting all years (2000-2024)...")
-        try:
-            # Find and click the year filter label to open dropdown
-            year_filter_label = WebDriverWait(driver.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'year-filter-field')]//a[contains(@class, 'filter-field-label')]"))
-            )
-            driver.driver.execute_script("arguments[0].scrollIntoView(true);", year_filter_label)
-            driver.driver.execute_script("arguments[0].click();", year_filter_label)
-            driver.wait(2)
-            
-            # Find and click "All" checkbox for years
-            year_all_checkbox = driver.driver.find_element(By.XPATH, 
-                "//div[contains(@class, 'year-filter-field')]//span[@class='checkbox-label' and text()='All']/preceding-sibling::input"
-            )
-            
-            # First uncheck if already checked (to ensure clean state)
-            if year_all_checkbox.is_selected():
-                driver.driver.execute_script("arguments[0].click();", year_all_checkbox)
-                driver.wait(1)
-            
-            # Then check it to select all years
-            driver.driver.execute_script("arguments[0].click();", year_all_checkbox)
-            driver.wait(2)
-            print("✓ All years selected")
-            
-            # Close the year dropdown
-            driver.driver.execute_script("arguments[0].click();", year_filter_label)
-            driver.wait(1)
-        except Exception as e:
-            print(f"⚠ Could not select all years: {e}")
-            print("  Continuing anyway...")
-
-        # Click APPLY button
-        print("Clicking APPLY button...")
-        apply_button = WebDriverWait(driver.driver, 10).until(
-            EC.element_to_be_clickable((By.CLASS_NAME, "apply-btn"))
-        )
-        driver.driver.execute_script("arguments[0].scrollIntoView(true);", apply_button)
-        driver.driver.execute_script("arguments[0].click();", apply_button)
-        driver.wait(8)  # Increased wait time for all years to load
-        print("✓ APPLY button clicked, waiting for data to load...")
+        var nameIndex = chart.series.map(function(series) { return intern(nameIds, payload.names, String(series.name)); });
 
-        # Wait for chart to appear
-        try:
-            WebDriverWait(driver.driver, 30).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "highcharts-container"))
-            )
-            print("✓ Charts loaded successfully")
-        except Exception as e:
-            print(f"✗ Charts did not load: {e}")
+        // Countries on X-axis (categories), Years as series
+        categories.forEach(function(country, countryIndex) {
+            var countryId = null;
+            chart.series.forEach(function(series, seriesIndex) {
+                var point = series.data && series.data[countryIndex];
+                if (point && point.y !== null && point.y !== undefined) {
+                    if (countryId === null) countryId = intern(countryIds, payload.countries, country);
+                    payload.chart.push(chartIndex);
+                    payload.country.push(countryId);
+                    payload.year.push(nameIndex[seriesIndex]);
+                    payload.value.push(point.y);
+                }
+            });
+        });
+    });
+}
+return payload;
+"""
+
+SELECTED_INDICATORS_JS = """
+return Array.prototype.map.call(document.querySelectorAll('.indicator-select:checked'), function(ind) { return ind.value; });
+"""
+
+# untick every selected indicator outside the shard, clicks go through the page's own change handlers
+KEEP_INDICATORS_JS = """
+var keep = {};
+arguments[0].forEach(function(value) { keep[value] = true; });
+document.querySelectorAll('.indicator-select:checked').forEach(function(ind) {
+    if (!keep[ind.value]) ind.click();
+});
+return document.querySelectorAll('.indicator-select:checked').length;
+"""
+
+
+def scrape_sector_data(driver, sector_name, checkpoint=None, shard_size=None, shard_pool=None):
+    """Scrape all data for a specific sector, shard_size renders its indicators a chunk at a time in separate tabs"""
+    all_data = pd.DataFrame(columns=COLUMNS)
+
+    try:
+        payload = None
+        if shard_size:
+            payload = scrape_sector_shards(driver, sector_name, shard_size, shard_pool)
+            if payload is None:
+                return all_data
+        elif not prepare_sector(driver, sector_name):
             return all_data
 
         # Extract data from charts
         print("\nExtracting data from charts...")
-        chart_data = extract_chart_data(driver, sector_name)
+        chart_data = extract_chart_data(driver, sector_name, checkpoint, payload)
         
-        all_data.extend(chart_data)
+        all_data = chart_data
 
         print(f"\n✓ Completed scraping {sector_name}: {len(all_data)} rows extracted")
+        driver.print_timings()
 
     except Exception as e:
         print(f"✗ Error scraping sector {sector_name}: {e}")
@@ -149,188 +115,178 @@ def scrape_sector_data(driver, sector_name):
     return all_data
 
 
-def extract_chart_data(driver, sector_name):
-    """Extract data from all Highcharts on the page"""
-    all_rows = []
-    
-    # Get all selected indicators with their metadata
-    indicators_metadata = []
+def prepare_sector(driver, sector_name, indicators=None, apply=True):
+    """Select a sector with all themes (or just indicators) and years and wait for its charts, returns whether they loaded"""
+    print(f"\n{'='*60}")
+    print(f"Starting to scrape sector: {sector_name.upper()}")
+    print(f"{'='*60}\n")
+    stopwatch = metrics.Stopwatch()
+
     try:
-        selected_indicators = driver.driver.find_elements(By.CSS_SELECTOR, ".indicator-select:checked")
-        for ind in selected_indicators:
-            indicator_label = ind.get_attribute("value") or ""
-            unit = ind.get_attribute("data-unit") or ""
-            theme = ind.get_attribute("data-theme") or ""
-            
-            # Extract metric from label (text before parenthesis)
-            if "(" in indicator_label:
-                metric = indicator_label.split("(")[0].strip()
-                # Remove trailing dashes
-                metric = metric.rstrip(" -")
-            else:
-                metric = indicator_label
-            
-            indicators_metadata.append({
-                "label": indicator_label,
-                "metric": metric,
-                "unit": unit,
-                "theme": theme
-            })
-        print(f"  Found {len(indicators_metadata)} selected indicators")
-    except Exception as e:
-        print(f"  Warning: Could not extract indicator metadata: {e}")
+        if not run_step("sector_select", select_sector, driver, sector_name, timeout=10, recover=lambda: close_select2(driver)):
+            return False
+        stopwatch.lap("sector_select")
+
+        run_step("themes_select", select_themes, driver, sector_name, indicators, timeout=10)
+        run_step("year_filter", select_years, driver, timeout=10, required=False)
+        stopwatch.lap("filter_select")
+        if not apply:
+            return True
+
+        try:
+            run_step("apply_charts", apply_filters, driver, timeout=60)
+            print("✓ Charts loaded successfully")
+        finally:
+            stopwatch.lap("charts_wait")
+    except StepFailed as e:
+        print(f"✗ {e}")
+        return False
+
+    # bytes the page pulled since it was loaded (document, scripts, filter requests) and memory with the charts drawn
+    record_page_stats(driver, "charts")
+    return True
+
+
+def select_sector(driver, sector_name, timeout=10):
+    """Pick the sector in the select2 dropdown, returns False when the portal has no such sector"""
+    # Select the sector from dropdown
+    print(f"Selecting sector: {sector_name}")
     
-    # Enhanced JavaScript to extract chart data and gets all years
-    extract_script = """
-    var allData = [];
-    if (Highcharts && Highcharts.charts) {
-        Highcharts.charts.forEach(function(chart, chartIndex) {
-            if (!chart || !chart.series || chart.series.length === 0) return;
-            
-            var chartTitle = chart.title ? chart.title.textStr : '';
-            var yAxisTitle = chart.yAxis && chart.yAxis[0] && chart.yAxis[0].axisTitle 
-                ? chart.yAxis[0].axisTitle.textStr 
-                : '';
-            
-            var hasCategories = chart.xAxis && chart.xAxis[0] && chart.xAxis[0].categories && chart.xAxis[0].categories.length > 0;
-            var categories = hasCategories ? chart.xAxis[0].categories : [];
-            
-            // Countries on X-axis (categories), Years as series
-            if (hasCategories && categories.length > 0) {
-                categories.forEach(function(country, countryIndex) {
-                    var yearData = {};
-                    
-                    // Iterate through ALL series (each series is a year)
-                    chart.series.forEach(function(series) {
-                        if (series.data && series.data[countryIndex]) {
-                            var point = series.data[countryIndex];
-                            if (point && point.y !== null && point.y !== undefined) {
-                                var year = series.name;
-                                yearData[year] = point.y;
-                            }
-                        }
-                    });
-                    
-                    // Only add if we have data for this country
-                    if (Object.keys(yearData).length > 0) {
-                        allData.push({
-                            chartIndex: chartIndex,
-                            chartTitle: chartTitle,
-                            yAxisTitle: yAxisTitle,
-                            country: country,
-                            yearData: yearData
-                        });
-                    }
-                });
-            }
-        });
-    }
-    return allData;
-    """
+    select2_selection = WebDriverWait(driver.driver, timeout * 3).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, ".maingrouping-select + .select2 .select2-selection__rendered"))
+    )
+
+    # <h2>Electricity</h2>
+    
+    current_sector = select2_selection.text.strip()
+    print(f"  Current sector: {current_sector}")
+    
+    if current_sector == sector_name:
+        print(f"✓ Sector '{sector_name}' already selected")
+        return True
+
+    select2_parent = driver.driver.find_element(By.CSS_SELECTOR, ".maingrouping-select + .select2")
+    driver.driver.execute_script("arguments[0].scrollIntoView(true);", select2_parent)
+    driver.driver.execute_script("arguments[0].click();", select2_parent)
+    options = driver.wait_for_select2_results(timeout=timeout, baseline=3)
+    
+    for opt in options:
+        if opt.text.strip() == sector_name:
+            driver.driver.execute_script("arguments[0].click();", opt)
+            driver.wait_for(
+                lambda d: d.find_element(By.XPATH, f"//input[@class='select-all-themes' and @name='{sector_name}']"),
+                timeout=timeout, label="sector themes rendered", baseline=3
+            )
+            print(f"✓ Sector '{sector_name}' selected")
+            return True
+    
+    print(f"✗ Sector '{sector_name}' not found")
+    return False
+
+
+def close_select2(driver):
+    # a dropdown left open by a failed attempt would swallow the next click on it
+    driver.driver.execute_script("if (window.jQuery && jQuery.fn.select2) jQuery('.maingrouping-select').select2('close');")
+
+
+def select_themes(driver, sector_name, indicators=None, timeout=10):
+    """Tick SELECT ALL THEMES for the sector, then untick whatever is outside indicators when given"""
+    # Click "SELECT ALL THEMES" checkbox
+    print("Selecting all themes...")
+    select_all_checkbox = WebDriverWait(driver.driver, timeout).until(
+        EC.presence_of_element_located((By.XPATH, f"//input[@class='select-all-themes' and @name='{sector_name}']"))
+    )
+    driver.driver.execute_script("arguments[0].scrollIntoView(true);", select_all_checkbox)
+    
+    if select_all_checkbox.is_selected():
+        driver.driver.execute_script("arguments[0].click();", select_all_checkbox)
+        driver.wait_for(lambda d: not select_all_checkbox.is_selected(), timeout=timeout / 2, label="themes unchecked", baseline=1)
+    
+    driver.driver.execute_script("arguments[0].click();", select_all_checkbox)
+    driver.wait_for(lambda d: select_all_checkbox.is_selected(), timeout=timeout / 2, label="themes checked", baseline=0)
+    driver.wait_for_network_idle(timeout=timeout * 1.5, baseline=2)
+    print("✓ All themes selected")
+
+    if indicators is not None:
+        kept = driver.driver.execute_script(KEEP_INDICATORS_JS, list(indicators))
+        driver.wait_for_network_idle(timeout=timeout * 1.5, baseline=1)
+        if kept != len(indicators):
+            print(f"⚠ Only {kept} of the shard's {len(indicators)} indicators could be selected")
+        print(f"✓ Kept {kept} indicators for this shard")
+
+
+def select_years(driver, timeout=10):
+    """Tick the "All" box of the year filter"""
+    # Select ALL years before clicking APPLY
+    print("Selecting all years (2000-2024)...")
+    # Find and click the year filter label to open dropdown
+    year_filter_label = WebDriverWait(driver.driver, timeout).until(
+        EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'year-filter-field')]//a[contains(@class, 'filter-field-label')]"))
+    )
+    driver.driver.execute_script("arguments[0].scrollIntoView(true);", year_filter_label)
+    driver.driver.execute_script("arguments[0].click();", year_filter_label)
+    
+    # Find and click "All" checkbox for years
+    year_all_checkbox = driver.wait_for(
+        lambda d: d.find_element(By.XPATH, 
+            "//div[contains(@class, 'year-filter-field')]//span[@class='checkbox-label' and text()='All']/preceding-sibling::input"
+        ),
+        timeout=timeout, label="year filter opened", baseline=2
+    )
+    
+    # First uncheck if already checked (to ensure clean state)
+    if year_all_checkbox.is_selected():
+        driver.driver.execute_script("arguments[0].click();", year_all_checkbox)
+        driver.wait_for(lambda d: not year_all_checkbox.is_selected(), timeout=timeout / 2, label="years unchecked", baseline=1)
+    
+    # Then check it to select all years
+    driver.driver.execute_script("arguments[0].click();", year_all_checkbox)
+    driver.wait_for(lambda d: year_all_checkbox.is_selected(), timeout=timeout / 2, label="years checked", baseline=2)
+    print("✓ All years selected")
+    
+    # Close the year dropdown (clicks go through js so no need to wait for it to collapse)
+    driver.driver.execute_script("arguments[0].click();", year_filter_label)
+    driver.wait_for_network_idle(timeout=timeout, baseline=1)
+
+
+def apply_filters(driver, timeout=60):
+    """Click APPLY and wait for the filter request to finish and every chart to finish rendering"""
+    # Click APPLY button
+    print("Clicking APPLY button...")
+    apply_button = WebDriverWait(driver.driver, 10).until(
+        EC.element_to_be_clickable((By.CLASS_NAME, "apply-btn"))
+    )
+    driver.driver.execute_script("arguments[0].scrollIntoView(true);", apply_button)
+    driver.driver.execute_script("arguments[0].click();", apply_button)
+    print("✓ APPLY button clicked, waiting for data to load...")
+    driver.wait_for_network_idle(timeout=timeout, baseline=8)
+    driver.wait_for_charts_stable(timeout=timeout)
+
+
+def extract_chart_data(driver, sector_name, checkpoint=None, payload=None):
+    """Extract data from all Highcharts on the page, or from a payload the shards already extracted"""
+    all_rows = pd.DataFrame(columns=COLUMNS)
     
     try:
-        chart_data_list = driver.driver.execute_script(extract_script)
+        if payload is None:
+            with metrics.phase("js_extract"):
+                payload = driver.driver.execute_script(EXTRACT_SCRIPT)
+        count_payload(payload)
+        
+        indicators_metadata = [parse_indicator(*ind) for ind in payload["indicators"]]
+        print(f"  Found {len(indicators_metadata)} selected indicators")
         
-        if not chart_data_list:
+        if not payload["value"]:
             print("  ✗ No chart data found")
             return all_rows
         
-        print(f"  Found {len(chart_data_list)} country-indicator combinations")
-        
-        # Group data by chart index
-        charts_by_index = {}
-        for data in chart_data_list:
-            chart_idx = data.get("chartIndex", 0)
-            if chart_idx not in charts_by_index:
-                charts_by_index[chart_idx] = []
-            charts_by_index[chart_idx].append(data)
-        
-        # Create country serial mapping that resets for each indicator
-        country_serial_map = {}
-        
-        # Process each chart
-        for chart_idx, chart_countries_list in sorted(charts_by_index.items()):
-            # Get indicator metadata for this chart
-            if chart_idx < len(indicators_metadata):
-                indicator = indicators_metadata[chart_idx]
-                sub_sector = indicator["theme"]
-                sub_sub_sector = indicator["label"]
-                metric = indicator["metric"]
-                unit = indicator["unit"]
+        with metrics.phase("transform"):
+            if checkpoint is None:
+                all_rows = payload_to_frame(payload, indicators_metadata, sector_name)
             else:
-                # Fallback to chart title
-                sample_data = chart_countries_list[0]
-                chart_title = sample_data.get("chartTitle")
-                unit = sample_data.get("yAxisTitle", "")
-                
-                # Handle None chart_title
-                if chart_title and "(" in chart_title:
-                    metric = chart_title.split("(")[0].strip().rstrip(" -")
-                    sub_sub_sector = chart_title
-                elif chart_title:
-                    metric = chart_title
-                    sub_sub_sector = chart_title
-                else:
-                    metric = "Unknown"
-                    sub_sub_sector = "Unknown"
-                
-                sub_sector = "Unknown"
-            
-            print(f"    Processing Chart {chart_idx + 1}: {sub_sub_sector}")
-            
-            # Reset country serial for each indicator
-            indicator_key = f"{sub_sector}_{metric}_{unit}"
-            if indicator_key not in country_serial_map:
-                country_serial_map[indicator_key] = {}
-            
-            country_counter = 1
-            
-            # Process each country in this chart
-            for data in chart_countries_list:
-                country = data.get("country", "Unknown")
-                year_data = data.get("yearData", {})
-                
-                # Assign country serial (resets after 55 countries)
-                if country not in country_serial_map[indicator_key]:
-                    country_serial_map[indicator_key][country] = country_counter
-                    country_counter += 1
-                    if country_counter > 55:
-                        country_counter = 1
-                
-                country_serial = country_serial_map[indicator_key][country]
-                
-                # Initialize row
-                row_dict = {
-                    "country": country,
-                    "country_serial": country_serial,
-                    "metric": metric,
-                    "unit": unit,
-                    "sector": sector_name,
-                    "sub_sector": sub_sector,
-                    "sub_sub_sector": sub_sub_sector,
-                    "source_link": BASE_URL,
-                    "source": "Africa Energy Portal"
-                }
-                
-                # Initialize all year columns with empty values
-                for year in range(2000, 2025):
-                    row_dict[str(year)] = ""
-                
-                # Populate year data
-                for year_str, value in year_data.items():
-                    # Clean year string (remove any extra text)
-                    year_clean = re.search(r'(20\d{2})', str(year_str))
-                    if year_clean:
-                        year_key = year_clean.group(1)
-                        if year_key in row_dict:
-                            row_dict[year_key] = value
-                
-                all_rows.append(row_dict)
-                
-                # Log with year info
-                years_with_data = [y for y in year_data.keys()]
-                if years_with_data:
-                    print(f"      ✓ {country} (serial: {country_serial}): {len(years_with_data)} years")
+                all_rows = checkpoint_charts(checkpoint, payload, indicators_metadata, sector_name)
+        metrics.count("rows", len(all_rows))
+        print(f"  Found {len(all_rows)} country-indicator combinations ({len(payload['value'])} points)")
     
     except Exception as e:
         print(f"  ✗ Error extracting chart data: {e}")
@@ -340,79 +296,345 @@ def extract_chart_data(driver, sector_name):
     return all_rows
 
 
-def scrape_all_sectors():
-    """Main function to scrape all sectors"""
-    sectors = ["Electricity", "Energy", "Social and Economic"]
+def iter_chart_data(driver, sector_name, payload=None):
+    """Yield each chart's staging rows as soon as it is transformed"""
+    if payload is None:
+        with metrics.phase("js_extract"):
+            payload = driver.driver.execute_script(EXTRACT_SCRIPT)
+    count_payload(payload)
+    indicators_metadata = [parse_indicator(*ind) for ind in payload["indicators"]]
+    print(f"  Found {len(indicators_metadata)} selected indicators")
+
+    if not payload["value"]:
+        print("  ✗ No chart data found")
+        return
+
+    # the vectorized transform takes milliseconds, charts are then handed out one at a time
+    with metrics.phase("transform"):
+        frame = payload_to_frame(payload, indicators_metadata, sector_name, chart_index=True)
+    metrics.count("rows", len(frame))
+    chart_index = frame.pop("chart_index").to_numpy()
+    for _, chart_rows in frame.groupby(chart_index, sort=False):
+        yield chart_rows
+
+
+def scrape_sector_shards(driver, sector_name, shard_size, pool=None):
+    """Render a sector's indicators shard_size at a time, each shard in its own tab (or pool worker), returns the merged payload"""
+    if not prepare_sector(driver, sector_name, apply=False):
+        return None
+    indicators = driver.driver.execute_script(SELECTED_INDICATORS_JS)
+    shards = [indicators[i:i + shard_size] for i in range(0, len(indicators), shard_size)]
+    print(f"\nSplitting {len(indicators)} indicators into {len(shards)} shards of up to {shard_size}")
+
+    if pool is None:
+        payloads = [scrape_shard(driver, sector_name, shard) for shard in shards]
+    else:
+        payloads = []
+        # results are collected in submit order so charts keep the order of the unsharded page
+        for future in [pool.submit(_scrape_shard_job, sector_name, shard) for shard in shards]:
+            payload, snapshot = future.result()
+            metrics.merge(snapshot)
+            payloads.append(payload)
+
+    failed = sum(payload is None for payload in payloads)
+    if failed:
+        # a partial sector would look like deleted charts to the checkpoint and the delta loader
+        print(f"✗ {failed} of {len(shards)} shards of {sector_name} did not load")
+        return None
+    metrics.count("shards", len(shards))
+    return merge_payloads(payloads)
+
+
+def scrape_shard(driver, sector_name, indicators):
+    """Apply one shard of indicators in a new tab and extract its charts, None when they don't load"""
+    with driver.new_tab(BASE_URL):
+        if not prepare_sector(driver, sector_name, indicators):
+            return None
+        with metrics.phase("js_extract"):
+            return driver.driver.execute_script(EXTRACT_SCRIPT)
+
+
+def count_payload(payload):
+    metrics.count("charts", len(payload["charts"]))
+    metrics.count("points", len(payload["value"]))
+
+
+def checkpoint_charts(checkpoint, payload, indicators_metadata, sector_name):
+    """Store only the charts whose data changed since the last checkpoint"""
+    hashes, positions = chart_hashes(payload, indicators_metadata)
+    changed = checkpoint.changed_charts(sector_name, hashes)
+    removed = checkpoint.update_positions(sector_name, positions)
+    print(f"  {len(changed)} of {len(hashes)} charts changed since the last checkpoint")
+    
+    if changed:
+        # country serials are numbered across every chart sharing an indicator, so the whole
+        # payload is transformed and only the changed charts' rows are kept
+        frame = payload_to_frame(payload, indicators_metadata, sector_name, chart_index=True)
+        charts = dict(list(frame.groupby("chart_index", sort=False)))
+        for indicator in changed:
+            chart_rows = charts.get(positions[indicator], frame.iloc[0:0]).drop(columns="chart_index")
+            checkpoint.save_chart(sector_name, indicator, positions[indicator], hashes[indicator], chart_rows)
+    
+    all_rows = checkpoint.load_sector(sector_name)
+    all_rows.attrs["changed_charts"] = len(changed) + removed
+    return all_rows
+
+
+# each pool worker process keeps one Driver alive across the sectors it scrapes
+_worker_driver = None
+_worker_checkpoint = None
+_worker_headless = False
+_worker_lean = False
+_worker_shard_size = None
+
+
+def open_database(driver):
+    """Navigate to the database page and close the cookie banner"""
+    print(f"Navigating to {BASE_URL}")
+    driver.driver.get(BASE_URL)
+    driver.wait_for_document_ready(baseline=3)
+    driver.check_lean_page(".maingrouping-select + .select2", BASE_URL)
+    record_page_stats(driver, "loaded")
     
-    driver = Driver()
-    driver.setup_driver(headless=False)
+    # a reused session already accepted the banner, don't sit out the 5s wait for it again
+    if driver.banner_closed:
+        return
     
+    # Handle cookie banner
     try:
-        # Navigate to the database page
-        print(f"Navigating to {BASE_URL}")
-        driver.driver.get(BASE_URL)
-        driver.wait(3)
-        
-        # Handle cookie banner
+        cookie_button = WebDriverWait(driver.driver, 5).until(
+            EC.element_to_be_clickable((By.XPATH, 
+                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or "
+                "contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or "
+                "contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'ok')]"
+            ))
+        )
+        driver.driver.execute_script("arguments[0].click();", cookie_button)
+        print("✓ Cookie banner closed")
+        driver.banner_closed = True
+        driver.wait_for(EC.invisibility_of_element(cookie_button), timeout=5, label="cookie banner closed", baseline=2)
+    except:
+        print("No cookie banner found")
+
+
+def record_page_stats(driver, stage):
+    """Record the page's load time and size and the browser's memory at a stage of the scrape"""
+    try:
+        stats = driver.page_stats()
+    except Exception as e:
+        print(f"  ⚠ Could not read page stats: {e}")
+        return
+    if stage == "loaded":
+        if stats.get("load_ms"):
+            metrics.record_phase("page_load", stats["load_ms"] / 1000)
+        print(f"  Page loaded in {stats.get('load_ms') or 0:.0f}ms ({stats.get('resources', 0)} resources, "
+              f"{stats.get('transfer_bytes', 0) / 1e3:.0f} kB, browser RSS {stats.get('browser_rss_mb') or 0:.0f} MB)")
+    else:
+        metrics.count("bytes_transferred", int(stats.get("transfer_bytes") or 0))
+    metrics.peak(f"browser_rss_mb_{stage}", stats.get("browser_rss_mb"))
+    metrics.peak(f"js_heap_mb_{stage}", stats.get("js_heap_mb"))
+
+
+def _init_worker(headless, checkpoint_path=None, lean=False, shard_size=None, retry_budget=RETRY_BUDGET):
+    """Set up the Driver owned by a pool worker process"""
+    global _worker_driver, _worker_checkpoint, _worker_headless, _worker_lean, _worker_shard_size
+    _worker_headless, _worker_lean, _worker_shard_size = headless, lean, shard_size
+    # each worker process retries out of its own budget
+    reset_budget(retry_budget)
+    _worker_driver = Driver()
+    _worker_driver.setup_driver(headless=headless, lean=lean)
+    # workers join the run the parent process started
+    _worker_checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    # close the browser when the pool shuts the worker down
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    if _worker_driver:
+        _worker_driver.close_driver()
+
+
+def _scrape_sector_job(sector):
+    """Scrape one sector on the worker's own Driver from a fresh database page"""
+    _worker_driver.ensure_session(headless=_worker_headless, lean=_worker_lean)
+    open_database(_worker_driver)
+    sector_data = scrape_sector_data(_worker_driver, sector, _worker_checkpoint, _worker_shard_size)
+    # the worker's metrics travel back with its rows and are merged into the parent's registry
+    sector_data.attrs["metrics"] = metrics.snapshot()
+    metrics.reset()
+    return sector_data
+
+
+def _scrape_shard_job(sector, indicators):
+    """Scrape one indicator shard on the worker's own Driver, returns its payload and the worker's metrics"""
+    _worker_driver.ensure_session(headless=_worker_headless, lean=_worker_lean)
+    if not _worker_driver.banner_closed:
+        open_database(_worker_driver)
+    try:
+        payload = scrape_shard(_worker_driver, sector, indicators)
+    except Exception as e:
+        print(f"✗ Error scraping a shard of {sector}: {e}")
+        payload = None
+    snapshot = metrics.snapshot()
+    metrics.reset()
+    return payload, snapshot
+
+
+def scrape_sectors_pooled(sectors, workers, headless=False, checkpoint_path=None, lean=False, shard_size=None,
+                          retry_budget=RETRY_BUDGET):
+    """Scrape sectors concurrently on a pool of Drivers, results keep the order of sectors"""
+    results = {}
+    initargs = (headless, checkpoint_path, lean, shard_size, retry_budget)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        futures = {pool.submit(_scrape_sector_job, sector): sector for sector in sectors}
+        for future in as_completed(futures):
+            sector = futures[future]
+            try:
+                results[sector] = future.result()
+                metrics.merge(results[sector].attrs.pop("metrics", {}))
+            except Exception as e:
+                print(f"✗ Worker failed scraping {sector}: {e}")
+                results[sector] = pd.DataFrame(columns=COLUMNS)
+            print(f"✓ Worker finished {sector}: {len(results[sector])} rows")
+    # merge in the same order as the sequential run
+    return [(sector, results[sector]) for sector in sectors]
+
+
+def finish_sector(sector, sector_data, checkpoint=None, csv=False):
+    """Write a sector's staging file unless its checkpointed charts are unchanged"""
+    if sector_data.empty:
+        print(f"\n✗ No data collected for {sector}\n")
+        return
+    
+    unchanged = checkpoint is not None and sector_data.attrs.get("changed_charts") == 0
+    if unchanged and os.path.exists(staging_filename(sector)):
+        print(f"\n✓ No charts changed for {sector}, keeping {staging_filename(sector)}\n")
+    else:
+        save_sector_data(sector, sector_data, csv)
+    
+    if checkpoint is not None:
+        checkpoint.finish_sector(sector, sector_data.attrs.get("changed_charts", 0))
+
+
+def scrape_all_sectors(workers=1, headless=False, checkpoint_path=None, resume=True, csv=False, driver=None, profile_dir=None,
+                       lean=False, shard_size=None, shard_workers=1, retry_budget=RETRY_BUDGET):
+    """Main function to scrape all sectors, a driver passed in is reused and left open for the next job"""
+    sectors = SECTORS
+    reset_budget(retry_budget)
+    checkpoint = Checkpoint(checkpoint_path, resume=resume) if checkpoint_path else None
+    
+    if checkpoint is not None:
+        for sector in [sector for sector in sectors if checkpoint.sector_done(sector)]:
+            print(f"✓ {sector} already completed in run {checkpoint.run_id}, skipping")
+        sectors = [sector for sector in sectors if not checkpoint.sector_done(sector)]
+    
+    if workers > 1:
+        if profile_dir:
+            print("⚠ Pooled drivers can't share a chrome profile, --user-data-dir is ignored with --workers")
+        if shard_workers > 1:
+            print("⚠ Sector workers scrape their shards one tab at a time, --shard-workers is ignored with --workers")
+        start = time.perf_counter()
+        print(f"Scraping {len(sectors)} sectors with {workers} pooled drivers")
         try:
-            cookie_button = WebDriverWait(driver.driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') or "
-                    "contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'agree') or "
-                    "contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'ok')]"
-                ))
-            )
-            driver.driver.execute_script("arguments[0].click();", cookie_button)
-            print("✓ Cookie banner closed")
-            driver.wait(2)
-        except:
-            print("No cookie banner found")
+            for sector, sector_data in scrape_sectors_pooled(sectors, workers, headless, checkpoint_path, lean, shard_size, retry_budget):
+                finish_sector(sector, sector_data, checkpoint, csv)
+            if checkpoint is not None:
+                checkpoint.finish_run()
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+            print("\n" + "="*60)
+            print(f"Scraping completed in {time.perf_counter() - start:.1f}s!")
+            print("="*60)
+            print_summary()
+        return
+    
+    own_driver = driver is None
+    if own_driver:
+        driver = Driver()
+    driver.ensure_session(headless=headless, profile_dir=profile_dir, lean=lean)
+    shard_pool = None
+    if shard_size and shard_workers > 1:
+        # shard workers bring up their own browsers, they don't share the main driver's profile
+        shard_pool = ProcessPoolExecutor(max_workers=shard_workers, initializer=_init_worker, initargs=(headless, None, lean, None, retry_budget))
+    
+    try:
+        # Navigate to the database page
+        open_database(driver)
         
         # Scrape each sector
         for sector in sectors:
-            sector_data = scrape_sector_data(driver, sector)
-            
-            if sector_data:
-                # Convert to DataFrame
-                df = pd.DataFrame(sector_data)
-                
-                # Ensure all year columns exist
-                for year in range(2000, 2025):
-                    if str(year) not in df.columns:
-                        df[str(year)] = ""
-                
-                # Reorder columns
-                columns = [
-                    "country", "country_serial", "metric", "unit", "sector",
-                    "sub_sector", "sub_sub_sector", "source_link", "source"
-                ] + [str(year) for year in range(2000, 2025)]
-                df = df[columns]
-                
-                # Save to CSV
-                filename = f"africa_energy_{sector.lower().replace(' ', '_')}_data.csv"
-                df.to_csv(filename, index=False)
-                print(f"\n✓ Saved {sector} data to {filename} ({len(df)} rows)\n")
-                
-                # Print summary
-                print(f"Summary for {sector}:")
-                print(f"  - Unique countries: {df['country'].nunique()}")
-                print(f"  - Unique metrics: {df['metric'].nunique()}")
-                print(f"  - Sub-sectors: {df['sub_sector'].unique().tolist()}")
-            else:
-                print(f"\n✗ No data collected for {sector}\n")
+            sector_data = scrape_sector_data(driver, sector, checkpoint, shard_size, shard_pool)
+            finish_sector(sector, sector_data, checkpoint, csv)
             
             # Navigate back to base page for next sector
             if sector != sectors[-1]:
                 print(f"\nNavigating back to base page for next sector...")
                 driver.driver.get(BASE_URL)
-                driver.wait(5)
+                driver.wait_for_document_ready(baseline=5)
+        
+        if checkpoint is not None:
+            checkpoint.finish_run()
     
     finally:
-        driver.close_driver()
+        if shard_pool is not None:
+            shard_pool.shutdown()
+        if own_driver:
+            driver.close_driver()
+        if checkpoint is not None:
+            checkpoint.close()
         print("\n" + "="*60)
         print("Scraping completed!")
         print("="*60)
+        print_summary()
+
+
+def scrape_scheduled(runs=1, interval=0, headless=False, profile_dir=None, **kwargs):
+    """Run several scrape jobs in a row on one long-lived driver session"""
+    driver = Driver()
+    try:
+        for run in range(runs):
+            if run:
+                print(f"\nNext run in {interval:.0f}s...")
+                time.sleep(interval)
+            start = time.perf_counter()
+            scrape_all_sectors(headless=headless, driver=driver, profile_dir=profile_dir, **kwargs)
+            print(f"✓ Run {run + 1} of {runs} finished in {time.perf_counter() - start:.1f}s")
+    finally:
+        driver.close_driver()
 
 
 if __name__ == "__main__":
-    scrape_all_sectors()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape the Africa Energy Portal database")
+    parser.add_argument("--workers", type=int, default=1, help="number of pooled drivers scraping sectors concurrently")
+    parser.add_argument("--headless", action="store_true", help="run chrome without a visible window")
+    parser.add_argument("--checkpoint", metavar="PATH", help="sqlite checkpoint file for resumable, incremental scraping")
+    parser.add_argument("--csv", action="store_true", help="also export each sector as csv next to its parquet staging file")
+    parser.add_argument("--fresh", action="store_true", help="start a new checkpoint run instead of resuming an unfinished one")
+    parser.add_argument("--metrics-dir", default=metrics.METRICS_DIR, help="where the json and prometheus run reports are written")
+    parser.add_argument("--profile", action="store_true", help="run under cProfile and save the stats next to the reports")
+    parser.add_argument("--user-data-dir", metavar="PATH", help="persistent chrome profile, keeps the portal's assets cached between runs")
+    parser.add_argument("--runs", type=int, default=1, help="scrape jobs to run back to back on one browser session")
+    parser.add_argument("--interval", type=float, default=0, help="seconds to wait between --runs")
+    parser.add_argument("--lean", action="store_true", help="block images, media, fonts and trackers while scraping")
+    parser.add_argument("--shard-size", type=int, help="render a sector's indicators this many at a time, each chunk in its own tab")
+    parser.add_argument("--shard-workers", type=int, default=1, help="scrape shards in parallel on this many pooled drivers")
+    parser.add_argument("--retry-budget", type=int, default=RETRY_BUDGET, help="step retries allowed per run (per process with pooled drivers)")
+    args = parser.parse_args()
+    if args.workers > 1:
+        if args.runs > 1 or args.interval:
+            print("⚠ Pooled drivers are started fresh for one run, --runs and --interval are ignored with --workers")
+        # profile_dir and shard_workers go along so scrape_all_sectors warns that it ignores them too
+        metrics.run(
+            scrape_all_sectors, workers=args.workers, headless=args.headless, checkpoint_path=args.checkpoint,
+            resume=not args.fresh, csv=args.csv, profile_dir=args.user_data_dir, lean=args.lean, shard_size=args.shard_size,
+            shard_workers=args.shard_workers, retry_budget=args.retry_budget,
+            name="scrape", directory=args.metrics_dir, profile=args.profile
+        )
+    else:
+        metrics.run(
+            scrape_scheduled, args.runs, args.interval, headless=args.headless, profile_dir=args.user_data_dir,
+            checkpoint_path=args.checkpoint, resume=not args.fresh, csv=args.csv, lean=args.lean,
+            shard_size=args.shard_size, shard_workers=args.shard_workers, retry_budget=args.retry_budget,
+            name="scrape", directory=args.metrics_dir, profile=args.profile
+        )
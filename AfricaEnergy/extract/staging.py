@@ -0,0 +1,85 @@
+import os
+import sys
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from charts import COLUMNS, YEARS
+import metrics
+
+"""
+typed parquet staging files. the scraper writes every sector with an explicit arrow schema: the repeated string columns are dictionary encoded, country_serial is a small int and the year columns are float64 with nulls for missing years, so the loaders read typed columns back instead of re-inferring dtypes from csv text.
+
+STAGING_SCHEMA is the schema every staging file is written with
+to_table(df) casts a staging frame to STAGING_SCHEMA (dropping a stray "Unnamed: 0" index column from old csv files)
+write_staging(df, path) writes a zstd compressed, dictionary encoded parquet file
+STAGING_DIR and STAGING_FILES say where each sector's staging file lives, staging_filename(sector, extension) builds its path, loader.py reads the same files
+save_sector_data(sector, df, csv=False) writes a sector's parquet staging file (plus a csv export when asked) and prints a short summary
+python staging.py file.csv [...] converts existing csv staging files to parquet next to them
+"""
+
+STAGING_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "staging_data"))
+STAGING_FILES = {
+    "Electricity": "africa_energy_electricity_data",
+    "Energy": "africa_energy_data",
+    "Social and Economic": "africa_social_and_economic_data",
+}
+STRING = pa.dictionary(pa.int32(), pa.string())
+STAGING_SCHEMA = pa.schema(
+    [
+        ("country", STRING),
+        ("country_serial", pa.int16()),
+        ("metric", STRING),
+        ("unit", STRING),
+        ("sector", STRING),
+        ("sub_sector", STRING),
+        ("sub_sub_sector", STRING),
+        ("source_link", STRING),
+        ("source", STRING),
+    ]
+    + [(year, pa.float64()) for year in YEARS]
+)
+
+
+def to_table(df):
+    """Cast a staging frame to the staging schema"""
+    df = df.drop(columns=["Unnamed: 0"], errors="ignore")
+    for year in YEARS:
+        df[year] = pd.to_numeric(df[year], errors="coerce") if year in df.columns else float("nan")
+    return pa.Table.from_pandas(df[COLUMNS], preserve_index=False).cast(STAGING_SCHEMA)
+
+
+def write_staging(df, path):
+    pq.write_table(to_table(df), path, compression="zstd", use_dictionary=True)
+    return path
+
+
+def staging_filename(sector, extension="parquet"):
+    return os.path.join(STAGING_DIR, f"{STAGING_FILES[sector]}.{extension}")
+
+
+def save_sector_data(sector, df, csv=False):
+    """Save a sector's rows to its staging file and print a summary"""
+    # Save to Parquet, csv stays available as an export
+    with metrics.phase("file_write"):
+        os.makedirs(STAGING_DIR, exist_ok=True)
+        filename = write_staging(df, staging_filename(sector))
+        print(f"\n✓ Saved {sector} data to {filename} ({len(df)} rows)\n")
+        if csv:
+            csv_filename = staging_filename(sector, "csv")
+            df[COLUMNS].to_csv(csv_filename, index=False)
+            print(f"✓ Exported {sector} data to {csv_filename}")
+
+    # Print summary
+    print(f"Summary for {sector}:")
+    print(f"  - Unique countries: {df['country'].nunique()}")
+    print(f"  - Unique metrics: {df['metric'].nunique()}")
+    print(f"  - Sub-sectors: {df['sub_sector'].unique().tolist()}")
+
+    return filename
+
+
+if __name__ == "__main__":
+    for csv_path in sys.argv[1:]:
+        parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+        write_staging(pd.read_csv(csv_path), parquet_path)
+        print(f"✓ {csv_path} ({os.path.getsize(csv_path) / 1e3:.0f} kB) -> {parquet_path} ({os.path.getsize(parquet_path) / 1e3:.0f} kB)")
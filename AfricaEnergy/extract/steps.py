@@ -0,0 +1,101 @@
+import time
+import random
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, ElementNotInteractableException, JavascriptException, NoSuchElementException,
+    StaleElementReferenceException, TimeoutException
+)
+import metrics
+
+"""
+retryable steps for the scraper. each UI action (opening the sector dropdown, ticking themes, the year filter, APPLY and the charts wait) runs as a named step with its own timeout. when it fails with a transient selenium error it is retried after a jittered exponential backoff, with a longer timeout each attempt, instead of the whole sector coming back empty and being rescraped from the base page.
+
+run_step(name, action, timeout, retries, recover, required) runs action(timeout=...) and retries it, recover() runs before every retry, a step that is not required only warns once its retries are used up
+retries across a run share a budget (RETRY_BUDGET, reset_budget()) so a portal that is really down fails fast instead of retrying every step
+every step counts its runs, retries and failures into the metrics registry (step_<name>_runs/_retries/_failures), summary() and print_summary() report them per step
+"""
+
+RETRIES = 2
+BACKOFF = 1.0
+MAX_BACKOFF = 10.0
+# each retry waits this much longer than the attempt before it
+TIMEOUT_GROWTH = 1.5
+RETRY_BUDGET = 20
+RETRYABLE = (
+    TimeoutException, StaleElementReferenceException, NoSuchElementException, ElementClickInterceptedException,
+    ElementNotInteractableException, JavascriptException,
+)
+
+_budget = {"left": RETRY_BUDGET}
+
+
+class StepFailed(Exception):
+    def __init__(self, name, error):
+        super().__init__(f"Step {name} failed: {error}")
+        self.name = name
+        self.error = error
+
+
+def reset_budget(budget=RETRY_BUDGET):
+    _budget["left"] = budget
+
+
+def backoff_delay(attempt, backoff=BACKOFF, max_backoff=MAX_BACKOFF):
+    """Exponential backoff with jitter, so retries of parallel workers don't hit the portal in step"""
+    delay = min(max_backoff, backoff * 2 ** attempt)
+    return random.uniform(delay / 2, delay)
+
+
+def run_step(name, action, *args, timeout=10, retries=RETRIES, backoff=BACKOFF, recover=None, required=True, **kwargs):
+    """Run action as a named step, retrying transient failures, returns what action returned"""
+    metrics.count(f"step_{name}_runs")
+    attempt = 0
+    while True:
+        try:
+            return action(*args, timeout=timeout * TIMEOUT_GROWTH ** attempt, **kwargs)
+        except RETRYABLE as e:
+            error = (e.msg or type(e).__name__).strip().splitlines()[0]
+            if attempt >= retries or _budget["left"] <= 0:
+                metrics.count(f"step_{name}_failures")
+                if _budget["left"] <= 0:
+                    error += " (retry budget used up)"
+                if required:
+                    raise StepFailed(name, error) from e
+                print(f"⚠ Step {name} failed: {error}, continuing anyway")
+                return None
+
+            attempt += 1
+            _budget["left"] -= 1
+            metrics.count(f"step_{name}_retries")
+            delay = backoff_delay(attempt - 1, backoff)
+            print(f"  ⚠ {name} failed ({error}), retry {attempt} of {retries} in {delay:.1f}s")
+            time.sleep(delay)
+            if recover is not None:
+                try:
+                    recover()
+                except Exception as e:
+                    print(f"  ⚠ Could not recover before retrying {name}: {e}")
+        except Exception:
+            # anything else is not worth retrying, still count it against the step
+            metrics.count(f"step_{name}_failures")
+            raise
+
+
+def summary(snapshot=None):
+    """Runs, retries and failures per step from the metrics registry"""
+    counters = (snapshot or metrics.snapshot())["counters"]
+    steps = {}
+    for counter, value in counters.items():
+        if counter.startswith("step_"):
+            name, _, kind = counter[len("step_"):].rpartition("_")
+            steps.setdefault(name, {"runs": 0, "retries": 0, "failures": 0})[kind] = value
+    return steps
+
+
+def print_summary(snapshot=None):
+    steps = summary(snapshot)
+    if not steps:
+        return
+    print(f"\n  {'step':<18}{'runs':>6}{'retries':>9}{'failures':>10}")
+    for name, entry in steps.items():
+        flag = " ✗" if entry["failures"] else (" ⚠" if entry["retries"] else "")
+        print(f"  {name:<18}{entry['runs']:>6}{entry['retries']:>9}{entry['failures']:>10}{flag}")
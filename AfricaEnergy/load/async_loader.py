@@ -0,0 +1,225 @@
+import os
+import time
+import asyncio
+import inspect
+import argparse
+from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError, OperationFailure
+from client import add_client_arguments, build_client, bulk_options, client_settings, get_client, settings_of, uri_of
+from bulk import NATURAL_KEY_INDEX, bulk_counts, documents_written, is_stale_index, keyed_chunks, upsert_operations
+from loader import (
+    BATCH_SIZE, CHUNK_SIZE, DATABASE, clean_chunk, load_file, notify_load_complete, parse_jobs, read_chunks, report_failures
+)
+import metrics
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:
+    # pymongo < 4.10 has no async api, motor wraps the same driver
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+    except ImportError:
+        AsyncMongoClient = None
+
+"""
+asyncio backend for the loader. batches from every staging file go through one event loop with up to concurrency insert_many/bulk_write calls in flight at once across the collections, instead of one blocking call at a time. uses the async pymongo api when available and motor on older pymongo versions.
+
+load_file_async(collection, path, semaphore) streams a staging file and schedules its batches, waiting for a free slot before reading more so memory stays bounded
+load_collections_async(uri, jobs, concurrency, batch_size, mode) loads several collections on one async client and reports p50/p95/p99 batch latency
+load_staging(collection, path, backend) is what the load_*_data(collection) entry points call, backend="sync" keeps using loader.load_file
+    backend="async" reaches the server, database and client settings of the collection it is given (its client has to come from client.py) and takes chunk_size, batch_size and mode="insert"/"upsert", other load_file options are refused
+
+python async_loader.py --concurrency 8 --batch-size 1000
+python async_loader.py --compare                      times a one-shot sync insert against the async backend on a scratch database
+python async_loader.py --metrics-dir metrics          writes the json/prometheus run report there, batches are timed as mongo_insert like the sync loader
+"""
+
+CONCURRENCY = 8
+
+
+def async_client(uri, **settings):
+    if AsyncMongoClient is None:
+        raise RuntimeError("The async backend needs pymongo>=4.10 or motor (pip install motor)")
+    # async clients belong to one event loop, so they get the shared client's options but aren't shared themselves
+    return build_client(uri, AsyncMongoClient, **settings)
+
+
+async def close_client(client):
+    # motor closes synchronously, the async pymongo client has to be awaited
+    result = client.close()
+    if inspect.isawaitable(result):
+        await result
+
+
+def percentiles(latencies):
+    """p50, p95 and p99 of the batch latencies in milliseconds"""
+    if not latencies:
+        return {"p50": 0, "p95": 0, "p99": 0}
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+async def write_batch(collection, batch, mode, latencies):
+    """Write one batch, returns the number of documents written and records its latency"""
+    start = time.perf_counter()
+    try:
+        if mode == "upsert":
+            operations = upsert_operations(batch)
+            counts = bulk_counts((await collection.bulk_write(operations, ordered=False, **bulk_options(collection))).bulk_api_result)
+        else:
+            inserted = len((await collection.insert_many(batch, ordered=False, **bulk_options(collection))).inserted_ids)
+            counts = bulk_counts({"nInserted": inserted})
+    except BulkWriteError as e:
+        counts = report_failures(collection, e)
+    seconds = time.perf_counter() - start
+    latencies.append(seconds * 1000)
+    # batches overlap, so mongo_insert adds up time in flight rather than wall clock time
+    metrics.record_phase("mongo_insert", seconds)
+    metrics.count("documents_written", documents_written(counts))
+    return documents_written(counts)
+
+
+async def load_file_async(collection, path, semaphore, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, mode="insert", latencies=None):
+    """Stream a staging file into a collection with batches running concurrently"""
+    start = time.perf_counter()
+    latencies = [] if latencies is None else latencies
+    if mode == "upsert":
+        try:
+            if is_stale_index(await collection.index_information(), NATURAL_KEY_INDEX, "natural_key"):
+                await collection.drop_index("natural_key")
+            await collection.create_index(NATURAL_KEY_INDEX, unique=True, name="natural_key")
+        except OperationFailure as e:
+            print(f"  ⚠ Could not create natural_key index on {collection.name}: {e}")
+
+    async def run(batch):
+        try:
+            return await write_batch(collection, batch, mode, latencies)
+        finally:
+            semaphore.release()
+
+    tasks = []
+    try:
+        for chunk in keyed_chunks(read_chunks(path, chunk_size)):
+            documents = clean_chunk(chunk)
+            for i in range(0, len(documents), batch_size):
+                # a slot frees up only when a write finishes, so reading never runs far ahead of the database
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(run(documents[i:i + batch_size])))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    except Exception as e:
+        print(f"Error loading data to collection: {e}")
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    for error in errors[:3]:
+        print(f"  ✗ Batch failed for {collection.name}: {error}")
+    rows = sum(result for result in results if not isinstance(result, Exception))
+    seconds = time.perf_counter() - start
+    rate = rows / seconds if seconds else 0
+    print(f"Loaded {rows} documents into {collection.name} in {seconds:.2f}s ({rate:.0f} rows/sec, {len(tasks)} batches)")
+    return {"collection": collection.name, "rows": rows, "seconds": seconds, "rows_per_sec": rate, "batches": len(tasks)}
+
+
+async def load_collections_async(uri, jobs, concurrency=CONCURRENCY, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, mode="insert",
+                                 database=DATABASE, settings=None):
+    """Load several (collection name, staging path) jobs with one shared limit on batches in flight"""
+    start = time.perf_counter()
+    client = async_client(uri, **(settings or {}))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    try:
+        db = client.get_database(database)
+        stats = await asyncio.gather(*[
+            load_file_async(db.get_collection(name), path, semaphore, chunk_size, batch_size, mode, latencies)
+            for name, path in jobs
+        ])
+    finally:
+        await close_client(client)
+
+    seconds = time.perf_counter() - start
+    rows = sum(s["rows"] for s in stats)
+    latency = percentiles(latencies)
+    print(f"\n✓ Loaded {rows} documents into {len(stats)} collections in {seconds:.2f}s "
+          f"({rows / seconds if seconds else 0:.0f} rows/sec, concurrency {concurrency})")
+    print(f"  Batch latency: p50 {latency['p50']:.1f}ms, p95 {latency['p95']:.1f}ms, p99 {latency['p99']:.1f}ms")
+    for collection_stats in stats:
+        notify_load_complete(collection_stats)
+    return {"collections": stats, "rows": rows, "seconds": seconds, "latency_ms": latency}
+
+
+def load_staging(collection, path, backend="sync", concurrency=CONCURRENCY, **kwargs):
+    """Load one staging file into a collection with the sync loader or the async backend"""
+    if backend != "async":
+        return load_file(collection, path, **kwargs)
+    options = async_options(kwargs)
+    # the async client connects to the server, database and collection the sync collection points at, with its client's settings
+    client = collection.database.client
+    stats = asyncio.run(load_collections_async(
+        uri_of(client), [(collection.name, path)], concurrency, database=collection.database.name,
+        settings=settings_of(client), **options
+    ))
+    return dict(stats["collections"][0], latency_ms=stats["latency_ms"])
+
+
+def async_options(options):
+    """The load_file options the async backend takes, others are refused unless they hold their default"""
+    defaults = {name: parameter.default for name, parameter in inspect.signature(load_file).parameters.items()}
+    accepted = {name: value for name, value in options.items() if name in ("chunk_size", "batch_size", "mode")}
+    unsupported = [
+        f"{name}={value!r}" for name, value in options.items()
+        if name not in accepted and (name not in defaults or defaults[name] != value)
+    ]
+    if accepted.get("mode", "insert") not in ("insert", "upsert"):
+        unsupported.append(f"mode={accepted['mode']!r}")
+    if unsupported:
+        raise ValueError(f"The async backend doesn't support {', '.join(unsupported)}, use backend='sync'")
+    return accepted
+
+
+def compare_backends(uri, jobs, concurrency, batch_size, settings=None):
+    """Time a one-shot sync insert_many per collection against the async backend on a scratch database"""
+    scratch = f"{DATABASE}_async_bench"
+    client = get_client(uri, **(settings or {}))
+    try:
+        client.drop_database(scratch)
+        db = client.get_database(scratch)
+        start = time.perf_counter()
+        for name, path in jobs:
+            documents = [doc for chunk in read_chunks(path) for doc in clean_chunk(chunk)]
+            db.get_collection(name).insert_many(documents)
+        sync_seconds = time.perf_counter() - start
+
+        client.drop_database(scratch)
+        stats = asyncio.run(load_collections_async(uri, jobs, concurrency, batch_size=batch_size, database=scratch, settings=settings))
+        print(f"\nsync one-shot insert: {sync_seconds:.2f}s, async backend: {stats['seconds']:.2f}s "
+              f"({sync_seconds / stats['seconds'] if stats['seconds'] else 0:.1f}x)")
+    finally:
+        client.drop_database(scratch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load staging files into MongoDB with concurrent async batches")
+    parser.add_argument("targets", nargs="*", help="collection names, optionally name=path, defaults to every collection")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="batches in flight across all collections")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="documents per write")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows read from a staging file at a time")
+    parser.add_argument("--mode", choices=["insert", "upsert"], default="insert", help="upsert keys documents on NATURAL_KEY so reloads don't duplicate")
+    parser.add_argument("--compare", action="store_true", help="benchmark against a one-shot sync insert on a scratch database")
+    parser.add_argument("--uri", help="MongoDB uri, defaults to MONGO_URI from the environment")
+    parser.add_argument("--metrics-dir", default=metrics.METRICS_DIR, help="where the json and prometheus run reports are written")
+    parser.add_argument("--profile", action="store_true", help="run under cProfile and save the stats next to the reports")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    load_dotenv()
+    uri = args.uri or os.getenv("MONGO_URI")
+    jobs = parse_jobs(args.targets)
+    settings = client_settings(args)
+    if args.compare:
+        compare_backends(uri, jobs, args.concurrency, args.batch_size, settings)
+    else:
+        metrics.run(
+            asyncio.run, load_collections_async(uri, jobs, args.concurrency, args.chunk_size, args.batch_size, args.mode, settings=settings),
+            name="async_load", directory=args.metrics_dir, profile=args.profile
+        )
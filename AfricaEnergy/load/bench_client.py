@@ -0,0 +1,96 @@
+import os
+import time
+import argparse
+import statistics
+import tempfile
+import pandas as pd
+from client import POOL_SIZE, available_compressors, close_clients, get_client
+from loader import COLLECTIONS, load_collections, read_chunks, staging_path
+
+"""
+benchmark of the shared client settings from client.py. loads the staging files (repeated --scale times) into a scratch database on a local mongod once per setting and reports rows/sec against the baseline (pool of POOL_SIZE, no compression, w=1, validation on). each case changes one setting from the baseline. the scratch collections carry a $jsonSchema validator so bypassing validation has something to skip.
+
+wire compression trades cpu for bytes on the network, against a mongod on the same machine it mostly shows the cpu cost, point --uri at the real cluster to see what it saves.
+
+python bench_client.py --uri mongodb://localhost:27017 --scale 20 --rounds 3
+"""
+
+BENCH_DATABASE = "africa_energy_client_bench"
+BASELINE = {"pool_size": POOL_SIZE, "compressors": "", "write_concern": 1, "journal": False, "bypass_validation": False}
+CASES = [
+    ("baseline", {}),
+    ("pool of 1", {"pool_size": 1}),
+    ("snappy", {"compressors": "snappy"}),
+    ("zstd", {"compressors": "zstd"}),
+    ("zlib", {"compressors": "zlib"}),
+    ("w majority", {"write_concern": "majority"}),
+    ("journaled", {"journal": True}),
+    ("bypass validation", {"bypass_validation": True}),
+]
+VALIDATOR = {"$jsonSchema": {
+    "bsonType": "object",
+    "required": ["country", "metric", "sector"],
+    "properties": {"country": {"bsonType": "string"}, "metric": {"bsonType": "string"}, "sector": {"bsonType": "string"}},
+}}
+
+
+def scaled_jobs(directory, scale):
+    """Staging files repeated scale times with suffixed country names, written as parquet into directory"""
+    jobs = []
+    for name in COLLECTIONS:
+        df = pd.concat(read_chunks(staging_path(name)), ignore_index=True)
+        # parquet strings come back as categoricals, which don't take a suffix
+        copies = [df] + [df.assign(country=df["country"].astype(str) + f" #{i}") for i in range(1, scale)]
+        scaled = os.path.join(directory, f"{name}.parquet")
+        pd.concat(copies, ignore_index=True).to_parquet(scaled, index=False)
+        jobs.append((name, scaled))
+    return jobs
+
+
+def run_case(uri, settings, jobs, workers, batch_size):
+    client = get_client(uri, **settings)
+    client.drop_database(BENCH_DATABASE)
+    db = client.get_database(BENCH_DATABASE)
+    for name, _ in jobs:
+        db.create_collection(name, validator=VALIDATOR)
+    start = time.perf_counter()
+    stats = load_collections(db, jobs, workers, batch_size=batch_size)
+    seconds = time.perf_counter() - start
+    return sum(s["rows"] for s in stats), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare load throughput across shared client settings")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--scale", type=int, default=10, help="copies of the staging data to load")
+    parser.add_argument("--rounds", type=int, default=3, help="runs per case, the median is reported")
+    parser.add_argument("--workers", type=int, default=3, help="collections loaded concurrently")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = scaled_jobs(tmp, args.scale)
+        try:
+            for label, overrides in CASES:
+                settings = dict(BASELINE, **overrides)
+                if settings["compressors"] and not available_compressors(settings["compressors"]):
+                    print(f"⚠ Skipping {label}, its python package is not installed (pip install pymongo[{label}])")
+                    continue
+                timings = [run_case(args.uri, settings, jobs, args.workers, args.batch_size) for _ in range(args.rounds)]
+                rows = timings[0][0]
+                results.append((label, rows, statistics.median(seconds for _, seconds in timings)))
+        finally:
+            get_client(args.uri, **BASELINE).drop_database(BENCH_DATABASE)
+            close_clients()
+
+    baseline = results[0][2] if results else 0
+    print(f"\n{results[0][1] if results else 0} documents per run, median of {args.rounds} runs")
+    print(f"  {'settings':<20}{'seconds':>9}{'rows/sec':>11}{'vs baseline':>13}")
+    for label, rows, seconds in results:
+        change = f"{baseline / seconds:.2f}x" if seconds else "-"
+        print(f"  {label:<20}{seconds:>8.2f}s{rows / seconds if seconds else 0:>11.0f}{change:>13}")
+
+
+if __name__ == "__main__":
+    main()
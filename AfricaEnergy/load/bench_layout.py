@@ -0,0 +1,115 @@
+import time
+import random
+import argparse
+import statistics
+import pandas as pd
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import BulkWriteError
+from loader import COLLECTIONS, clean_chunk, read_chunks, staging_path
+from tidy import ensure_long_collection, long_documents, series_filter
+
+"""
+benchmark comparing the wide layout (one document per country and indicator with 25 year fields) against the long layout from tidy.py. loads the staging files into a scratch database on a local mongod, then times "series for country X and metric M over years A-B" queries on both layouts and reports storage and index sizes from collStats.
+
+python bench_layout.py --uri mongodb://localhost:27017 --scale 10 --queries 500
+"""
+
+BENCH_DATABASE = "africa_energy_bench"
+
+
+def staging_frame(scale):
+    """All staging files stacked, repeated scale times with suffixed country names"""
+    # read_chunks handles both the parquet and the csv staging files staging_path can return
+    df = pd.concat([chunk for name in COLLECTIONS for chunk in read_chunks(staging_path(name))], ignore_index=True)
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        if i:
+            # parquet strings come back as categoricals, which don't take a suffix
+            copy["country"] = copy["country"].astype(str) + f" #{i}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def wide_series(collection, country, metric, start, end):
+    """Wide layout: fetch the documents, then pick the years in application code"""
+    years = [str(year) for year in range(start, end + 1)]
+    series = {}
+    for doc in collection.find({"country": country, "metric": metric}, {year: 1 for year in years}):
+        for year in years:
+            value = doc.get(year)
+            if value is not None and value == value and value != "":
+                series[int(year)] = value
+    return series
+
+
+def long_series(collection, country, metric, start, end, timeseries):
+    query = series_filter(country, metric, start, end, timeseries)
+    return {doc["year"]: doc["value"] for doc in collection.find(query, {"_id": 0, "year": 1, "value": 1})}
+
+
+def time_queries(fn, samples):
+    latencies = []
+    for args in samples:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def collection_size(db, name):
+    stats = db.command("collStats", name)
+    return stats.get("size", 0), stats.get("storageSize", 0), stats.get("totalIndexSize", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare query latency and storage of the wide and long layouts")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--scale", type=int, default=1, help="copies of the staging data to load")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--timeseries", action="store_true", help="use a time-series collection for the long layout")
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    client.drop_database(BENCH_DATABASE)
+    db = client.get_database(BENCH_DATABASE)
+    try:
+        df = staging_frame(args.scale)
+
+        wide = db.get_collection("wide")
+        wide.insert_many(clean_chunk(df), ordered=False)
+        wide.create_index([("country", ASCENDING), ("metric", ASCENDING)], name="country_metric")
+
+        long, timeseries = ensure_long_collection(db, "long", args.timeseries)
+        documents = long_documents(df, timeseries)
+        # the unique key index rejects the duplicate charts in the staging files, that's fine here
+        try:
+            long.insert_many(documents, ordered=False)
+        except BulkWriteError:
+            pass
+
+        pairs = list(df[["country", "metric"]].drop_duplicates().itertuples(index=False))
+        rng = random.Random(42)
+        samples = []
+        for _ in range(args.queries):
+            country, metric = rng.choice(pairs)
+            start = rng.randint(2000, 2020)
+            samples.append((country, metric, start, rng.randint(start, 2024)))
+
+        wide_median, wide_p95 = time_queries(lambda *a: wide_series(wide, *a), samples)
+        long_median, long_p95 = time_queries(lambda *a: long_series(long, *a, timeseries), samples)
+        layouts = [("wide", wide_median, wide_p95, collection_size(db, "wide")),
+                   ("long" + (" (time-series)" if timeseries else ""), long_median, long_p95, collection_size(db, "long"))]
+
+        print(f"{len(df)} wide rows, {len(documents)} long documents, {args.queries} queries")
+        print(f"  {'layout':<20}{'median ms':>11}{'p95 ms':>9}{'data MB':>10}{'storage MB':>12}{'index MB':>10}")
+        for name, median, p95, (size, storage, index) in layouts:
+            print(f"  {name:<20}{median:>11.3f}{p95:>9.3f}{size / 1e6:>10.2f}{storage / 1e6:>12.2f}{index / 1e6:>10.2f}")
+    finally:
+        client.drop_database(BENCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import pandas as pd
+from pymongo import ASCENDING, UpdateOne
+
+"""
+natural-key bulk writes shared by every writer: the sync loader (loader.py), the async backend (async_loader.py), the delta loader (delta.py) and the streaming scrape pipeline (extract/pipeline.py). the key, the filter built from it and the way bulk results are counted live here only, so the writers can't drift apart.
+
+NATURAL_KEY identifies one staging row, NATURAL_KEY_INDEX is the unique compound index upserts rely on
+    the portal can show several charts with the same indicator (the Energy page has two), so the key ends in chart_repeat: "" for a key's first row in a load, "#2", "#3"... for the rows of later charts. documents written before the column existed have no chart_repeat, which key_filter matches as empty
+number_repeats(df, seen) / keyed_chunks(chunks) set chart_repeat on a frame or a stream of staging chunks, seen carries the counts across the chunks of one load
+is_stale_index(info, keys, name) / ensure_key_index(collection, keys, name) replace a unique key index still built on an older key
+key_filter(doc, natural_key) matches the document with doc's key, an empty key cell ("", None, NaN or missing) matches any of those
+normalise_key(doc, natural_key) writes doc's empty key cells as "", upserts and delta loads store that value
+upsert_operations(batch, natural_key) are the UpdateOne(upsert=True) operations for a batch of documents
+bulk_counts(result) reads inserted/matched/upserted/modified counts from a bulk_api_result or a BulkWriteError's details, documents_written(counts) is what reached the collection
+"""
+
+REPEAT = "chart_repeat"
+NATURAL_KEY = ("country", "sector", "sub_sector", "sub_sub_sector", "metric", "unit", REPEAT)
+NATURAL_KEY_INDEX = [(key, ASCENDING) for key in NATURAL_KEY]
+EMPTY_KEY = {"$in": ["", None, float("nan")]}
+
+
+def is_empty(value):
+    if isinstance(value, str):
+        return value == ""
+    return value is None or bool(pd.isna(value))
+
+
+def number_repeats(df, seen, natural_key=NATURAL_KEY):
+    """Set chart_repeat on every row, "" the first time its key is seen and "#n" for the n-th time"""
+    columns = [key for key in natural_key if key != REPEAT]
+    # empty cells count as "", the same way delta fingerprints and key_filter treat them
+    keys = df.reindex(columns=columns).astype(object).where(lambda k: k.notna(), "").astype(str)
+    repeats = []
+    for key in keys.itertuples(index=False, name=None):
+        seen[key] = seen.get(key, 0) + 1
+        repeats.append(f"#{seen[key]}" if seen[key] > 1 else "")
+    return df.assign(**{REPEAT: repeats})
+
+
+def keyed_chunks(chunks, natural_key=NATURAL_KEY):
+    """Number repeated keys across the chunks of one staging file"""
+    seen = {}
+    for chunk in chunks:
+        yield number_repeats(chunk, seen, natural_key)
+
+
+def is_stale_index(info, keys, name):
+    """Whether index_information() holds an index called name on other fields than keys"""
+    existing = info.get(name)
+    return existing is not None and [field for field, _ in existing["key"]] != [field for field, _ in keys]
+
+
+def ensure_key_index(collection, keys, name):
+    """Create a unique index on keys, dropping an index of the same name built on an older key first"""
+    if is_stale_index(collection.index_information(), keys, name):
+        print(f"  ⚠ Rebuilding index {name} on {collection.name} for the current key")
+        collection.drop_index(name)
+    collection.create_index(keys, unique=True, name=name)
+
+
+def key_filter(doc, natural_key=NATURAL_KEY):
+    """Filter on doc's natural key, empty cells match whichever empty value the stored document holds"""
+    # staging csvs read an empty unit as NaN, delta loads store it as "" and a column empty for a whole chunk is left out
+    return {key: EMPTY_KEY if is_empty(doc.get(key)) else doc.get(key) for key in natural_key}
+
+
+def normalise_key(doc, natural_key=NATURAL_KEY):
+    return {**doc, **{key: "" for key in natural_key if is_empty(doc.get(key))}}
+
+
+def upsert_operations(batch, natural_key=NATURAL_KEY):
+    operations = []
+    for doc in batch:
+        doc = normalise_key(doc, natural_key)
+        operations.append(UpdateOne(key_filter(doc, natural_key), {"$set": doc}, upsert=True))
+    return operations
+
+
+def bulk_counts(result):
+    """Counts from a bulk_api_result, or the details of a BulkWriteError for what got through before it"""
+    return {
+        "inserted": result.get("nInserted", 0),
+        "matched": result.get("nMatched", 0),
+        "upserted": result.get("nUpserted", 0),
+        "modified": result.get("nModified", 0),
+        "errors": len(result.get("writeErrors", [])),
+    }
+
+
+def documents_written(counts):
+    """Documents that reached the collection, inserted, upserted or matched by an upsert"""
+    return counts["inserted"] + counts["matched"] + counts["upserted"]
@@ -0,0 +1,165 @@
+import os
+import weakref
+import threading
+import importlib.util
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+"""
+one lazily created MongoClient per uri and settings, shared by every loader in a process. importing a load module no longer opens a connection, the client is built on the first get_client() call and reused after that (its connection pool is thread safe, so the loader's worker threads share it). a client inherited through a fork is replaced, pymongo clients aren't fork safe.
+
+settings come from arguments, or the environment (.env) when left out:
+pool_size           maxPoolSize, MONGO_POOL_SIZE
+compressors         wire compression in order of preference, MONGO_COMPRESSORS (default zstd,snappy, zlib is always available but slow), ones whose python package is missing are dropped
+write_concern       w for every write, MONGO_WRITE_CONCERN ("1", "2" or "majority"), w=0 is refused because the loaders report counts from acknowledged results
+journal             wait for the journal on every write, MONGO_JOURNAL
+bypass_validation   skip collection schema validation on bulk writes, MONGO_BYPASS_VALIDATION, bulk_options(collection) hands it to insert_many/bulk_write when the collection's client was built with it
+
+get_client(uri, **settings) / get_database(name, uri, **settings) / get_collection(name, uri, database, **settings)
+client_options(**settings) are the MongoClient keyword arguments, build_client(uri, client_class, **settings) builds an unshared client (the async loader's) and remembers its settings for bulk_options
+settings_of(client) / uri_of(client) give back the settings and uri a client was built with here, the async loader uses them to reach the server a sync collection points at
+add_client_arguments(parser) and client_settings(args) give a script --pool-size, --compressors, --write-concern, --journal and --bypass-validation
+close_clients() closes every shared client
+"""
+
+DATABASE = "africa_energy"
+POOL_SIZE = 20
+COMPRESSORS = "zstd,snappy"
+# python package each wire compressor needs, zlib is in the standard library
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+_lock = threading.Lock()
+_clients = {}
+# uri and resolved settings of every client built here, by id and checked against a weak reference
+_client_settings = {}
+_default_bypass = {"enabled": None}
+
+
+def available_compressors(compressors):
+    """The requested compressors whose python package is installed, in the same order"""
+    names = [name.strip() for name in compressors.split(",")] if isinstance(compressors, str) else list(compressors or [])
+    return [name for name in names if name in COMPRESSOR_MODULES and importlib.util.find_spec(COMPRESSOR_MODULES[name])]
+
+
+def resolve_settings(pool_size=None, compressors=None, write_concern=None, journal=None, bypass_validation=None):
+    """Fill settings that were left out from the environment"""
+    load_dotenv()
+    if journal is None:
+        journal = os.getenv("MONGO_JOURNAL", "").lower() in ("1", "true", "yes")
+    if bypass_validation is None:
+        bypass_validation = os.getenv("MONGO_BYPASS_VALIDATION", "").lower() in ("1", "true", "yes")
+    if write_concern is None:
+        write_concern = os.getenv("MONGO_WRITE_CONCERN") or "1"
+    write_concern = str(write_concern)
+    if write_concern == "0":
+        raise ValueError("Unacknowledged writes (w=0) leave the loaders without counts, use w=1 or higher")
+    return {
+        "pool_size": int(pool_size or os.getenv("MONGO_POOL_SIZE") or POOL_SIZE),
+        "compressors": tuple(available_compressors(compressors if compressors is not None else os.getenv("MONGO_COMPRESSORS", COMPRESSORS))),
+        "write_concern": int(write_concern) if write_concern.isdigit() else write_concern,
+        "journal": journal,
+        "bypass_validation": bypass_validation,
+    }
+
+
+def client_options(**settings):
+    """MongoClient keyword arguments for the settings"""
+    return _client_options(resolve_settings(**settings))
+
+
+def _client_options(settings):
+    options = {"maxPoolSize": settings["pool_size"], "w": settings["write_concern"]}
+    if settings["compressors"]:
+        options["compressors"] = ",".join(settings["compressors"])
+    if settings["journal"]:
+        options["journal"] = True
+    return options
+
+
+def build_client(uri=None, client_class=None, **settings):
+    """A new client of client_class (MongoClient when left out) for uri and settings, not shared"""
+    resolved = resolve_settings(**settings)
+    client_class = client_class or MongoClient
+    uri = uri or os.getenv("MONGO_URI")
+    client = client_class(uri, **_client_options(resolved))
+    _client_settings[id(client)] = (weakref.ref(client), resolved, uri)
+    return client
+
+
+def get_client(uri=None, **settings):
+    """The shared client for uri and settings, created on first use"""
+    resolved = resolve_settings(**settings)
+    uri = uri or os.getenv("MONGO_URI")
+    key = (uri, tuple(sorted(resolved.items())))
+    with _lock:
+        entry = _clients.get(key)
+        if entry is None or entry[1] != os.getpid():
+            entry = (build_client(uri, **resolved), os.getpid())
+            _clients[key] = entry
+        return entry[0]
+
+
+def get_database(name=DATABASE, uri=None, **settings):
+    return get_client(uri, **settings).get_database(name)
+
+
+def get_collection(name, uri=None, database=DATABASE, **settings):
+    return get_database(database, uri, **settings).get_collection(name)
+
+
+def settings_of(client):
+    """The resolved settings client was built with, None for clients built elsewhere"""
+    entry = _built_with(client)
+    return entry[1] if entry else None
+
+
+def uri_of(client):
+    """The uri client was built with, raises ValueError for clients built elsewhere"""
+    entry = _built_with(client)
+    if entry is None:
+        raise ValueError("The client was not built by client.py, its uri is unknown")
+    return entry[2]
+
+
+def _built_with(client):
+    entry = _client_settings.get(id(client))
+    if entry is None or entry[0]() is not client:
+        return None
+    return entry
+
+
+def bulk_options(collection=None):
+    """Keyword arguments for insert_many and bulk_write calls on collection, following its client's settings"""
+    settings = settings_of(collection.database.client) if collection is not None else None
+    if settings is not None:
+        enabled = settings["bypass_validation"]
+    else:
+        # a client from elsewhere (a test double, a caller's own MongoClient) follows the environment
+        if _default_bypass["enabled"] is None:
+            _default_bypass["enabled"] = resolve_settings()["bypass_validation"]
+        enabled = _default_bypass["enabled"]
+    return {"bypass_document_validation": True} if enabled else {}
+
+
+def close_clients():
+    with _lock:
+        for client, pid in _clients.values():
+            if pid == os.getpid():
+                client.close()
+            _client_settings.pop(id(client), None)
+        _clients.clear()
+
+
+def add_client_arguments(parser):
+    parser.add_argument("--pool-size", type=int, help=f"maxPoolSize of the shared client (default {POOL_SIZE})")
+    parser.add_argument("--compressors", help=f"wire compressors in order of preference, '' for none (default {COMPRESSORS})")
+    parser.add_argument("--write-concern", help="w for every write: 1, 2, ... or majority")
+    parser.add_argument("--journal", action="store_true", default=None, help="wait for the journal on every write")
+    parser.add_argument("--bypass-validation", action="store_true", default=None, help="skip schema validation on bulk writes")
+
+
+def client_settings(args):
+    return {
+        "pool_size": args.pool_size, "compressors": args.compressors, "write_concern": args.write_concern,
+        "journal": args.journal, "bypass_validation": args.bypass_validation,
+    }
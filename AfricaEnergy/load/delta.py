@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from pymongo import DeleteOne, InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+from tidy import YEAR_COLUMN
+from client import bulk_options
+import bulk
+
+"""
+delta loading for the wide layout. every staging row gets a fingerprint over its indicator keys and year values, the fingerprints of the previous load are kept either on the documents themselves (_fingerprint) or in a sidecar json state file, and only rows that were added, changed or dropped since then are written as one bulk batch. refresh cost follows churn instead of dataset size.
+
+row_fingerprints(df, natural_key) hashes each row's keys and year values (vectorized with pandas), returning the row keys and int64 fingerprints
+stored_fingerprints(collection, natural_key) reads the previous fingerprints back from the collection with a keys-only projection, along with the ids of duplicate documents an earlier insert run left behind
+plan_delta(chunks, previous, natural_key) streams staging chunks against the previous fingerprints and collects inserts, updates, deletes and the duplicates to remove
+empty key cells (NaN, None, missing) hash as "" and are written as "", bulk.key_filter also matches NaN and None so sidecar updates find documents earlier loads wrote
+load_delta(collection, chunks, natural_key, dry_run, state_path) plans the delta, prints the diff and writes it unless dry_run
+"""
+
+FINGERPRINT = "_fingerprint"
+
+
+def row_fingerprints(df, natural_key):
+    """Hash each row's natural key and year values"""
+    year_columns = sorted(column for column in df.columns if YEAR_COLUMN.match(str(column)))
+    # normalise dtypes so csv strings, parquet dictionaries and ints/floats hash the same way
+    values = df[year_columns].apply(pd.to_numeric, errors="coerce").astype(float)
+    keys = df.reindex(columns=list(natural_key)).astype(object).where(lambda k: k.notna(), "").astype(str)
+    hashed = pd.util.hash_pandas_object(pd.concat([keys, values], axis=1), index=False)
+    return list(keys.itertuples(index=False, name=None)), hashed.to_numpy().view(np.int64)
+
+
+def stored_fingerprints(collection, natural_key):
+    """Previous fingerprints, document ids and duplicate document ids keyed by natural key"""
+    previous = {}
+    projection = {key: 1 for key in natural_key}
+    projection[FINGERPRINT] = 1
+    for doc in collection.find({}, projection):
+        key = tuple("" if doc.get(k) is None or doc.get(k) != doc.get(k) else str(doc.get(k)) for k in natural_key)
+        if key in previous:
+            # the first document of a key stays, the rest are removed by the next delta
+            previous[key][2].append(doc["_id"])
+        else:
+            previous[key] = (doc.get(FINGERPRINT), doc["_id"], [])
+    return previous
+
+
+def load_state(state_path, natural_key):
+    """Previous fingerprints from a sidecar state file"""
+    if not state_path or not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        entries = json.load(f)
+    # keys saved before the natural key grew (chart_repeat) are their first chart's key, the new fields empty
+    pad = lambda key: tuple(key) + ("",) * (len(natural_key) - len(key))
+    return {pad(entry["key"]): (entry["fingerprint"], None, []) for entry in entries}
+
+
+def save_state(state_path, fingerprints):
+    with open(state_path, "w") as f:
+        json.dump([{"key": list(key), "fingerprint": fp} for key, fp in fingerprints.items()], f)
+
+
+def key_filter(key, natural_key, doc_id=None):
+    if doc_id is not None:
+        return {"_id": doc_id}
+    return bulk.key_filter(dict(zip(natural_key, key)), natural_key)
+
+
+def plan_delta(chunks, previous, natural_key, clean=None):
+    """Compare streamed staging chunks with previous fingerprints, keeping only the changes"""
+    changes, seen = {}, {}
+    for chunk in chunks:
+        keys, fingerprints = row_fingerprints(chunk, natural_key)
+        documents = clean(chunk) if clean else chunk.to_dict("records")
+        for key, fp, doc in zip(keys, fingerprints.tolist(), documents):
+            if seen.get(key) == fp:
+                continue
+            # a key repeated in the staging file keeps its last row, like an upsert would
+            seen[key] = fp
+            if key in previous and previous[key][0] == fp:
+                changes.pop(key, None)
+                continue
+            # documents carry the normalised key, the same value upserts store and stored_fingerprints reads back
+            doc = bulk.normalise_key(doc, natural_key)
+            doc[FINGERPRINT] = fp
+            changes[key] = doc
+
+    return {
+        "inserts": [(key, doc) for key, doc in changes.items() if key not in previous],
+        "updates": [(key, doc) for key, doc in changes.items() if key in previous],
+        "deletes": [key for key in previous if key not in seen],
+        "duplicates": [doc_id for entry in previous.values() for doc_id in entry[2]],
+        "fingerprints": seen,
+        "rows": len(seen),
+    }
+
+
+def delta_operations(delta, previous, natural_key):
+    operations = [InsertOne(doc) for _, doc in delta["inserts"]]
+    operations += [
+        ReplaceOne(key_filter(key, natural_key, previous[key][1]), doc, upsert=True)
+        for key, doc in delta["updates"]
+    ]
+    operations += [DeleteOne(key_filter(key, natural_key, previous[key][1])) for key in delta["deletes"]]
+    operations += [DeleteOne({"_id": doc_id}) for doc_id in delta["duplicates"]]
+    return operations
+
+
+def load_delta(collection, chunks, natural_key, clean=None, dry_run=False, state_path=None):
+    """Write only the rows that changed since the previous load"""
+    start = time.perf_counter()
+    previous = load_state(state_path, natural_key) if state_path else stored_fingerprints(collection, natural_key)
+    delta = plan_delta(chunks, previous, natural_key, clean)
+    counts = {
+        "inserted": len(delta["inserts"]), "updated": len(delta["updates"]), "deleted": len(delta["deletes"]),
+        "duplicates": len(delta["duplicates"]),
+    }
+    unchanged = delta["rows"] - counts["inserted"] - counts["updated"]
+
+    print(f"Delta for {collection.name}: {counts['inserted']} inserts, {counts['updated']} updates, "
+          f"{counts['deleted']} deletes, {counts['duplicates']} duplicates, {unchanged} unchanged")
+    if dry_run:
+        inserted = [key for key, _ in delta["inserts"]]
+        updated = [key for key, _ in delta["updates"]]
+        for label, keys in (("+", inserted), ("~", updated), ("-", delta["deletes"])):
+            for key in keys[:5]:
+                print(f"  {label} {' | '.join(key)}")
+            if len(keys) > 5:
+                print(f"  {label} ... {len(keys) - 5} more")
+    else:
+        operations = delta_operations(delta, previous, natural_key)
+        if operations:
+            try:
+                collection.bulk_write(operations, ordered=False, **bulk_options(collection))
+            except BulkWriteError as e:
+                print(f"  ⚠ {bulk.bulk_counts(e.details)['errors']} delta operations failed for {collection.name}")
+        if state_path:
+            save_state(state_path, delta["fingerprints"])
+
+    seconds = time.perf_counter() - start
+    rows = sum(counts.values())
+    return {"collection": collection.name, "rows": rows, "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds else 0, "unchanged": unchanged, "dry_run": dry_run, **counts}
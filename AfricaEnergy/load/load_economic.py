@@ -1,27 +1,17 @@
 import os 
-import pandas as pd
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from loader import staging_path
+from async_loader import load_staging
+from client import get_collection
 
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 
-client = MongoClient(MONGO_URI)
-db = client.get_database("africa_energy")
-collection = db.get_collection("social_collection")
-
-def load_social_data(collection):
-    try:
-        df = pd.read_csv("/home/deecodes/internship/AfricaEnergy/staging_data/africa_social_and_economic_data.csv")
-        df = df.drop(columns=["Unnamed: 0"], errors="ignore")
-        df = df.dropna(axis=1, how='all')
-        data_dict = df.to_dict("records")
-
-        if data_dict:
-            collection.insert_many(data_dict)
-            print(f"Loaded {collection.count_documents({})} documents into {collection.name} successfully!")
-    except Exception as e:
-        print(f"Error loading data to collection: {e}")
+def load_social_data(collection=None, path=None, backend="sync", **kwargs):
+    # the shared client only connects when a collection is first needed, not on import
+    if collection is None:
+        collection = get_collection("social_collection", MONGO_URI)
+    return load_staging(collection, path or staging_path("social_collection"), backend, **kwargs)
 
 if __name__ == "__main__":
-    load_social_data(collection)
+    load_social_data()
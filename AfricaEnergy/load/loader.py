@@ -0,0 +1,271 @@
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError, OperationFailure
+from tidy import ensure_long_collection, is_long_column, long_collection_name, long_documents
+from delta import load_delta
+from bulk import NATURAL_KEY, NATURAL_KEY_INDEX, bulk_counts, documents_written, ensure_key_index, keyed_chunks, upsert_operations
+from client import DATABASE, add_client_arguments, bulk_options, client_settings, close_clients, get_client
+
+# the scraper's staging module owns the staging file names, so both sides read and write the same files
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "extract"))
+from staging import staging_filename
+import metrics
+
+"""
+unified streaming loader for the staging files, replaces the copy-pasted bodies of load_energy.py, load_electrical.py and load_economic.py (those keep their load_*_data(collection) entry points and call into this module).
+
+COLLECTIONS maps each collection to the sector loaded into it, SECTOR_COLLECTIONS the other way round (the pipeline and query.py use it), NATURAL_KEY and the upsert operations come from bulk.py
+staging_path(name) finds a collection's staging file (staging.staging_filename of its sector), preferring the typed parquet file over the csv export
+read_chunks(path, chunk_size, columns) streams a staging file in bounded chunks so memory stays flat however big the file gets, parquet files are memory mapped and only the columns accepted by the columns predicate are read
+clean_chunk(df) drops the pandas index column and empty year columns and turns the chunk into documents
+load_file(collection, path, mode) inserts a staging file in batches of batch_size with ordered=False and returns rows, seconds and rows/sec
+    mode="upsert" makes reloads idempotent: every document is upserted on NATURAL_KEY through bulk_write, a matching unique compound index is created first and the matched/upserted/modified counts come from the bulk results
+    every mode numbers the rows of charts repeating an indicator (bulk.keyed_chunks), so no row overwrites another's document
+    mode="delta" fingerprints every row and writes only inserts, updates and deletes since the previous load (dry_run=True just reports the diff), see delta.py
+    layout="long" writes tidy (country, indicator keys, year, value) documents instead of wide rows, see tidy.py
+load_collections(db, jobs, workers) loads several collections at once in a thread pool, long layouts go to <collection>_series
+every write is timed as the mongo_insert phase and counted in documents_written, the CLI writes the run report through metrics.run (see extract/metrics.py)
+on_load_complete(callback) registers a callback run with the stats of every finished load (not dry runs), query.py drops its cache through it
+
+python loader.py                                     loads every collection in COLLECTIONS
+python loader.py energy_collect --batch-size 500     loads one collection
+python loader.py --mode upsert                       reloads every collection without duplicating documents
+python loader.py --layout long --timeseries          loads tidy documents into time-series collections
+python loader.py --mode delta --dry-run              reports what changed since the last load without writing
+python loader.py social_collection=/path/to/file.csv loads a collection from another staging file (.parquet or .csv)
+python loader.py --mode delta --materialize         loads and then refreshes the summary collections, see materialize.py
+python loader.py --pool-size 50 --write-concern majority --bypass-validation   tunes the shared client, see client.py
+python loader.py --metrics-dir metrics --profile     writes the json/prometheus run report (and a cProfile dump) there
+"""
+
+# collection each sector is loaded into
+COLLECTIONS = {
+    "energy_collect": "Energy",
+    "electrical_collection": "Electricity",
+    "social_collection": "Social and Economic",
+}
+SECTOR_COLLECTIONS = {sector: name for name, sector in COLLECTIONS.items()}
+CHUNK_SIZE = 5000
+BATCH_SIZE = 1000
+
+_load_hooks = []
+
+
+def staging_path(collection_name):
+    parquet = staging_filename(COLLECTIONS[collection_name])
+    if os.path.exists(parquet):
+        return parquet
+    return staging_filename(COLLECTIONS[collection_name], "csv")
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, columns=None):
+    """Stream a staging file in chunks of at most chunk_size rows, optionally reading only some columns"""
+    if path.endswith(".parquet"):
+        parquet = pq.ParquetFile(path, memory_map=True)
+        names = [name for name in parquet.schema_arrow.names if columns(name)] if columns else None
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=names):
+            yield batch.to_pandas()
+        return
+
+    with pd.read_csv(path, chunksize=chunk_size, usecols=columns) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def clean_chunk(df):
+    """Turn a staging chunk into documents"""
+    df = df.drop(columns=["Unnamed: 0"], errors="ignore")
+    df = df.dropna(axis=1, how='all')
+    return df.to_dict("records")
+
+
+def insert_batch(collection, batch):
+    """Insert one batch without stopping at the first bad document, returns the number inserted"""
+    try:
+        with metrics.phase("mongo_insert"):
+            inserted = len(collection.insert_many(batch, ordered=False, **bulk_options(collection)).inserted_ids)
+    except BulkWriteError as e:
+        inserted = report_failures(collection, e)["inserted"]
+    metrics.count("documents_written", inserted)
+    return inserted
+
+
+def ensure_indexes(collection):
+    """Create the unique natural-key index upserts rely on"""
+    try:
+        ensure_key_index(collection, NATURAL_KEY_INDEX, "natural_key")
+    except OperationFailure as e:
+        # existing duplicates from earlier insert runs block the unique index, upserts still work without it
+        print(f"  ⚠ Could not create natural_key index on {collection.name}: {e}")
+
+
+def upsert_batch(collection, batch, natural_key=NATURAL_KEY):
+    """Upsert one batch on the natural key, returns the bulk write counts"""
+    try:
+        with metrics.phase("mongo_insert"):
+            result = collection.bulk_write(upsert_operations(batch, natural_key), ordered=False, **bulk_options(collection))
+        counts = bulk_counts(result.bulk_api_result)
+    except BulkWriteError as e:
+        counts = report_failures(collection, e)
+    metrics.count("documents_written", documents_written(counts))
+    return counts
+
+
+def report_failures(collection, error):
+    """Warn about the failed writes of a BulkWriteError, returns the counts of what got through"""
+    counts = bulk_counts(error.details)
+    print(f"  ⚠ {counts['errors']} documents failed in a batch for {collection.name}")
+    return counts
+
+
+def on_load_complete(callback):
+    """Call callback(stats) after every load that wrote to a collection, readers use it to drop cached results"""
+    _load_hooks.append(callback)
+    return callback
+
+
+def notify_load_complete(stats):
+    for callback in list(_load_hooks):
+        try:
+            callback(stats)
+        except Exception as e:
+            print(f"  ⚠ Load-complete hook {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+def load_file(collection, path, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, mode="insert", layout="wide", timeseries=False,
+              dry_run=False, state_path=None):
+    """Stream a staging file into a collection in batches"""
+    stats = _load_file(collection, path, chunk_size, batch_size, mode, layout, timeseries, dry_run, state_path)
+    if not dry_run:
+        notify_load_complete(stats)
+    return stats
+
+
+def _load_file(collection, path, chunk_size, batch_size, mode, layout, timeseries, dry_run, state_path):
+    if mode == "delta":
+        if layout != "wide":
+            print(f"  ⚠ Delta loads write the wide layout, loading {collection.name} as wide documents")
+        try:
+            with metrics.phase("delta_load"):
+                stats = load_delta(collection, keyed_chunks(read_chunks(path, chunk_size)), NATURAL_KEY, clean_chunk, dry_run, state_path)
+            if not dry_run:
+                metrics.count("documents_written", stats["rows"])
+            return stats
+        except Exception as e:
+            print(f"Error loading data to collection: {e}")
+            return {"collection": collection.name, "rows": 0, "seconds": 0, "rows_per_sec": 0}
+
+    start = time.perf_counter()
+    rows = 0
+    counts = {"matched": 0, "upserted": 0, "modified": 0}
+    natural_key = NATURAL_KEY + ("year",) if layout == "long" else NATURAL_KEY
+    if timeseries and mode == "upsert":
+        # time-series collections don't take upserts, fresh loads are inserted
+        print(f"  ⚠ Upserts are not supported on time-series collection {collection.name}, inserting instead")
+        mode = "insert"
+    try:
+        if mode == "upsert" and layout == "wide":
+            ensure_indexes(collection)
+        columns = is_long_column if layout == "long" else None
+        for chunk in keyed_chunks(read_chunks(path, chunk_size, columns)):
+            documents = long_documents(chunk, timeseries) if layout == "long" else clean_chunk(chunk)
+            for i in range(0, len(documents), batch_size):
+                batch = documents[i:i + batch_size]
+                if mode == "upsert":
+                    result = upsert_batch(collection, batch, natural_key)
+                    for key in counts:
+                        counts[key] += result[key]
+                    rows += documents_written(result)
+                else:
+                    rows += insert_batch(collection, batch)
+    except Exception as e:
+        print(f"Error loading data to collection: {e}")
+
+    seconds = time.perf_counter() - start
+    rate = rows / seconds if seconds else 0
+    stats = {"collection": collection.name, "rows": rows, "seconds": seconds, "rows_per_sec": rate}
+    if mode == "upsert":
+        stats.update(counts)
+        print(f"Upserted {rows} documents into {collection.name} in {seconds:.2f}s ({rate:.0f} rows/sec): "
+              f"{counts['matched']} matched, {counts['upserted']} upserted, {counts['modified']} modified")
+    else:
+        print(f"Loaded {rows} documents into {collection.name} in {seconds:.2f}s ({rate:.0f} rows/sec)")
+    return stats
+
+
+def load_collections(db, jobs, workers=3, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, mode="insert", layout="wide", timeseries=False,
+                     dry_run=False, state_dir=None):
+    """Load several (collection name, staging path) jobs concurrently"""
+    start = time.perf_counter()
+    targets = []
+    for name, path in jobs:
+        if layout == "long" and mode != "delta":
+            collection, is_timeseries = ensure_long_collection(db, long_collection_name(name), timeseries)
+        else:
+            collection, is_timeseries = db.get_collection(name), False
+        targets.append((collection, path, is_timeseries))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                load_file, collection, path, chunk_size, batch_size, mode, layout, is_timeseries, dry_run,
+                os.path.join(state_dir, f"{collection.name}.delta.json") if state_dir else None
+            )
+            for collection, path, is_timeseries in targets
+        ]
+        stats = [future.result() for future in futures]
+
+    seconds = time.perf_counter() - start
+    rows = sum(s["rows"] for s in stats)
+    print(f"\n✓ Loaded {rows} documents into {len(stats)} collections in {seconds:.2f}s ({rows / seconds if seconds else 0:.0f} rows/sec)")
+    return stats
+
+
+def parse_jobs(targets):
+    """Turn CLI targets (name or name=path) into (collection name, staging path) jobs"""
+    jobs = []
+    for target in targets or COLLECTIONS:
+        name, _, path = target.partition("=")
+        jobs.append((name, path or staging_path(name)))
+    return jobs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load staging files into MongoDB")
+    parser.add_argument("targets", nargs="*", help="collection names, optionally name=path, defaults to every collection")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows read from a staging file at a time")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="documents per insert_many call")
+    parser.add_argument("--workers", type=int, default=3, help="collections loaded concurrently")
+    parser.add_argument("--mode", choices=["insert", "upsert", "delta"], default="insert",
+                        help="upsert keys documents on NATURAL_KEY so reloads don't duplicate, delta writes only changed rows")
+    parser.add_argument("--dry-run", action="store_true", help="with --mode delta, report the diff without writing")
+    parser.add_argument("--state-dir", help="with --mode delta, keep fingerprints in sidecar json files here instead of on the documents")
+    parser.add_argument("--layout", choices=["wide", "long"], default="wide", help="long writes one document per country, indicator and year")
+    parser.add_argument("--timeseries", action="store_true", help="with --layout long, load into MongoDB time-series collections")
+    parser.add_argument("--uri", help="MongoDB uri, defaults to MONGO_URI from the environment")
+    parser.add_argument("--materialize", action="store_true", help="refresh the summary collections afterwards, see materialize.py")
+    parser.add_argument("--metrics-dir", default=metrics.METRICS_DIR, help="where the json and prometheus run reports are written")
+    parser.add_argument("--profile", action="store_true", help="run under cProfile and save the stats next to the reports")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = get_client(args.uri, **client_settings(args))
+    try:
+        jobs = parse_jobs(args.targets)
+        metrics.run(
+            load_collections, client.get_database(DATABASE), jobs, args.workers, args.chunk_size, args.batch_size,
+            args.mode, args.layout, args.timeseries, args.dry_run, args.state_dir,
+            name="load", directory=args.metrics_dir, profile=args.profile
+        )
+        if args.materialize and not args.dry_run:
+            from materialize import materialize
+            materialize(client.get_database(DATABASE), jobs)
+    finally:
+        close_clients()
@@ -0,0 +1,240 @@
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from pymongo import ASCENDING, DESCENDING, DeleteOne, ReplaceOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from tidy import YEAR_COLUMN
+from delta import row_fingerprints
+from client import DATABASE, add_client_arguments, bulk_options, client_settings, close_clients, get_database
+from bulk import REPEAT, keyed_chunks
+from loader import NATURAL_KEY, parse_jobs, read_chunks
+
+"""
+materialized summaries computed after a load, so dashboards read small precomputed documents instead of scanning every wide row. everything is computed with vectorized pandas/numpy over the staging files (the same data the loader just wrote), one row per country and indicator, charts repeating an indicator are told apart by chart_repeat like the loaders do (bulk.keyed_chunks).
+
+summary_latest    one document per country and indicator: latest year with a value and that value, its rank among the countries by latest value, and the CAGR between the first and last values inside CAGR_START-CAGR_END
+summary_regions   one document per African Union region (plus "Africa" for the continent), indicator and year: total and number of reporting countries, only for additive units (not %, per-capita or ratio units)
+summary_rankings  one document per indicator and year: the countries ranked by value
+
+refreshes are incremental: every indicator gets a fingerprint over its rows (kept in summary_state) and only indicators whose fingerprint changed are recomputed, indicators that disappeared are removed. full=True recomputes everything.
+
+python materialize.py                          refreshes the summaries from every staging file
+python materialize.py --full                   recomputes every indicator
+python materialize.py --dry-run                only reports which indicators changed
+python loader.py --mode delta --materialize    loads and then refreshes the summaries
+"""
+
+INDICATOR = ("sector", "sub_sector", "sub_sub_sector", "metric", "unit", REPEAT)
+CAGR_START, CAGR_END = 2000, 2024
+LATEST = "summary_latest"
+REGIONS_COLLECTION = "summary_regions"
+RANKINGS = "summary_rankings"
+STATE = "summary_state"
+CONTINENT = "Africa"
+# african union regions, spelled the way the portal names the countries
+REGIONS = {
+    "Central Africa": ["Burundi", "Cameroon", "Central African Republic", "Chad", "Congo Democratic Republic", "Congo Republic",
+                       "Equatorial Guinea", "Gabon", "Sao Tome and Principe"],
+    "East Africa": ["Comoros", "Djibouti", "Eritrea", "Ethiopia", "Kenya", "Madagascar", "Mauritius", "Rwanda", "Seychelles",
+                    "Somalia", "South Sudan", "Sudan", "Tanzania", "Uganda"],
+    "North Africa": ["Algeria", "Egypt", "Libya", "Mauritania", "Morocco", "Tunisia", "Western Sahara"],
+    "Southern Africa": ["Angola", "Botswana", "Eswatini", "Lesotho", "Malawi", "Mozambique", "Namibia", "South Africa",
+                        "Zambia", "Zimbabwe"],
+    "West Africa": ["Benin", "Burkina Faso", "Cape Verde", "Cote d'Ivoire", "Gambia", "Ghana", "Guinea", "Guinea Bissau",
+                    "Liberia", "Mali", "Niger", "Nigeria", "Senegal", "Sierra Leone", "Togo"],
+}
+COUNTRY_REGION = {country: region for region, countries in REGIONS.items() for country in countries}
+
+
+def staging_frame(jobs):
+    """Every staging file in one frame with float year columns, one row per country and indicator"""
+    frames = [chunk for _, path in jobs for chunk in keyed_chunks(read_chunks(path))]
+    if not frames:
+        return pd.DataFrame(columns=list(NATURAL_KEY))
+    df = pd.concat(frames, ignore_index=True)
+    years = year_columns(df)
+    df[years] = df[years].apply(pd.to_numeric, errors="coerce").astype(float)
+    df[list(NATURAL_KEY)] = df.reindex(columns=list(NATURAL_KEY)).astype(object).where(lambda k: k.notna(), "").astype(str)
+    df = df.drop_duplicates(list(NATURAL_KEY), keep="last").reset_index(drop=True)
+    df["indicator_id"] = df[list(INDICATOR)].agg("|".join, axis=1)
+    return df
+
+
+def year_columns(df):
+    return sorted(column for column in df.columns if YEAR_COLUMN.match(str(column)))
+
+
+def indicator_fingerprints(df):
+    """One fingerprint per indicator over the fingerprints of its rows, independent of row order"""
+    _, fingerprints = row_fingerprints(df, NATURAL_KEY)
+    result = {}
+    for indicator_id, positions in df.groupby("indicator_id", sort=False).indices.items():
+        result[indicator_id] = hashlib.sha1(np.sort(fingerprints[positions]).tobytes()).hexdigest()
+    return result
+
+
+def is_additive(unit):
+    """Whether values in this unit can be summed across countries"""
+    unit = str(unit).lower()
+    return not any(marker in unit for marker in ("%", "/", " per ", "per capita", "index", "ratio", "rate"))
+
+
+def latest_values(df):
+    """Latest value, rank by latest value and CAGR per country and indicator"""
+    years = year_columns(df)
+    values = df[years].to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    has_value = present.any(axis=1)
+    year_numbers = np.array([int(year) for year in years])
+
+    # the last present column, reading the mask right to left
+    last = len(years) - 1 - np.argmax(present[:, ::-1], axis=1)
+    rows = np.arange(len(df))
+    latest = df[["indicator_id", *INDICATOR, "country"]].copy()
+    latest["latest_year"] = np.where(has_value, year_numbers[last], -1)
+    latest["latest_value"] = np.where(has_value, values[rows, last], np.nan)
+
+    # CAGR between the first and last values inside the window
+    window = (year_numbers >= CAGR_START) & (year_numbers <= CAGR_END)
+    in_window = present & window
+    has_window = in_window.any(axis=1)
+    first = np.argmax(in_window, axis=1)
+    end = len(years) - 1 - np.argmax(in_window[:, ::-1], axis=1)
+    start_value, end_value = values[rows, first], values[rows, end]
+    span = (year_numbers[end] - year_numbers[first]).astype(float)
+    valid = has_window & (span > 0) & (start_value > 0) & (end_value > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.power(end_value / start_value, 1 / span) - 1
+    latest["cagr"] = np.where(valid, cagr, np.nan)
+    latest["cagr_start_year"] = np.where(valid, year_numbers[first], -1)
+    latest["cagr_end_year"] = np.where(valid, year_numbers[end], -1)
+
+    latest = latest[has_value].reset_index(drop=True)
+    grouped = latest.groupby("indicator_id")["latest_value"]
+    latest["rank"] = grouped.rank(method="min", ascending=False).astype(int)
+    latest["countries"] = grouped.transform("size").astype(int)
+    return latest
+
+
+def long_values(df):
+    """One row per country, indicator and year with a value"""
+    years = year_columns(df)
+    long = df.melt(id_vars=["indicator_id", *INDICATOR, "country"], value_vars=years, var_name="year").dropna(subset=["value"])
+    long["year"] = long["year"].astype(int)
+    return long
+
+
+def regional_totals(long):
+    """Totals per region (and the continent), indicator and year for additive units"""
+    additive = long[long["unit"].map(is_additive).astype(bool)]
+    additive = additive.assign(region=additive["country"].map(COUNTRY_REGION))
+    keys = ["indicator_id", *INDICATOR, "year"]
+    regions = additive.dropna(subset=["region"]).groupby(["region", *keys], sort=False)["value"].agg(total="sum", countries="size")
+    continent = additive.groupby(keys, sort=False)["value"].agg(total="sum", countries="size").assign(region=CONTINENT)
+    return pd.concat([regions.reset_index(), continent.reset_index()], ignore_index=True)
+
+
+def rankings(long):
+    """Countries ranked by value per indicator and year"""
+    ordered = long.sort_values(["indicator_id", "year", "value"], ascending=[True, True, False], kind="stable")
+    ordered = ordered.assign(rank=ordered.groupby(["indicator_id", "year"])["value"].rank(method="min", ascending=False).astype(int))
+    ordered["entry"] = [
+        {"country": country, "value": value, "rank": rank}
+        for country, value, rank in zip(ordered["country"], ordered["value"], ordered["rank"])
+    ]
+    grouped = ordered.groupby(["indicator_id", *INDICATOR, "year"], sort=False)["entry"].agg(list)
+    return grouped.rename("ranking").reset_index()
+
+
+def documents(df):
+    """Frame rows as documents, NaN and the -1 year placeholders become None"""
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    for record in records:
+        for key, value in record.items():
+            if key.endswith("_year") and value == -1:
+                record[key] = None
+    return records
+
+
+def ensure_summary_indexes(db):
+    try:
+        latest = db.get_collection(LATEST)
+        latest.create_index([("indicator_id", ASCENDING), ("country", ASCENDING)], unique=True, name="indicator_country")
+        latest.create_index([("country", ASCENDING), ("metric", ASCENDING)], name="country_metric")
+        latest.create_index([("metric", ASCENDING), ("rank", ASCENDING)], name="metric_rank")
+        regions = db.get_collection(REGIONS_COLLECTION)
+        regions.create_index([("indicator_id", ASCENDING), ("region", ASCENDING), ("year", ASCENDING)], unique=True, name="indicator_region_year")
+        regions.create_index([("region", ASCENDING), ("metric", ASCENDING), ("year", DESCENDING)], name="region_metric_year")
+        ranked = db.get_collection(RANKINGS)
+        ranked.create_index([("indicator_id", ASCENDING), ("year", ASCENDING)], unique=True, name="indicator_year")
+        ranked.create_index([("metric", ASCENDING), ("year", DESCENDING)], name="metric_year")
+    except OperationFailure as e:
+        print(f"  ⚠ Could not create summary indexes: {e}")
+
+
+def replace_indicators(collection, indicator_ids, records, batch_size=500):
+    """Swap the documents of the given indicators for freshly computed ones"""
+    ids = list(indicator_ids)
+    for i in range(0, len(ids), batch_size):
+        collection.delete_many({"indicator_id": {"$in": ids[i:i + batch_size]}})
+    for i in range(0, len(records), 1000):
+        try:
+            collection.insert_many(records[i:i + 1000], ordered=False, **bulk_options(collection))
+        except BulkWriteError as e:
+            print(f"  ⚠ {len(e.details.get('writeErrors', []))} summary documents failed for {collection.name}")
+
+
+def materialize(db, jobs=None, full=False, dry_run=False):
+    """Refresh the summary collections for the indicators that changed since the last run"""
+    start = time.perf_counter()
+    df = staging_frame(jobs or parse_jobs(None))
+    fingerprints = indicator_fingerprints(df) if len(df) else {}
+    state = db.get_collection(STATE)
+    previous = {doc["_id"]: doc.get("fingerprint") for doc in state.find({}, {"fingerprint": 1})}
+    changed = [indicator for indicator, fingerprint in fingerprints.items() if full or previous.get(indicator) != fingerprint]
+    # only sectors present in these staging files can have lost indicators, the others just weren't loaded this time
+    sectors = set(df["sector"]) if len(df) else set()
+    removed = [indicator for indicator in previous if indicator not in fingerprints and indicator.split("|")[0] in sectors]
+    print(f"Materializing: {len(changed)} of {len(fingerprints)} indicators changed, {len(removed)} removed")
+    if dry_run or not (changed or removed):
+        return {"indicators": len(fingerprints), "changed": len(changed), "removed": len(removed), "seconds": time.perf_counter() - start}
+
+    summaries = {LATEST: [], REGIONS_COLLECTION: [], RANKINGS: []}
+    if changed:
+        subset = df[df["indicator_id"].isin(set(changed))]
+        long = long_values(subset)
+        summaries = {
+            LATEST: documents(latest_values(subset)),
+            REGIONS_COLLECTION: documents(regional_totals(long)),
+            RANKINGS: documents(rankings(long)),
+        }
+    ensure_summary_indexes(db)
+    for name, records in summaries.items():
+        replace_indicators(db.get_collection(name), changed + removed, records)
+
+    operations = [ReplaceOne({"_id": indicator}, {"_id": indicator, "fingerprint": fingerprints[indicator]}, upsert=True)
+                  for indicator in changed]
+    operations += [DeleteOne({"_id": indicator}) for indicator in removed]
+    state.bulk_write(operations, ordered=False)
+
+    seconds = time.perf_counter() - start
+    counts = {name: len(records) for name, records in summaries.items()}
+    print(f"✓ Materialized {', '.join(f'{count} {name}' for name, count in counts.items())} in {seconds:.2f}s")
+    return {"indicators": len(fingerprints), "changed": len(changed), "removed": len(removed), "seconds": seconds, **counts}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the precomputed summary collections from the staging files")
+    parser.add_argument("targets", nargs="*", help="collection names, optionally name=path, defaults to every collection")
+    parser.add_argument("--full", action="store_true", help="recompute every indicator instead of only the changed ones")
+    parser.add_argument("--dry-run", action="store_true", help="only report which indicators changed")
+    parser.add_argument("--uri", help="MongoDB uri, defaults to MONGO_URI from the environment")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        materialize(get_database(DATABASE, args.uri, **client_settings(args)), parse_jobs(args.targets), args.full, args.dry_run)
+    finally:
+        close_clients()
@@ -0,0 +1,206 @@
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from functools import wraps
+import numpy as np
+import pandas as pd
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from client import DATABASE, close_clients, get_database
+from loader import SECTOR_COLLECTIONS, on_load_complete
+
+"""
+read api over the loaded wide collections (energy_collect, electrical_collection, social_collection), so notebooks and services stop writing their own queries that pull whole documents. every call projects only the fields it needs on the server and returns pandas results.
+
+get_series(country, metric, years, sector) (years: None for 2000-2024, one year or an iterable like range(2010, 2025)) returns a float Series indexed by year
+compare_countries(metric, year, countries, sector) returns a Series of one year's values indexed by country, largest first
+list_indicators(sector) returns a DataFrame of the distinct indicators with the number of countries reporting each
+
+results are kept in an in-process LRU cache (CACHE_SIZE entries, each valid for CACHE_TTL seconds), so a repeated query is answered without a round trip. a load finishing in this process clears the cache through loader.on_load_complete, loads run from another process are picked up once the TTL runs out. callers get a copy, changing a returned frame doesn't change the cache.
+cache_info() reports hits, misses and size, clear_cache() empties it, ensure_query_indexes(db) creates the indexes these queries use
+
+python query.py --country Kenya --metric "Population with access to electricity"
+python query.py --create-indexes
+"""
+
+YEARS = list(range(2000, 2025))
+CACHE_SIZE = 512
+CACHE_TTL = 300.0
+
+
+class TTLCache:
+    """Least recently used cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_cache = TTLCache()
+
+
+def cached(fn):
+    """Serve repeated calls of fn from the cache, keyed on its arguments"""
+    @wraps(fn)
+    def wrapper(*args, db=None, **kwargs):
+        # the same query against another database is another entry
+        key = (
+            fn.__name__, None if db is None else (id(db.client), db.name),
+            tuple(freeze(arg) for arg in args), tuple(sorted((name, freeze(arg)) for name, arg in kwargs.items())),
+        )
+        result = _cache.get(key)
+        if result is None:
+            result = fn(*args, db=db, **kwargs)
+            _cache.put(key, result)
+        return result.copy()
+    return wrapper
+
+
+def cache_info():
+    return {"hits": _cache.hits, "misses": _cache.misses, "size": len(_cache.entries), "maxsize": _cache.maxsize, "ttl": _cache.ttl}
+
+
+def clear_cache(stats=None):
+    _cache.clear()
+
+
+# a load in this process makes every cached result stale
+on_load_complete(clear_cache)
+
+
+def collections(db=None, sector=None):
+    db = db if db is not None else get_database(DATABASE)
+    if sector is None:
+        return [db.get_collection(name) for name in SECTOR_COLLECTIONS.values()]
+    if sector not in SECTOR_COLLECTIONS:
+        raise ValueError(f"Unknown sector {sector!r}, expected one of {', '.join(SECTOR_COLLECTIONS)}")
+    return [db.get_collection(SECTOR_COLLECTIONS[sector])]
+
+
+def year_list(years):
+    """Years as a sorted tuple of ints, from None (every year), one year or any iterable such as range(2010, 2025)"""
+    if years is None:
+        return tuple(YEARS)
+    if isinstance(years, (int, np.integer)):
+        return (int(years),)
+    return tuple(sorted(int(year) for year in years))
+
+
+def freeze(value):
+    # lists and sets of countries or years become hashable cache key parts
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    if isinstance(value, (list, range)):
+        return tuple(value)
+    return value
+
+
+def get_series(country, metric, years=None, sector=None, db=None):
+    """One country's values of a metric by year, NaN where the portal has none"""
+    return _get_series(country, metric, year_list(years), sector, db=db)
+
+
+@cached
+def _get_series(country, metric, years, sector, db=None):
+    projection = {"_id": 0, **{str(year): 1 for year in years}}
+    values = np.full(len(years), np.nan)
+    for collection in collections(db, sector):
+        for doc in collection.find({"country": country, "metric": metric}, projection):
+            row = pd.to_numeric(pd.Series([doc.get(str(year)) for year in years], dtype=object), errors="coerce").to_numpy(dtype=float)
+            # duplicate charts of one indicator fill each other's gaps, the first value found wins
+            values = np.where(np.isnan(values), row, values)
+    return pd.Series(values, index=pd.Index(years, name="year"), name=metric)
+
+
+@cached
+def compare_countries(metric, year, countries=None, sector=None, db=None):
+    """One year's value of a metric for every country that reports it, largest first"""
+    query = {"metric": metric, str(year): {"$exists": True}}
+    if countries is not None:
+        query["country"] = {"$in": list(countries)}
+    frames = [
+        pd.DataFrame(list(collection.find(query, {"_id": 0, "country": 1, str(year): 1})), columns=["country", str(year)])
+        for collection in collections(db, sector)
+    ]
+    df = pd.concat(frames, ignore_index=True)
+    values = pd.to_numeric(df[str(year)], errors="coerce")
+    series = pd.Series(values.to_numpy(dtype=float), index=pd.Index(df["country"], name="country"), name=year)
+    series = series.dropna()
+    return series[~series.index.duplicated()].sort_values(ascending=False)
+
+
+@cached
+def list_indicators(sector=None, db=None):
+    """The distinct indicators of a sector (or every sector) and how many countries report each"""
+    pipeline = [
+        {"$group": {"_id": {"sub_sector": "$sub_sector", "metric": "$metric", "unit": "$unit"}, "countries": {"$addToSet": "$country"}}},
+        {"$project": {"_id": 0, "sub_sector": "$_id.sub_sector", "metric": "$_id.metric", "unit": "$_id.unit", "countries": {"$size": "$countries"}}},
+    ]
+    rows = []
+    for name, collection in zip([sector] if sector else SECTOR_COLLECTIONS, collections(db, sector)):
+        rows.extend(dict(doc, sector=name) for doc in collection.aggregate(pipeline))
+    df = pd.DataFrame(rows, columns=["sector", "sub_sector", "metric", "unit", "countries"])
+    return df.sort_values(["sector", "sub_sector", "metric", "unit"], ignore_index=True)
+
+
+def ensure_query_indexes(db=None):
+    """Indexes for the get_series and compare_countries filters on every wide collection"""
+    for collection in collections(db):
+        try:
+            collection.create_index([("country", ASCENDING), ("metric", ASCENDING)], name="country_metric")
+            collection.create_index([("metric", ASCENDING), ("country", ASCENDING)], name="metric_country")
+        except OperationFailure as e:
+            print(f"  ⚠ Could not create query indexes on {collection.name}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the loaded Africa Energy Portal collections")
+    parser.add_argument("--country")
+    parser.add_argument("--metric")
+    parser.add_argument("--year", type=int, help="with --metric and no --country, compare every country in this year")
+    parser.add_argument("--sector", choices=list(SECTOR_COLLECTIONS))
+    parser.add_argument("--create-indexes", action="store_true", help="create the indexes these queries use and exit")
+    parser.add_argument("--uri", help="MongoDB uri, defaults to MONGO_URI from the environment")
+    args = parser.parse_args()
+
+    db = get_database(DATABASE, args.uri)
+    try:
+        if args.create_indexes:
+            ensure_query_indexes(db)
+            print("✓ Query indexes created")
+        elif args.metric and args.country:
+            print(get_series(args.country, args.metric, sector=args.sector, db=db).dropna().to_string())
+        elif args.metric and args.year:
+            print(compare_countries(args.metric, args.year, sector=args.sector, db=db).to_string())
+        else:
+            print(list_indicators(args.sector, db=db).to_string())
+    finally:
+        close_clients()
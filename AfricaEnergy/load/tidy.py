@@ -0,0 +1,98 @@
+import re
+from datetime import datetime
+import pandas as pd
+from pymongo import ASCENDING
+from pymongo.errors import CollectionInvalid, OperationFailure
+from bulk import NATURAL_KEY, ensure_key_index
+
+"""
+long (tidy) layout for the loaded data. instead of one wide document per country and indicator with 25 string keyed year fields, every observed value becomes its own document holding the indicator keys, an integer year and a float value. missing years are simply absent, so "series for country X over years A-B" is a single indexed range query.
+
+is_long_column(column) tells which staging columns the long layout reads, so loads can skip the rest
+long_documents(df, timeseries) melts a staging chunk into long documents, timeseries=True nests the keys under meta and adds a date field for a MongoDB time-series collection
+ensure_long_collection(db, name, timeseries) creates the target collection (a time-series collection when asked) and its query indexes
+series_filter(country, metric, start, end, timeseries) builds the filter for a country/metric/year range query on either layout
+"""
+
+# the wide layout's natural key, chart_repeat included, so repeated charts stay apart in the long layout too
+INDICATOR_KEY = NATURAL_KEY
+YEAR_COLUMN = re.compile(r"^(19|20)\d{2}$")
+
+
+def is_long_column(column):
+    """Whether the long layout needs a staging column, used to project reads"""
+    return column in INDICATOR_KEY or bool(YEAR_COLUMN.match(str(column)))
+
+
+def long_collection_name(name):
+    return f"{name}_series"
+
+
+def long_documents(df, timeseries=False):
+    """Melt a wide staging chunk into one document per country, indicator and year with a value"""
+    year_columns = [column for column in df.columns if YEAR_COLUMN.match(str(column))]
+    key_columns = [key for key in INDICATOR_KEY if key in df.columns]
+
+    long_df = df.melt(id_vars=key_columns, value_vars=year_columns, var_name="year", value_name="value")
+    long_df["value"] = pd.to_numeric(long_df["value"], errors="coerce")
+    long_df = long_df.dropna(subset=["value"])
+    long_df["year"] = long_df["year"].astype(int)
+    # missing key cells (e.g. an empty unit) become "" so every document carries the full key
+    long_df[key_columns] = long_df[key_columns].astype(object).fillna("")
+
+    documents = long_df.to_dict("records")
+    if timeseries:
+        documents = [
+            {
+                "date": datetime(doc["year"], 1, 1),
+                "year": doc["year"],
+                "value": doc["value"],
+                "meta": {key: doc[key] for key in key_columns},
+            }
+            for doc in documents
+        ]
+    return documents
+
+
+def ensure_long_collection(db, name, timeseries=False):
+    """Create a long layout collection with indexes for country/metric/year range queries"""
+    if timeseries:
+        try:
+            db.create_collection(name, timeseries={"timeField": "date", "metaField": "meta", "granularity": "hours"})
+        except CollectionInvalid:
+            pass
+        except OperationFailure as e:
+            print(f"  ⚠ Could not create time-series collection {name}, falling back to a regular one: {e}")
+            timeseries = False
+
+    collection = db.get_collection(name)
+    if timeseries:
+        collection.create_index([("meta.country", ASCENDING), ("meta.metric", ASCENDING), ("date", ASCENDING)], name="country_metric_date")
+        collection.create_index([("meta.metric", ASCENDING), ("date", ASCENDING)], name="metric_date")
+    else:
+        ensure_key_index(collection, [(key, ASCENDING) for key in INDICATOR_KEY] + [("year", ASCENDING)], "natural_key_year")
+        collection.create_index([("country", ASCENDING), ("metric", ASCENDING), ("year", ASCENDING)], name="country_metric_year")
+        collection.create_index([("metric", ASCENDING), ("year", ASCENDING)], name="metric_year")
+    return collection, timeseries
+
+
+def series_filter(country, metric, start=None, end=None, timeseries=False):
+    """Filter for one country and metric over an inclusive year range"""
+    prefix = "meta." if timeseries else ""
+    query = {f"{prefix}country": country, f"{prefix}metric": metric}
+    if start is not None or end is not None:
+        if timeseries:
+            span = {}
+            if start is not None:
+                span["$gte"] = datetime(start, 1, 1)
+            if end is not None:
+                span["$lt"] = datetime(end + 1, 1, 1)
+            query["date"] = span
+        else:
+            span = {}
+            if start is not None:
+                span["$gte"] = start
+            if end is not None:
+                span["$lte"] = end
+            query["year"] = span
+    return query
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the scripts import each other by module name, the way they run from their own directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ("extract", "load", "bench"):
+    sys.path.insert(0, os.path.join(ROOT, directory))
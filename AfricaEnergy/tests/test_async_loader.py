@@ -0,0 +1,83 @@
+import mongomock
+import pandas as pd
+import pytest
+import async_loader
+from client import build_client
+
+
+class FakeAsyncClient:
+    """Async facade over mongomock, remembering how the loader built it"""
+    built = []
+
+    def __init__(self, uri, **options):
+        self.uri, self.options = uri, options
+        self.backend = mongomock.MongoClient()
+        FakeAsyncClient.built.append(self)
+
+    def get_database(self, name):
+        return FakeAsyncDatabase(self, self.backend.get_database(name))
+
+    def close(self):
+        pass
+
+
+class FakeAsyncDatabase:
+    def __init__(self, client, database):
+        self.client, self.database, self.name = client, database, database.name
+
+    def get_collection(self, name):
+        return FakeAsyncCollection(self, self.database.get_collection(name))
+
+
+class FakeAsyncCollection:
+    def __init__(self, database, collection):
+        self.database, self.collection, self.name = database, collection, collection.name
+
+    async def insert_many(self, documents, **kwargs):
+        return self.collection.insert_many(documents, **kwargs)
+
+    async def bulk_write(self, operations, **kwargs):
+        return self.collection.bulk_write(operations, **kwargs)
+
+    async def create_index(self, keys, **kwargs):
+        return self.collection.create_index(keys, **kwargs)
+
+    async def index_information(self):
+        return self.collection.index_information()
+
+    async def drop_index(self, name):
+        return self.collection.drop_index(name)
+
+
+@pytest.fixture
+def staging_file(tmp_path):
+    path = str(tmp_path / "energy.csv")
+    pd.DataFrame({
+        "country": ["Kenya", "Ghana", "Nigeria"], "metric": "Access", "unit": "%", "sector": "Energy",
+        "sub_sector": "Access", "sub_sub_sector": "Access", "2019": [1.0, 2.0, 3.0],
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_async_load_targets_the_collections_client(monkeypatch, staging_file):
+    monkeypatch.setattr(async_loader, "AsyncMongoClient", FakeAsyncClient)
+    FakeAsyncClient.built.clear()
+    collection = build_client("mongodb://elsewhere:27018", mongomock.MongoClient, pool_size=7).get_database("other").get_collection("energy_collect")
+
+    stats = async_loader.load_staging(collection, staging_file, "async", batch_size=2, mode="upsert", layout="wide")
+    assert stats["rows"] == 3 and stats["batches"] == 2
+    client = FakeAsyncClient.built[0]
+    assert client.uri == "mongodb://elsewhere:27018" and client.options["maxPoolSize"] == 7
+    assert client.backend.get_database("other").get_collection("energy_collect").count_documents({}) == 3
+
+
+def test_async_load_refuses_sync_only_options(monkeypatch, staging_file):
+    monkeypatch.setattr(async_loader, "AsyncMongoClient", FakeAsyncClient)
+    collection = build_client("mongodb://localhost", mongomock.MongoClient).get_database("db").get_collection("energy_collect")
+    for options in ({"layout": "long"}, {"dry_run": True}, {"mode": "delta"}, {"workers": 2}):
+        with pytest.raises(ValueError, match="async backend"):
+            async_loader.load_staging(collection, staging_file, "async", **options)
+
+    # a client built elsewhere has no known uri, the async backend can't follow it
+    with pytest.raises(ValueError):
+        async_loader.load_staging(mongomock.MongoClient().get_database("db").get_collection("c"), staging_file, "async")
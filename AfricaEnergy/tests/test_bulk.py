@@ -0,0 +1,113 @@
+import threading
+import mongomock
+import numpy as np
+import pandas as pd
+import pytest
+import loader
+from bulk import EMPTY_KEY, NATURAL_KEY, REPEAT, bulk_counts, documents_written, key_filter, number_repeats
+from client import build_client
+from loader import clean_chunk, ensure_indexes, upsert_batch
+from pipeline import BatchWriter
+
+
+def chart_rows():
+    return pd.DataFrame({
+        "country": ["Kenya", "Ghana"], "country_serial": [1, 2], "metric": "Access", "unit": [np.nan, "%"],
+        "sector": "Electricity", "sub_sector": "Access", "sub_sub_sector": "Access", "2019": [1.0, 2.0],
+    })
+
+
+def test_key_filter_matches_any_empty_value():
+    doc = {"country": "Kenya", "metric": "Access", "unit": np.nan, "sector": "Electricity", "sub_sector": ""}
+    query = key_filter(doc)
+    assert query["country"] == "Kenya"
+    assert query["unit"] == query["sub_sector"] == query["sub_sub_sector"] == EMPTY_KEY
+    assert list(query) == list(NATURAL_KEY)
+
+
+def test_bulk_counts_of_results_and_errors():
+    counts = bulk_counts({"nMatched": 2, "nUpserted": 1, "nModified": 1, "writeErrors": [{}]})
+    assert counts["errors"] == 1 and documents_written(counts) == 3
+    assert documents_written(bulk_counts({"nInserted": 4})) == 4
+
+
+def test_loader_and_pipeline_upserts_agree():
+    db = mongomock.MongoClient().get_database("bulk")
+    collection = db.get_collection("electrical_collection")
+    first = upsert_batch(collection, clean_chunk(chart_rows()))
+    assert first["upserted"] == 2
+    assert collection.find_one({"country": "Kenya"})["unit"] == ""
+
+    # the streaming writer finds the loader's documents, empty unit included
+    writer = BatchWriter(db, batch_size=10, mode="upsert")
+    writer.start()
+    writer.put("electrical_collection", chart_rows())
+    assert writer.close() == {"electrical_collection": 2}
+    assert collection.count_documents({}) == 2
+
+
+def test_pipeline_writes_follow_the_clients_bypass_setting(monkeypatch):
+    calls = []
+    insert_many = mongomock.collection.Collection.insert_many
+    monkeypatch.setattr(mongomock.collection.Collection, "insert_many",
+                        lambda self, documents, **kwargs: calls.append(kwargs) or insert_many(self, documents, **kwargs))
+    db = build_client("mongodb://localhost", mongomock.MongoClient, bypass_validation=True).get_database("bulk")
+    writer = BatchWriter(db, batch_size=10)
+    writer.start()
+    writer.put("electrical_collection", chart_rows())
+    assert writer.close() == {"electrical_collection": 2}
+    assert calls[0]["bypass_document_validation"] is True
+
+
+class FailingRows:
+    """Chart rows whose conversion fails once released, while the scraper is already waiting on a full queue"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def reindex(self, **kwargs):
+        self.release.wait(5)
+        raise ValueError("bad chart rows")
+
+
+def test_writer_that_died_doesnt_block_the_scraper():
+    writer = BatchWriter(mongomock.MongoClient().get_database("bulk"), queue_size=1)
+    writer.start()
+    failing = FailingRows()
+    writer.put("electrical_collection", failing)
+    writer.put("electrical_collection", chart_rows())
+    threading.Timer(0.2, failing.release.set).start()
+    with pytest.raises(RuntimeError, match="writer thread has stopped"):
+        writer.put("electrical_collection", chart_rows())
+    assert writer.close() == {} and isinstance(writer.error, ValueError)
+
+
+def test_finished_collections_tell_the_load_hooks(monkeypatch):
+    finished = []
+    monkeypatch.setattr(loader, "_load_hooks", [finished.append])
+    writer = BatchWriter(mongomock.MongoClient().get_database("bulk"), batch_size=10)
+    writer.start()
+    writer.put("electrical_collection", chart_rows())
+    writer.finish("electrical_collection")
+    writer.put("energy_collect", chart_rows())
+    writer.close()
+    assert finished == [{"collection": "electrical_collection", "rows": 2}, {"collection": "energy_collect", "rows": 2}]
+
+
+def test_charts_sharing_an_indicator_keep_their_own_documents():
+    db = mongomock.MongoClient().get_database("bulk")
+    collection = db.get_collection("energy_collect")
+    # documents and index of a load made before chart_repeat was part of the key
+    old_key = NATURAL_KEY[:-1]
+    collection.create_index([(key, 1) for key in old_key], unique=True, name="natural_key")
+    upsert_batch(collection, clean_chunk(chart_rows()), old_key)
+
+    # the same indicator charted twice with other values, as on the Energy page
+    repeated = pd.concat([chart_rows(), chart_rows().assign(**{"2019": [3.0, 4.0]})], ignore_index=True)
+    keyed = number_repeats(repeated, {})
+    assert keyed[REPEAT].tolist() == ["", "", "#2", "#2"]
+    ensure_indexes(collection)
+    for _ in range(2):
+        counts = upsert_batch(collection, clean_chunk(keyed))
+    assert counts["matched"] == 4 and collection.count_documents({}) == 4
+    assert sorted(doc["2019"] for doc in collection.find({}, {"2019": 1})) == [1.0, 2.0, 3.0, 4.0]
@@ -0,0 +1,72 @@
+import pandas as pd
+from bench_transform import synthetic_payload
+from charts import parse_indicator, payload_to_frame
+from checkpoint import Checkpoint, chart_hashes, indicator_key
+from scrape import checkpoint_charts
+
+
+def duplicate_label_payload():
+    # two charts with the same indicator label but different values, as on the Energy page
+    label = ["Population without access to clean cooking fuels (millions of people)", "millions of people", "Clean cooking"]
+    return {
+        "indicators": [label, label],
+        "charts": [[0, "a", ""], [1, "b", ""]],
+        "countries": ["Kenya", "Ghana"],
+        "names": ["2019", "2020"],
+        "chart": [0, 0, 1, 1],
+        "country": [0, 1, 0, 1],
+        "year": [0, 1, 0, 1],
+        "value": [1.0, 2.0, 3.0, 4.0],
+    }
+
+
+def test_indicator_key_numbers_repeated_labels():
+    metadata = [parse_indicator(*indicator) for indicator in duplicate_label_payload()["indicators"]]
+    assert indicator_key(0, metadata) == metadata[0]["label"]
+    assert indicator_key(1, metadata) == metadata[0]["label"] + " #2"
+    assert indicator_key(2, metadata) == "chart-2"
+
+
+def test_checkpoint_keeps_charts_with_the_same_label(tmp_path):
+    payload = duplicate_label_payload()
+    metadata = [parse_indicator(*indicator) for indicator in payload["indicators"]]
+    hashes, positions = chart_hashes(payload, metadata)
+    assert len(hashes) == 2 and sorted(positions.values()) == [0, 1]
+
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.sqlite"))
+    rows = checkpoint_charts(checkpoint, payload, metadata, "Energy")
+    pd.testing.assert_frame_equal(rows, payload_to_frame(payload, metadata, "Energy"), check_dtype=False)
+    checkpoint.close()
+
+
+def test_checkpoint_matches_a_run_without_it(tmp_path):
+    payload = synthetic_payload(12, 20)
+    metadata = [parse_indicator(*indicator) for indicator in payload["indicators"]]
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.sqlite"))
+    first = checkpoint_charts(checkpoint, payload, metadata, "Energy")
+    pd.testing.assert_frame_equal(first, payload_to_frame(payload, metadata, "Energy"), check_dtype=False)
+
+    # an unchanged rerun transforms nothing, a changed value only redoes its own chart
+    assert checkpoint_charts(checkpoint, payload, metadata, "Energy").attrs["changed_charts"] == 0
+    payload["value"][0] = 99.0
+    again = checkpoint_charts(checkpoint, payload, metadata, "Energy")
+    assert again.attrs["changed_charts"] == 1
+    pd.testing.assert_frame_equal(again, payload_to_frame(payload, metadata, "Energy"), check_dtype=False)
+    checkpoint.close()
+
+
+def test_partial_refresh_keeps_full_run_serials(tmp_path):
+    # the charts share a label but not their countries, serials count across both charts
+    payload = duplicate_label_payload()
+    payload.update(countries=["Kenya", "Ghana", "Nigeria"], chart=[0, 0, 1, 1], country=[0, 1, 1, 2])
+    metadata = [parse_indicator(*indicator) for indicator in payload["indicators"]]
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.sqlite"))
+    checkpoint_charts(checkpoint, payload, metadata, "Energy")
+
+    payload["value"][3] = 99.0
+    again = checkpoint_charts(checkpoint, payload, metadata, "Energy")
+    assert again.attrs["changed_charts"] == 1
+    full = payload_to_frame(payload, metadata, "Energy")
+    pd.testing.assert_frame_equal(again, full, check_dtype=False)
+    assert dict(zip(full["country"][2:], full["country_serial"][2:])) == {"Ghana": 2, "Nigeria": 1}
+    checkpoint.close()
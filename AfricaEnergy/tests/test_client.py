@@ -0,0 +1,30 @@
+import mongomock
+import pytest
+import client
+from client import bulk_options, build_client, get_client, get_database
+
+
+def test_bypass_follows_the_collections_client(monkeypatch):
+    monkeypatch.setattr(client, "MongoClient", mongomock.MongoClient)
+    monkeypatch.delenv("MONGO_BYPASS_VALIDATION", raising=False)
+    try:
+        shared = get_client("mongodb://localhost", bypass_validation=True)
+        assert isinstance(shared, mongomock.MongoClient)
+        loading = shared.get_database("db").get_collection("c")
+        assert bulk_options(loading) == {"bypass_document_validation": True}
+
+        # a reader asking for the default client in the same process doesn't switch it off
+        reading = get_database("db", "mongodb://localhost").get_collection("c")
+        assert bulk_options(reading) == {}
+        assert bulk_options(loading) == {"bypass_document_validation": True}
+
+        unshared = build_client("mongodb://localhost", mongomock.MongoClient, bypass_validation=True)
+        assert bulk_options(unshared.get_database("db").get_collection("c")) == {"bypass_document_validation": True}
+        assert bulk_options(mongomock.MongoClient().get_database("db").get_collection("c")) == {}
+    finally:
+        client.close_clients()
+
+
+def test_unacknowledged_writes_are_refused():
+    with pytest.raises(ValueError):
+        client.resolve_settings(write_concern=0)
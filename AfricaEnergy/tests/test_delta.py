@@ -0,0 +1,78 @@
+import json
+import mongomock
+import numpy as np
+import pandas as pd
+from delta import load_delta, plan_delta, stored_fingerprints
+from loader import NATURAL_KEY, clean_chunk
+
+
+def staging(values, unit="%"):
+    return pd.DataFrame({
+        "country": ["Kenya", "Ghana", "Chad"], "country_serial": [1, 2, 3], "metric": "Access", "unit": unit,
+        "sector": "Electricity", "sub_sector": "Access", "sub_sub_sector": "Access (%)", "2019": values, "2020": [1.0, 2.0, np.nan],
+    })
+
+
+def collection():
+    return mongomock.MongoClient().get_database("delta").get_collection("electrical_collection")
+
+
+def test_plan_delta_keeps_only_changes():
+    first = plan_delta([staging([1.0, 2.0, 3.0])], {}, NATURAL_KEY, clean_chunk)
+    assert len(first["inserts"]) == 3 and not first["updates"] and not first["deletes"]
+
+    previous = {key: (fp, None, []) for key, fp in first["fingerprints"].items()}
+    changed = staging([1.0, 5.0, 3.0]).iloc[:2]
+    delta = plan_delta([changed], previous, NATURAL_KEY, clean_chunk)
+    assert [key[0] for key, _ in delta["updates"]] == ["Ghana"]
+    assert [key[0] for key in delta["deletes"]] == ["Chad"]
+    assert not delta["inserts"]
+
+    # csv strings and floats of the same values fingerprint the same
+    as_text = staging(["1.0", "2.0", "3.0"])
+    assert not plan_delta([as_text], previous, NATURAL_KEY, clean_chunk)["updates"]
+
+
+def run(target, frame, **kwargs):
+    return load_delta(target, [frame], NATURAL_KEY, clean_chunk, **kwargs)
+
+
+def test_sidecar_update_replaces_rows_with_an_empty_key(tmp_path):
+    target = collection()
+    state = str(tmp_path / "state.json")
+    run(target, staging([1.0, 2.0, 3.0], unit=np.nan), state_path=state)
+
+    entries = json.load(open(state))
+    for entry in entries:
+        entry["fingerprint"] = 0
+    json.dump(entries, open(state, "w"))
+    stats = run(target, staging([1.0, 2.0, 3.0], unit=np.nan), state_path=state)
+    assert stats["updated"] == 3
+    assert target.count_documents({}) == 3
+
+
+def test_delta_removes_duplicates_of_earlier_insert_runs():
+    target = collection()
+    target.insert_many(clean_chunk(staging([1.0, 2.0, 3.0])))
+    target.insert_many(clean_chunk(staging([1.0, 2.0, 3.0])))
+    assert len(stored_fingerprints(target, NATURAL_KEY)) == 3
+
+    stats = run(target, staging([1.0, 2.0, 3.0]))
+    assert stats["duplicates"] == 3
+    assert target.count_documents({}) == 3
+    # the next run finds every row unchanged
+    assert run(target, staging([1.0, 2.0, 3.0]))["unchanged"] == 3
+
+
+def test_sidecar_state_from_before_chart_repeat_still_matches(tmp_path):
+    target = collection()
+    state = str(tmp_path / "state.json")
+    run(target, staging([1.0, 2.0, 3.0]), state_path=state)
+
+    # a state file written while the natural key had no chart_repeat field
+    entries = json.load(open(state))
+    for entry in entries:
+        entry["key"] = entry["key"][:-1]
+    json.dump(entries, open(state, "w"))
+    assert run(target, staging([1.0, 2.0, 3.0]), state_path=state)["unchanged"] == 3
+    assert target.count_documents({}) == 3
@@ -0,0 +1,18 @@
+from fnmatch import fnmatch
+from driver import LEAN_BLOCKED
+
+SCRIPTS = [
+    "https://africa-energy-portal.org/sites/default/files/js/js_main.js",
+    "https://code.highcharts.com/highcharts.js",
+    "https://africa-energy-portal.org/libraries/select2/dist/js/select2.min.js",
+    "https://code.jquery.com/jquery-3.6.0.min.js",
+]
+
+
+def test_lean_mode_blocks_no_scripts():
+    assert not [(url, pattern) for url in SCRIPTS for pattern in LEAN_BLOCKED if fnmatch(url, pattern)]
+
+
+def test_lean_mode_blocks_images_and_trackers():
+    for url in ("https://africa-energy-portal.org/themes/logo.png", "https://www.google-analytics.com/analytics.js"):
+        assert any(fnmatch(url, pattern) for pattern in LEAN_BLOCKED)
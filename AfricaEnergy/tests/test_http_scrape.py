@@ -0,0 +1,69 @@
+import json
+import pandas as pd
+import pytest
+from html import escape
+from charts import parse_indicator, payload_to_frame
+from http_scrape import find_chart_configs, parse_charts
+
+INDICATORS = [
+    ["Electricity access (% of population)", "%", "Access"],
+    ["Installed capacity (MW)", "MW", "Supply"],
+]
+
+# Highcharts options of two charts, countries on the x axis and one series per year, points in the shapes highcharts accepts
+CONFIGS = [
+    {
+        "title": {"text": "Electricity access"}, "yAxis": {"title": {"text": "%"}},
+        "xAxis": {"categories": ["Kenya", "Ghana"]},
+        "series": [{"name": "2019", "data": [70.0, None]}, {"name": "2020", "data": [{"y": 75.0}, [1, 86.0]]}],
+    },
+    {
+        "title": {"text": "Installed capacity"}, "yAxis": [{"title": {"text": "MW"}}],
+        "xAxis": [{"categories": ["Ghana", "Nigeria"]}],
+        "series": [{"name": "2020", "data": [5300.0, 12500.0]}],
+    },
+]
+
+# what the selenium extract script reads out of Highcharts.charts for the same two charts
+SELENIUM_PAYLOAD = {
+    "indicators": INDICATORS,
+    "charts": [[0, "Electricity access", "%"], [1, "Installed capacity", "MW"]],
+    "countries": ["Kenya", "Ghana", "Nigeria"],
+    "names": ["2019", "2020"],
+    "chart": [0, 0, 0, 1, 1],
+    "country": [0, 0, 1, 1, 2],
+    "year": [0, 1, 1, 1, 1],
+    "value": [70.0, 75.0, 86.0, 5300.0, 12500.0],
+}
+
+
+def data_chart_html(configs):
+    return "".join(f'<div class="chart" data-chart="{escape(json.dumps(config))}"></div>' for config in configs)
+
+
+RESPONSES = {
+    "highcharts json": {"charts": CONFIGS},
+    "data-chart attributes": data_chart_html(CONFIGS),
+    "drupal ajax settings": [{"command": "settings", "settings": {"charts": CONFIGS}}],
+    "drupal ajax markup": [{"command": "insert", "data": data_chart_html(CONFIGS)}],
+}
+
+
+@pytest.mark.parametrize("shape", RESPONSES)
+def test_parse_charts_matches_the_selenium_extract(shape):
+    columns = parse_charts(RESPONSES[shape])
+    for key in ("charts", "countries", "names", "chart", "country", "year", "value"):
+        assert columns[key] == SELENIUM_PAYLOAD[key], key
+
+    metadata = [parse_indicator(*indicator) for indicator in INDICATORS]
+    pd.testing.assert_frame_equal(
+        payload_to_frame(columns, metadata, "Electricity"), payload_to_frame(SELENIUM_PAYLOAD, metadata, "Electricity")
+    )
+
+
+def test_find_chart_configs_skips_what_is_not_a_chart():
+    assert find_chart_configs({"status": "ok"}) == []
+    assert find_chart_configs('<div data-chart="not json"></div>') == []
+    # a chart without categories or series keeps its index, like an empty Highcharts.charts slot
+    columns = parse_charts({"charts": [{"series": []}] + CONFIGS})
+    assert [chart[0] for chart in columns["charts"]] == [1, 2]
@@ -0,0 +1,22 @@
+import os
+import mongomock
+import pandas as pd
+import metrics
+from loader import load_collections
+
+
+def test_load_run_reports_insert_phase_and_documents(tmp_path):
+    path = str(tmp_path / "electricity.csv")
+    pd.DataFrame({
+        "country": ["Kenya", "Ghana"], "metric": "Access", "unit": "%", "sector": "Electricity",
+        "sub_sector": "Access", "sub_sub_sector": "Access", "2019": [1.0, 2.0],
+    }).to_csv(path, index=False)
+    db = mongomock.MongoClient().get_database("load")
+
+    for mode in ("insert", "upsert"):
+        metrics.run(load_collections, db, [("electrical_collection", path)], mode=mode, name="load", directory=str(tmp_path))
+        report = metrics.snapshot()
+        assert report["phases"]["mongo_insert"]["calls"] == 1
+        assert report["counters"]["documents_written"] == 2
+    assert os.path.exists(tmp_path / "load.prom")
+    assert 'phase="mongo_insert"' in (tmp_path / "load.prom").read_text()
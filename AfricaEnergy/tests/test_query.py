@@ -0,0 +1,56 @@
+import time
+import mongomock
+import pytest
+import query
+from loader import load_file, staging_path
+
+
+@pytest.fixture
+def db():
+    query.clear_cache()
+    database = mongomock.MongoClient().get_database("query")
+    collection = database.get_collection("electrical_collection")
+    for country, values in (("Kenya", {"2019": 40.0, "2020": 73.0}), ("Ghana", {"2020": 86.0}), ("Chad", {"2019": 9.0})):
+        collection.insert_one(dict(country=country, metric="Access", unit="%", sector="Electricity", sub_sector="Access", **values))
+    # a duplicate chart of the same indicator fills the gaps of the first
+    collection.insert_one({"country": "Kenya", "metric": "Access", "unit": "%", "sector": "Electricity", "sub_sector": "Access", "2001": 7.0})
+    yield database
+    query._cache.ttl = query.CACHE_TTL
+    query.clear_cache()
+
+
+def test_queries(db):
+    series = query.get_series("Kenya", "Access", db=db)
+    assert series.dropna().to_dict() == {2001: 7.0, 2019: 40.0, 2020: 73.0}
+    assert query.get_series("Kenya", "Access", range(2019, 2021), db=db).to_dict() == {2019: 40.0, 2020: 73.0}
+    assert query.compare_countries("Access", 2020, db=db).to_dict() == {"Ghana": 86.0, "Kenya": 73.0}
+    assert query.compare_countries("Access", 2020, countries=["Kenya", "Chad"], db=db).to_dict() == {"Kenya": 73.0}
+    indicators = query.list_indicators(db=db)
+    assert indicators[["sector", "metric", "countries"]].values.tolist() == [["Electricity", "Access", 3]]
+    with pytest.raises(ValueError):
+        query.list_indicators("Nope", db=db)
+
+
+def test_repeated_queries_are_cached_copies(db):
+    first = query.get_series("Kenya", "Access", db=db)
+    misses = query.cache_info()["misses"]
+    first[:] = 0
+    again = query.get_series("Kenya", "Access", db=db)
+    assert again.dropna().iloc[0] == 7.0
+    assert query.cache_info()["misses"] == misses and query.cache_info()["hits"] >= 1
+
+
+def test_a_finished_load_clears_the_cache(db):
+    query.get_series("Kenya", "Access", db=db)
+    assert query.cache_info()["size"] == 1
+    load_file(db.get_collection("energy_collect"), staging_path("energy_collect"))
+    assert query.cache_info()["size"] == 0
+
+
+def test_entries_expire(db):
+    query._cache.ttl = 0.01
+    query.get_series("Kenya", "Access", db=db)
+    time.sleep(0.02)
+    misses = query.cache_info()["misses"]
+    query.get_series("Kenya", "Access", db=db)
+    assert query.cache_info()["misses"] == misses + 1
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from charts import merge_payloads, parse_indicator, payload_to_frame
+from fixture import FixtureSite
+
+SECTOR = "Electricity"
+
+
+def extract(site, labels):
+    """Python copy of EXTRACT_SCRIPT over the charts the fixture returns for the ticked indicators"""
+    indicators = [indicator for indicator in site.indicators[SECTOR] if indicator[0] in labels]
+    configs = site.apply({"indicator[]": [indicator[0] for indicator in indicators]})["charts"]
+    payload = {key: [] for key in ("indicators", "charts", "countries", "names", "chart", "country", "year", "value")}
+    payload["indicators"] = [list(indicator) for indicator in indicators]
+    country_ids, name_ids = {}, {}
+
+    def intern(ids, values, key):
+        if key not in ids:
+            ids[key] = len(values)
+            values.append(key)
+        return ids[key]
+
+    for chart_idx, config in enumerate(configs):
+        payload["charts"].append([chart_idx, config["title"]["text"], config["yAxis"]["title"]["text"]])
+        names = [intern(name_ids, payload["names"], series["name"]) for series in config["series"]]
+        for country_idx, country in enumerate(config["xAxis"]["categories"]):
+            for series_idx, series in enumerate(config["series"]):
+                value = series["data"][country_idx]
+                if value is not None:
+                    payload["chart"].append(chart_idx)
+                    payload["country"].append(intern(country_ids, payload["countries"], country))
+                    payload["year"].append(names[series_idx])
+                    payload["value"].append(value)
+    return payload
+
+
+def frame(payload):
+    return payload_to_frame(payload, [parse_indicator(*indicator) for indicator in payload["indicators"]], SECTOR)
+
+
+@pytest.mark.parametrize("size", [1, 5, 7, 23, 100])
+def test_merged_shards_match_the_unsharded_page(size):
+    site = FixtureSite(23, 54, missing=0.5)
+    labels = [indicator[0] for indicator in site.indicators[SECTOR]]
+    shards = [extract(site, labels[i:i + size]) for i in range(0, len(labels), size)]
+    pd.testing.assert_frame_equal(frame(merge_payloads(shards)), frame(extract(site, labels)))
+
+
+def test_fallback_charts_go_after_every_indicator():
+    first = {
+        "indicators": [["A (x)", "x", "t"]], "charts": [[0, "A (x)", "x"], [1, "Extra (y)", "y"]],
+        "countries": ["Kenya", "Ghana"], "names": ["2001"], "chart": [0, 0, 1], "country": [0, 1, 1], "year": [0, 0, 0], "value": [1, 2, 3],
+    }
+    second = {
+        "indicators": [["B (x)", "x", "t"]], "charts": [[0, "B (x)", "x"]],
+        "countries": ["Ghana", "Kenya"], "names": ["2002"], "chart": [0, 0], "country": [0, 1], "year": [0, 0], "value": [4, 5],
+    }
+    merged = merge_payloads([first, second])
+    assert merged["charts"] == [[0, "A (x)", "x"], [2, "Extra (y)", "y"], [1, "B (x)", "x"]]
+    assert merged["countries"] == ["Kenya", "Ghana"] and merged["names"] == ["2001", "2002"]
+    # ids are interned again, Ghana and Kenya keep one id each across the shards, fallback points come last
+    assert merged["chart"] == [0, 0, 1, 1, 2]
+    assert merged["country"] == [0, 1, 1, 0, 1]
+    assert merged["value"] == [1, 2, 4, 5, 3]
+    assert list(frame(merged)["metric"].unique()) == ["A", "B", "Extra"]
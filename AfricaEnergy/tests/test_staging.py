@@ -0,0 +1,18 @@
+import pandas as pd
+import staging
+from bench_transform import synthetic_payload
+from charts import parse_indicator, payload_to_frame
+from loader import COLLECTIONS, read_chunks, staging_path
+
+
+def test_loader_reads_the_files_the_scraper_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(staging, "STAGING_DIR", str(tmp_path))
+    payload = synthetic_payload(3, 5)
+    metadata = [parse_indicator(*indicator) for indicator in payload["indicators"]]
+    for collection, sector in COLLECTIONS.items():
+        assert staging_path(collection).endswith(".csv")
+        frame = payload_to_frame(payload, metadata, sector)
+        written = staging.save_sector_data(sector, frame)
+        assert staging_path(collection) == written
+        loaded = pd.concat(read_chunks(written), ignore_index=True)
+        assert len(loaded) == len(frame) and set(loaded["sector"]) == {sector}
@@ -0,0 +1,69 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+import metrics
+import steps
+
+
+@pytest.fixture(autouse=True)
+def fresh_run(monkeypatch):
+    metrics.reset()
+    steps.reset_budget()
+    monkeypatch.setattr(steps.time, "sleep", lambda seconds: None)
+
+
+def flaky(failures):
+    """An action failing with a selenium timeout failures times before it succeeds, recording each timeout it got"""
+    timeouts = []
+
+    def action(timeout):
+        timeouts.append(timeout)
+        if len(timeouts) <= failures:
+            raise TimeoutException("Timed out waiting for charts\nstacktrace")
+        return "done"
+    return action, timeouts
+
+
+def test_retries_with_growing_timeouts():
+    action, timeouts = flaky(2)
+    assert steps.run_step("charts_wait", action, timeout=60) == "done"
+    assert timeouts == [60, 60 * steps.TIMEOUT_GROWTH, 60 * steps.TIMEOUT_GROWTH ** 2]
+    assert steps.summary()["charts_wait"] == {"runs": 1, "retries": 2, "failures": 0}
+
+
+def test_required_step_fails_after_its_retries():
+    action, timeouts = flaky(5)
+    recovered = []
+    with pytest.raises(steps.StepFailed, match="Timed out waiting for charts$"):
+        steps.run_step("apply", action, timeout=10, recover=lambda: recovered.append(True))
+    assert len(timeouts) == steps.RETRIES + 1 and len(recovered) == steps.RETRIES
+    assert steps.summary()["apply"]["failures"] == 1
+
+
+def test_optional_step_only_warns():
+    action, _ = flaky(5)
+    assert steps.run_step("year_filter", action, required=False) is None
+
+
+def test_retry_budget_is_shared_across_steps():
+    steps.reset_budget(1)
+    first, _ = flaky(1)
+    assert steps.run_step("sector_select", first) == "done"
+    second, timeouts = flaky(1)
+    with pytest.raises(steps.StepFailed, match="retry budget used up"):
+        steps.run_step("themes", second)
+    assert len(timeouts) == 1
+
+
+def test_other_errors_are_not_retried():
+    def broken(timeout):
+        raise ValueError("not a selenium error")
+    with pytest.raises(ValueError):
+        steps.run_step("apply", broken)
+    assert steps.summary()["apply"] == {"runs": 1, "retries": 0, "failures": 1}
+
+
+def test_backoff_is_jittered_and_capped():
+    for attempt in range(8):
+        delay = steps.backoff_delay(attempt)
+        cap = min(steps.MAX_BACKOFF, steps.BACKOFF * 2 ** attempt)
+        assert cap / 2 <= delay <= cap
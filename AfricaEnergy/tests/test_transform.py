@@ -0,0 +1,57 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from bench_transform import legacy_transform, synthetic_payload
+from charts import COLUMNS, YEARS, frame_to_long, parse_indicator, payload_to_frame
+
+KEYS = COLUMNS[:-len(YEARS)]
+
+
+def assert_same_rows(payload):
+    metadata = [parse_indicator(*indicator) for indicator in payload["indicators"]]
+    legacy = legacy_transform(payload, metadata, "Energy")
+    vectorized = payload_to_frame(payload, metadata, "Energy")
+    # same rows and values, only the empty cells changed from "" to NaN
+    pd.testing.assert_frame_equal(legacy[KEYS], vectorized[KEYS], check_dtype=False)
+    pd.testing.assert_frame_equal(legacy[YEARS].replace("", np.nan).astype(float), vectorized[YEARS])
+    return vectorized
+
+
+def random_payload(seed):
+    """Charts sharing indicator keys, more than 55 countries and series names that aren't years"""
+    rng = random.Random(seed)
+    countries = [f"Country {i}" for i in range(70)]
+    names = [str(year) for year in range(1998, 2026)] + ["Total"]
+    payload = {
+        "indicators": [[f"Indicator {i % 4} (x)", f"unit {i % 2}", "Theme"] for i in range(8)],
+        "charts": [[i, f"Indicator {i % 4} (x)", ""] for i in range(8)],
+        "countries": countries, "names": names, "chart": [], "country": [], "year": [], "value": [],
+    }
+    for chart in range(8):
+        series = rng.sample(range(len(names)), rng.randint(1, 10))
+        for country in rng.sample(range(len(countries)), rng.randint(1, len(countries))):
+            for name in series:
+                payload["chart"].append(chart)
+                payload["country"].append(country)
+                payload["year"].append(name)
+                payload["value"].append(round(rng.random() * 100, 2))
+    return payload
+
+
+@pytest.mark.parametrize("indicators, countries, missing", [(1, 1, 0.0), (12, 55, 0.2), (30, 60, 0.6)])
+def test_matches_the_dict_building_transform(indicators, countries, missing):
+    assert_same_rows(synthetic_payload(indicators, countries, missing))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_on_shared_keys_and_non_year_series(seed):
+    assert_same_rows(random_payload(seed))
+
+
+def test_long_rows_are_the_wide_values():
+    payload = synthetic_payload(5, 10, 0.3)
+    wide = assert_same_rows(payload)
+    long = payload_to_frame(payload, [parse_indicator(*indicator) for indicator in payload["indicators"]], "Energy", long=True)
+    pd.testing.assert_frame_equal(long, frame_to_long(wide))
+    assert long["value"].notna().all() and len(long) == wide[YEARS].notna().sum().sum()